@@ -23,9 +23,11 @@ class ActivityItem(Classified, ElementPresentation):
         ).watch("subject[Classifier].isAbstract", self.update_shapes).watch(
             "subject[Activity].node[ActivityParameterNode].parameter.name",
             self.update_parameters,
+            lazy=False,
         ).watch(
             "subject[Activity].node[ActivityParameterNode].parameter.typeValue",
             self.update_parameters,
+            lazy=False,
         )
 
     def postload(self):
@@ -73,6 +73,10 @@ class PartitionItem(ElementPresentation):
             self.partition = self.subject
         self._loading = False
 
+    def reconcile(self):
+        self.update_partition(None)
+        super().reconcile()
+
     def update_partition(self, event) -> None:
         """Set the min width of all the swimlanes."""
         self.min_width = 150 * len(self.partition)
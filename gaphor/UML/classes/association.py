@@ -152,6 +152,10 @@ class AssociationItem(Named, LinePresentation[UML.Association]):
     def update_ends(self):
         self.on_association_end_value()
 
+    def reconcile(self):
+        self.on_association_end_value()
+        super().reconcile()
+
     def on_association_end_value(self, event=None):
         """Handle events and update text on association end."""
         for end in (self._head_end, self._tail_end):
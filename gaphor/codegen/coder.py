@@ -112,7 +112,7 @@ def main(
 
 def load_model(modelfile: str, modeling_language: ModelingLanguage) -> ElementFactory:
     element_factory = ElementFactory()
-    with open(modelfile, encoding="utf-8") as file_obj:
+    with storage.open_model(modelfile) as file_obj:
         storage.load(
             file_obj,
             element_factory,
@@ -1,6 +1,10 @@
 """Event Manager."""
 
+from __future__ import annotations
+
 from collections import deque
+from contextlib import contextmanager
+from typing import Hashable, Iterable
 
 from generic.event import Event, Handler
 from generic.event import Manager as _Manager
@@ -27,6 +31,7 @@ class EventManager(Service):
         self._priority = _Manager()
         self._queue: deque[Event] = deque()
         self._handling = False
+        self._batch: list[Event] | None = None
 
     def shutdown(self) -> None:
         pass
@@ -70,16 +75,64 @@ class EventManager(Service):
 
     def handle(self, *events: Event) -> None:
         """Send event notifications to registered handlers."""
-        queue = self._queue
-        queue.extendleft(events)
+        batch = self._batch
+        if batch is None:
+            self._queue.extendleft(events)
+        else:
+            batch.extend(events)
 
         for event in events:
             self._priority.handle(event)
 
+        if batch is None:
+            self._handle_queue()
+
+    @contextmanager
+    def batch(self):
+        """Deliver events to handlers in one pass, at the end of the block.
+
+        Priority handlers still receive every event directly.
+        Other handlers receive the events when the block is left.
+        Events for the same element and property are coalesced, if the
+        event supports it (it has a ``coalesce_key`` and a
+        ``merge(newer_event)`` method).
+
+        Nested batches are delivered when the outermost block is left.
+        """
+        if self._batch is not None:
+            yield self
+            return
+
+        self._batch = []
+        try:
+            yield self
+        finally:
+            events, self._batch = self._batch, None
+            if events:
+                self._queue.extendleft(coalesce(events))
+                self._handle_queue()
+
+    def _handle_queue(self) -> None:
         if not self._handling:
+            queue = self._queue
             self._handling = True
             try:
                 while queue:
                     self._events.handle(queue.pop())
             finally:
                 self._handling = False
+
+
+def coalesce(events: Iterable[Event]) -> list[Event]:
+    """Merge events with the same ``coalesce_key``.
+
+    The merged event takes the place of the first event.
+    """
+    merged: dict[Hashable, Event] = {}
+    for event in events:
+        key = getattr(event, "coalesce_key", None) or object()
+        if (older := merged.get(key)) is not None:
+            merged[key] = older.merge(event)
+        else:
+            merged[key] = event
+    return list(merged.values())
@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 import contextlib
-from typing import Generic, Sequence, Type, TypeVar, overload
+from typing import Callable, Generic, Sequence, Type, TypeVar, overload
 
 from gaphor.core.modeling.event import AssociationUpdated
 
@@ -13,6 +13,8 @@ T = TypeVar("T")
 class collection(Generic[T]):
     """Collection (set-like) for model elements' 1:n and n:m relationships."""
 
+    __slots__ = ("property", "object", "type", "items")
+
     def __init__(self, property, object, type: Type[T]):
         self.property = property
         self.object = object
@@ -131,6 +133,42 @@ class collection(Generic[T]):
         self.object.handle(AssociationUpdated(self.object, self.property))
 
 
+_collection_items = collection.__dict__["items"]
+
+
+class lazycollection(collection[T]):
+    """A collection of which the items are loaded on first access.
+
+    ``loader`` is called with the items loaded so far, when the items
+    are needed. It returns ``False`` if the items can not be loaded at
+    this point, in which case it is called again on the next access.
+    """
+
+    __slots__ = ("loader",)
+
+    def __init__(
+        self, property, object, type: Type[T], loader: Callable[[list[T]], bool]
+    ):
+        self.loader: Callable[[list[T]], bool] | None = loader
+        super().__init__(property, object, type)
+
+    @property  # type: ignore[override]
+    def items(self) -> list[T]:
+        items: list[T] = _collection_items.__get__(self)
+        if (loader := self.loader) and loader(items):
+            self.loader = None
+        return items
+
+    @items.setter
+    def items(self, items: list[T]) -> None:
+        _collection_items.__set__(self, items)
+
+    @property
+    def loaded_items(self) -> list[T]:
+        """The items loaded so far."""
+        return _collection_items.__get__(self)  # type: ignore[no-any-return]
+
+
 _recurseproxy_trigger = slice(None, None, None)
 
 
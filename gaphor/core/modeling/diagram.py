@@ -6,7 +6,6 @@ from __future__ import annotations
 
 import logging
 from dataclasses import dataclass
-from functools import lru_cache
 from typing import (
     Callable,
     Iterable,
@@ -81,11 +80,35 @@ class DrawContext:
     dropzone: bool
 
 
-@lru_cache()
+_attrnames: dict[type, dict[str, str]] = {}
+
+
+def attrnames(cls: type) -> dict[str, str]:
+    """Map lower case (normalized) names to the real attribute names of a
+    class.
+
+    The table is built once per class. It is not tied to instances, so
+    it does not keep styled items alive.
+    """
+    try:
+        return _attrnames[cls]
+    except KeyError:
+        names: dict[str, str] = {}
+        for name in dir(cls):
+            names.setdefault(name.lower(), name)
+        _attrnames[cls] = names
+        return names
+
+
 def attrname(obj, lower_name):
     """Look up a real attribute name based on a lower case (normalized)
     name."""
-    return next((name for name in dir(obj) if name.lower() == lower_name), lower_name)
+    if name := attrnames(type(obj)).get(lower_name):
+        return name
+    return next(
+        (name for name in getattr(obj, "__dict__", ()) if name.lower() == lower_name),
+        lower_name,
+    )
 
 
 def rgetattr(obj, names):
@@ -235,10 +258,14 @@ class Diagram(Element):
         self._connections.add_handler(self._on_constraint_solved)
 
         self._registered_views: set[gaphas.model.View] = set()
+        self._attachments = 0
 
         self._watcher = self.watcher()
         self._watcher.watch("ownedPresentation", self._owned_presentation_changed)
-        self._watcher.watch("ownedPresentation.parent", self._order_owned_presentation)
+        self._item_watcher = self.watcher(subscribed=self.attached)
+        self._item_watcher.watch(
+            "ownedPresentation.parent", self._order_owned_presentation
+        )
 
     ownedPresentation: relation_many[Presentation] = association(
         "ownedPresentation", Presentation, composite=True, opposite="diagram"
@@ -274,7 +301,7 @@ class Diagram(Element):
 
     @property
     def styleSheet(self) -> StyleSheet | None:
-        return next(self.model.select(StyleSheet), None)
+        return self.model.style_sheet
 
     def style(self, node: StyleNode) -> Style:
         style_sheet = self.styleSheet
@@ -326,6 +353,7 @@ class Diagram(Element):
         for item in self.ownedPresentation:
             self.connections.remove_connections_to_item(item)
         self._watcher.unsubscribe_all()
+        self._item_watcher.unsubscribe_all()
         super().unlink()
 
     @overload
@@ -405,11 +433,49 @@ class Diagram(Element):
         if dirty_items:
             self._update_views(dirty_items)
 
+    @property
+    def attached(self) -> bool:
+        """Presentation items watch the model.
+
+        This is always the case, unless the model has lazy watchers.
+        """
+        return self._attachments > 0 or not (self._model and self._model.lazy_watchers)
+
+    def attach(self) -> None:
+        """Let the presentation items watch the model.
+
+        A diagram is attached while it's shown in a view, or while it's
+        exported. If the model has lazy watchers, the items of a diagram
+        that is not attached do not watch the model: they're brought up
+        to date when the diagram is attached.
+        """
+        attached = self.attached
+        self._attachments += 1
+        if attached:
+            return
+        self._item_watcher.subscribe_all()
+        for item in self.ownedPresentation:
+            item.subscribe_watchers()
+        self._order_owned_presentation()
+
+    def detach(self) -> None:
+        """Undo an :meth:`attach`."""
+        self._attachments -= 1
+        if self.attached:
+            return
+        self._item_watcher.unsubscribe_all()
+        for item in self.ownedPresentation:
+            item.unsubscribe_watchers()
+
     def register_view(self, view: gaphas.model.View[Presentation]) -> None:
-        self._registered_views.add(view)
+        if view not in self._registered_views:
+            self._registered_views.add(view)
+            self.attach()
 
     def unregister_view(self, view: gaphas.model.View[Presentation]) -> None:
-        self._registered_views.discard(view)
+        if view in self._registered_views:
+            self._registered_views.discard(view)
+            self.detach()
 
 
 @runtime_checkable
@@ -4,6 +4,7 @@
 from __future__ import annotations
 
 import logging
+from collections import defaultdict
 from typing import TYPE_CHECKING, Callable, Iterator, Protocol, TypeVar, overload
 from uuid import uuid1
 
@@ -12,6 +13,7 @@ from gaphor.core.modeling.properties import (
     attribute,
     relation_many,
     relation_one,
+    umlproperties_cache,
     umlproperty,
 )
 
@@ -19,6 +21,7 @@ if TYPE_CHECKING:
     from gaphor.core.modeling.coremodel import Comment
     from gaphor.core.modeling.diagram import Diagram
     from gaphor.core.modeling.presentation import Presentation
+    from gaphor.core.modeling.stylesheet import StyleSheet
 
 __all__ = ["Element"]
 
@@ -115,12 +118,7 @@ class Element:
     @classmethod
     def umlproperties(cls) -> Iterator[umlproperty]:
         """Iterate over all properties."""
-        umlprop = umlproperty
-        for propname in dir(cls):
-            if not propname.startswith("_"):
-                prop = getattr(cls, propname)
-                if isinstance(prop, umlprop):
-                    yield prop
+        return iter(_umlproperties(cls))
 
     def save(self, save_func) -> None:
         """Save the state by calling ``save_func(name, value)``."""
@@ -182,7 +180,9 @@ class Element:
         if model := self._model:
             model.handle(event)
 
-    def watcher(self, default_handler: Handler | None = None) -> EventWatcherProtocol:
+    def watcher(
+        self, default_handler: Handler | None = None, subscribed: bool = True
+    ) -> EventWatcherProtocol:
         """Create a new watcher for this element.
 
         Watchers provide a convenient way to get signalled when a property relative to
@@ -195,9 +195,12 @@ class Element:
         >>> element = Element()
         >>> watcher = element.watcher(default_handler=print)
         >>> watcher.watch("note")  # Watch for changed on element.note
+
+        If ``subscribed`` is false, handlers are only registered once
+        ``watcher.subscribe_all()`` is called.
         """
         if model := self._model:
-            return model.watcher(self, default_handler)
+            return model.watcher(self, default_handler, subscribed)
         else:
             return DummyEventWatcher()
 
@@ -210,18 +213,50 @@ class Element:
         return isinstance(self, type(other))
 
     def __setattr__(self, key, value):
-        if key.startswith("_") or hasattr(self.__class__, key):
-            super().__setattr__(key, value)
-        else:
-            raise AttributeError(
-                f"Property {self.__class__.__name__}.{key} does not exist"
-            )
+        cls = self.__class__
+        known = _settable_attributes[cls]
+        if key not in known:
+            if not (key.startswith("_") or hasattr(cls, key)):
+                raise AttributeError(f"Property {cls.__name__}.{key} does not exist")
+            known.add(key)
+        super().__setattr__(key, value)
+
+
+# Attribute names that have been set on instances of a class, so the
+# class is checked only once per name.
+_settable_attributes: defaultdict[type, set[str]] = defaultdict(set)
+
+
+def _umlproperties(cls: type[Element]) -> tuple[umlproperty, ...]:
+    """All properties of a class, in alphabetical order.
+
+    Properties are looked up once per class. Creating a property, for
+    example an association stub or a redefined property, clears the
+    cache.
+    """
+    try:
+        return umlproperties_cache[cls]
+    except KeyError:
+        pass
+
+    umlprop = umlproperty
+    props = tuple(
+        prop
+        for propname in dir(cls)
+        if not propname.startswith("_")
+        and isinstance(prop := getattr(cls, propname), umlprop)
+    )
+    umlproperties_cache[cls] = props
+    return props
 
 
 class DummyEventWatcher:
     def watch(self, path: str, handler: Handler | None = None) -> DummyEventWatcher:
         return self
 
+    def subscribe_all(self) -> None:
+        pass
+
     def unsubscribe_all(self) -> None:
         pass
 
@@ -253,8 +288,21 @@ class RepositoryProtocol(Protocol):
     def lookup(self, id: str) -> Element | None:
         ...
 
+    @property
+    def style_sheet(self) -> StyleSheet | None:
+        ...
+
+    @property
+    def bulk_loading(self) -> bool:
+        ...
+
+    lazy_watchers: bool
+
     def watcher(
-        self, element: Element, default_handler: Handler | None = None
+        self,
+        element: Element,
+        default_handler: Handler | None = None,
+        subscribed: bool = True,
     ) -> EventWatcherProtocol:
         ...
 
@@ -266,5 +314,8 @@ class EventWatcherProtocol(Protocol):
     def watch(self, path: str, handler: Handler | None = None) -> EventWatcherProtocol:
         ...
 
+    def subscribe_all(self) -> None:
+        ...
+
     def unsubscribe_all(self) -> None:
         ...
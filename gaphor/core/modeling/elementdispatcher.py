@@ -3,9 +3,11 @@
 from __future__ import annotations
 
 import logging
+from typing import Collection, Iterable
 
 from gaphor.abc import Service
 from gaphor.core import event_handler
+from gaphor.core.modeling.collection import lazycollection
 from gaphor.core.modeling.element import Element, Handler
 from gaphor.core.modeling.event import (
     AssociationAdded,
@@ -19,6 +21,12 @@ from gaphor.core.modeling.properties import umlproperty
 log = logging.getLogger(__name__)
 
 
+def loaded_values(property, element):
+    """The values of a property, without loading values on demand."""
+    values = property.get(element)
+    return values.loaded_items if isinstance(values, lazycollection) else values
+
+
 class EventWatcher:
     """A helper for easy registering and unregistering event handlers."""
 
@@ -27,10 +35,12 @@ class EventWatcher:
         element: Element,
         element_dispatcher: ElementDispatcher | None,
         default_handler: Handler | None = None,
+        subscribed: bool = True,
     ):
         self.element = element
         self.element_dispatcher = element_dispatcher
         self.default_handler: Handler | None = default_handler
+        self.subscribed = subscribed
         self._watched_paths: dict[str, Handler] = {}
 
     def watch(self, path: str, handler: Handler | None = None) -> EventWatcher:
@@ -42,6 +52,9 @@ class EventWatcher:
         registered
         and unregistered in one shot.
 
+        If the watcher is not subscribed, the handler is registered once
+        :meth:`subscribe_all` is called.
+
         This interface is fluent (returns self).
         """
         if handler:
@@ -51,22 +64,32 @@ class EventWatcher:
         else:
             raise ValueError(f"No handler provided for path {path}")
 
-        if dispatcher := self.element_dispatcher:
+        if self.subscribed and (dispatcher := self.element_dispatcher):
             dispatcher.subscribe(self._watched_paths[path], self.element, path)
         return self
 
+    def subscribe_all(self) -> None:
+        """Register handlers for all watched paths.
+
+        Handlers are not notified of changes made while the watcher was
+        not subscribed.
+        """
+        if self.subscribed:
+            return
+        self.subscribed = True
+        if dispatcher := self.element_dispatcher:
+            for path, handler in self._watched_paths.items():
+                dispatcher.subscribe(handler, self.element, path)
+
     def unsubscribe_all(self, *_args):
         """Unregister handlers.
 
         Extra arguments are ignored (makes connecting to destroy signals
         much easier though).
         """
-        dispatcher = self.element_dispatcher
-        if not dispatcher:
-            return
-
-        for _path, handler in self._watched_paths.items():
-            dispatcher.unsubscribe(handler)
+        self.subscribed = False
+        if dispatcher := self.element_dispatcher:
+            dispatcher.unsubscribe_all(self._watched_paths.values())
 
 
 class ElementDispatcher(Service):
@@ -101,6 +124,10 @@ class ElementDispatcher(Service):
     dispatcher table is updated accordingly (so the right handlers are
     fired
     every time).
+
+    Paths are compiled once per element type. Compiled paths that end with
+    the same properties share their remainder, so all handlers for a
+    remainder are registered, and moved, in one go.
     """
 
     def __init__(self, event_manager, modeling_language):
@@ -108,12 +135,20 @@ class ElementDispatcher(Service):
         self.modeling_language = modeling_language
 
         # Table used to fire events:
-        # (event.element, event.property): { handler: set(path, ..), ..}
-        self._handlers: dict[tuple[Element, umlproperty], dict[Handler, set]] = {}
+        # (event.element, event.property): { path: {handler, ..}, ..}
+        self._handlers: dict[
+            tuple[Element, umlproperty], dict[_Path, set[Handler]]
+        ] = {}
 
         # Fast resolution when handlers are disconnected
-        # handler: [(element, property), ..]
-        self._reverse: dict[Handler, list[tuple[Element, umlproperty]]] = {}
+        # handler: [(element, path), ..]
+        self._reverse: dict[Handler, list[tuple[Element, _Path]]] = {}
+
+        # Compiled paths: (type, "path.string"): path
+        self._paths: dict[tuple[type[Element], str], _Path] = {}
+        # All paths, by property and remainder, so paths with the same
+        # remainder share it: (property, remainder): path
+        self._nodes: dict[tuple[umlproperty, _Path | None], _Path] = {}
 
         self.event_manager.subscribe(self.on_model_loaded)
         self.event_manager.subscribe(self.on_element_change_event)
@@ -123,27 +158,50 @@ class ElementDispatcher(Service):
         self.event_manager.unsubscribe(self.on_model_loaded)
 
     def subscribe(self, handler: Handler, element: Element, path: str) -> None:
-        props = self._path_to_properties(element, path)
-        self._add_handlers(element, props, handler)
+        self._add_handlers(element, self._compile(type(element), path), (handler,))
 
     def unsubscribe(self, handler: Handler) -> None:
         """Unregister a handler from the registry."""
+        self.unsubscribe_all((handler,))
+
+    def unsubscribe_all(self, handlers: Iterable[Handler]) -> None:
+        """Unregister a number of handlers at once."""
+        registrations = self._handlers
+        for handler in handlers:
+            for element, path in self._reverse.pop(handler, ()):
+                key = element, path.property
+                if (paths := registrations.get(key)) and (
+                    registered := paths.get(path)
+                ):
+                    registered.discard(handler)
+                    if not registered:
+                        del paths[path]
+                        if not paths:
+                            del registrations[key]
+
+    def _compile(self, element_type: type[Element], path: str) -> _Path:
+        """The compiled path, starting from an element of ``element_type``."""
         try:
-            reverse = reversed(self._reverse[handler])
+            return self._paths[element_type, path]
         except KeyError:
-            return
-
-        for key in reverse:
-            if handlers := self._handlers.get(key):
-                handlers.pop(handler, None)
-                if not handlers:
-                    del self._handlers[key]
-        del self._reverse[handler]
-
-    def _path_to_properties(self, element, path):
-        """Given a start element and a path, return a tuple of properties
-        (association, attribute, etc.) representing the path."""
-        c = type(element)
+            pass
+
+        compiled = None
+        for prop in reversed(self._path_to_properties(element_type, path)):
+            key = prop, compiled
+            try:
+                compiled = self._nodes[key]
+            except KeyError:
+                compiled = self._nodes[key] = _Path(prop, compiled)
+
+        assert compiled
+        self._paths[element_type, path] = compiled
+        return compiled
+
+    def _path_to_properties(self, element_type, path):
+        """Given a start element type and a path, return a tuple of
+        properties (association, attribute, etc.) representing the path."""
+        c = element_type
         tpath = []
         for attr in path.split("."):
             cname = ""
@@ -162,105 +220,146 @@ class ElementDispatcher(Service):
                 c = prop.type
         return tuple(tpath)
 
-    def _add_handlers(self, element, props, handler):
-        """Provided an element and a path of properties (props), register the
-        handler for each property."""
-        property, remainder = props[0], props[1:]
+    def _add_handlers(self, element, path, handlers):
+        """Provided an element and a path, register the handlers for each
+        property in the path."""
+        property = path.property
         key = (element, property)
 
         # Register key
         try:
-            handlers = self._handlers[key]
-        except KeyError:
-            handlers = {}
-            self._handlers[key] = handlers
-
-        # Register handler and it's remaining paths
-        try:
-            remainders = handlers[handler]
+            paths = self._handlers[key]
         except KeyError:
-            remainders = handlers[handler] = set()
-        if remainder:
-            remainders.add(remainder)
+            paths = self._handlers[key] = {}
 
-        # Also add them to the reverse table, easing disconnecting
+        # Register handlers for the (remaining) path
         try:
-            reverse = self._reverse[handler]
+            registered = paths[path]
         except KeyError:
-            reverse = []
-            self._reverse[handler] = reverse
-
-        reverse.append(key)
+            registered = paths[path] = set()
+
+        reverse = self._reverse
+        for handler in handlers:
+            if handler not in registered:
+                registered.add(handler)
+                # Also add them to the reverse table, easing disconnecting
+                try:
+                    reverse[handler].append((element, path))
+                except KeyError:
+                    reverse[handler] = [(element, path)]
 
         # Apply remaining path
-        if remainder:
-            if property.upper == "*" or property.upper > 1:
-                for e in property.get(element):
-                    self._add_handlers(e, remainder, handler)
-            else:
-                e = property.get(element)
-                if e and remainder:
-                    self._add_handlers(e, remainder, handler)
-
-    def _remove_handlers(self, element, property, handler):
-        """Remove the handler of the path of elements."""
-        key = element, property
-        handlers = self._handlers.get(key)
-        if not handlers:
+        if remainder := path.remainder:
+            if path.many:
+                for e in loaded_values(property, element):
+                    self._add_handlers(e, remainder, handlers)
+            elif e := property.get(element):
+                self._add_handlers(e, remainder, handlers)
+
+    def _remove_handlers(self, element, path, handlers):
+        """Remove the handlers of the path of elements."""
+        key = element, path.property
+        if not (paths := self._handlers.get(key)) or not (
+            registered := paths.get(path)
+        ):
             return
 
-        if property.upper == "*" or property.upper > 1:
-            for remainder in handlers.get(handler, ()):
-                for e in property.get(element):
-                    self._remove_handlers(e, remainder[0], handler)
-        else:
-            for remainder in handlers.get(handler, ()):
-                if e := property.get(element):
-                    self._remove_handlers(e, remainder[0], handler)
-        try:
-            del handlers[handler]
-        except KeyError:
+        if not (matching := registered.intersection(handlers)):
             log.debug(
-                "Handler %s is not registered for %s.%s",
-                handler,
+                "Handlers %s are not registered for %s.%s",
+                handlers,
                 element,
-                property,
-                exc_info=True,
+                path.property,
             )
-
-        if not handlers:
-            del self._handlers[key]
+            return
+        handlers = matching
+
+        if remainder := path.remainder:
+            property = path.property
+            if path.many:
+                for e in loaded_values(property, element):
+                    self._remove_handlers(e, remainder, handlers)
+            elif e := property.get(element):
+                self._remove_handlers(e, remainder, handlers)
+
+        registered.difference_update(handlers)
+        if not registered:
+            del paths[path]
+            if not paths:
+                del self._handlers[key]
 
     @event_handler(ElementUpdated)
     def on_element_change_event(self, event):
-        if not (handlers := self._handlers.get((event.element, event.property))):
+        if not (paths := self._handlers.get((event.element, event.property))):
             return
         try:
-            for handler in set(handlers.keys()):
+            for handler in set().union(*paths.values()):
                 handler(event)
         finally:
-            # Handle add/removal of handlers based on the kind of event
-            # Filter out handlers that have no remaining properties
-            if (
-                isinstance(event, (AssociationSet, AssociationDeleted))
-                and event.old_value
+            if isinstance(
+                event, (AssociationSet, AssociationAdded, AssociationDeleted)
             ):
-                for handler, remainders in handlers.items():
-                    for remainder in remainders:
-                        self._remove_handlers(event.old_value, remainder[0], handler)
+                self._move_handlers(event, paths)
 
-            if (
-                isinstance(event, (AssociationSet, AssociationAdded))
-                and event.new_value
-            ):
-                for handler, remainders in handlers.items():
-                    for remainder in remainders:
-                        self._add_handlers(event.new_value, remainder, handler)
+    def _move_handlers(self, event, paths):
+        """Handle add/removal of handlers based on the kind of event.
+
+        Only paths with a remainder need to be updated.
+        """
+        remainders = [
+            (path.remainder, set(handlers))
+            for path, handlers in paths.items()
+            if path.remainder
+        ]
+        if not remainders:
+            return
+
+        if isinstance(event, (AssociationSet, AssociationDeleted)) and event.old_value:
+            for remainder, handlers in remainders:
+                self._remove_handlers(event.old_value, remainder, handlers)
+
+        if isinstance(event, (AssociationSet, AssociationAdded)) and event.new_value:
+            for remainder, handlers in remainders:
+                self._add_handlers(event.new_value, remainder, handlers)
 
     @event_handler(ModelReady)
     def on_model_loaded(self, event):
-        for (elem, prop), value in list(self._handlers.items()):
-            prefix = (prop,)
-            for h, remainders in list(value.items()):
-                for remainder in remainders:
-                    self._add_handlers(elem, prefix + remainder, h)
+        self._reconnect(list(self._handlers.items()))
+
+    def reconnect(self, elements: Collection[Element]) -> None:
+        """Register handlers for elements that have been loaded on demand.
+
+        Elements are loaded without emitting events, like when loading
+        a model.
+        """
+        self._reconnect(
+            [
+                (key, value)
+                for key, value in self._handlers.items()
+                if key[0] in elements
+            ]
+        )
+
+    def _reconnect(self, handlers):
+        for (elem, _prop), paths in handlers:
+            for path, registered in list(paths.items()):
+                if path.remainder:
+                    self._add_handlers(elem, path, set(registered))
+
+
+class _Path:
+    """A compiled path: a property, and the path of properties that
+    follows it, if any.
+
+    Paths are shared: every path that ends with the same properties
+    refers to the same remainder.
+    """
+
+    __slots__ = ("property", "remainder", "many")
+
+    def __init__(self, property: umlproperty, remainder: _Path | None):
+        self.property = property
+        self.remainder = remainder
+        self.many = remainder is not None and (
+            property.upper == "*" or property.upper > 1
+        )
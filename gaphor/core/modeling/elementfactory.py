@@ -4,7 +4,7 @@ from __future__ import annotations
 
 from collections import OrderedDict
 from contextlib import contextmanager
-from typing import Callable, Iterator, Protocol, TypeVar, overload
+from typing import Callable, Iterable, Iterator, Protocol, TypeVar, overload
 
 from gaphor.abc import Service
 from gaphor.core.eventmanager import EventManager, event_handler
@@ -26,6 +26,7 @@ from gaphor.core.modeling.event import (
     ModelReady,
 )
 from gaphor.core.modeling.presentation import Presentation
+from gaphor.core.modeling.stylesheet import StyleSheet
 
 T = TypeVar("T", bound=Element)
 P = TypeVar("P", bound=Presentation)
@@ -36,6 +37,17 @@ class EventHandler(Protocol):
         ...
 
 
+class DeferredLoader(Protocol):
+    def load_element(self, id: Id) -> None:
+        ...
+
+    def load_all(self) -> None:
+        ...
+
+    def discard(self) -> None:
+        ...
+
+
 class RecordingEventManager:
     def __init__(self, event_manager):
         self.event_manager = event_manager
@@ -59,6 +71,10 @@ class ElementFactory(Service):
     remove - a model element is removed (element is to be removed element)
     model - a new model has been loaded (element is None) flush - model is
       flushed: all element are removed from the factory (element is None)
+
+    If ``lazy_watchers`` is set, presentation items only watch the model
+    while their diagram is attached, i.e. it's shown in a view or it's
+    being exported (see :meth:`Diagram.attach`).
     """
 
     def __init__(
@@ -69,6 +85,13 @@ class ElementFactory(Service):
         self.event_manager: EventHandler | None = event_manager
         self.element_dispatcher = element_dispatcher
         self._elements: dict[Id, Element] = OrderedDict()
+        self._elements_by_type: dict[type[Element], dict[Id, Element]] = {}
+        self._index_dirty = False
+        self._bulk_loading = False
+        self._deferred_loaders: list[DeferredLoader] = []
+        self._style_sheet: StyleSheet | None = None
+        self._style_sheet_cached = False
+        self.lazy_watchers = False
         if event_manager:
             event_manager.subscribe(self._on_unlink_event)
 
@@ -87,8 +110,7 @@ class ElementFactory(Service):
         This method should only be used when loading models, since it
         does not emit an ElementCreated event.
         """
-        if id in self._elements:
-            element = self._elements[id]
+        if (element := self.lookup(id)) is not None:
             if not isinstance(element, type):
                 raise TypeError(
                     "Element {element} already exists but has a different type  {type}"
@@ -107,11 +129,22 @@ class ElementFactory(Service):
         else:
             raise TypeError(f"Type {type} is not a valid model element")
 
+        if self._bulk_loading:
+            element = type(id=id, **type_args)  # type: ignore[arg-type]
+            self._elements[id] = element
+            self._index_dirty = True
+            if issubclass(type, StyleSheet):
+                self._style_sheet_cached = False
+            return element
+
         # Avoid events that reference this element before its created-event is emitted.
         event_recorder = RecordingEventManager(self.event_manager)
         with self.block_events(event_recorder):
             element = type(id=id, **type_args)  # type: ignore[arg-type]
         self._elements[id] = element
+        self._index_element(element)
+        if issubclass(type, StyleSheet):
+            self._style_sheet_cached = False
         self.handle(ElementCreated(self, element, diagram))
         event_recorder.replay()
         return element
@@ -121,11 +154,20 @@ class ElementFactory(Service):
         return len(self._elements)
 
     def lookup(self, id: Id) -> Element | None:
-        """Find element with a specific id."""
-        return self._elements.get(id)
+        """Find element with a specific id.
+
+        If the element is created on demand, it's loaded.
+        """
+        if (element := self._elements.get(id)) is None and self._deferred_loaders:
+            for loader in self._deferred_loaders:
+                loader.load_element(id)
+            element = self._elements.get(id)
+        return element
 
     def __getitem__(self, id: Id) -> Element:
-        return self._elements[id]
+        if (element := self.lookup(id)) is None:
+            raise KeyError(id)
+        return element
 
     def __iter__(self):
         return iter(self._elements.values())
@@ -147,13 +189,25 @@ class ElementFactory(Service):
         ...
 
     def select(self, expression=None):
-        """Iterate elements that comply with expression."""
+        """Iterate elements that comply with expression.
+
+        Elements are iterated from a copy, since elements can be loaded
+        on demand, while iterating.
+        """
         if expression is None:
-            yield from self._elements.values()
+            yield from list(self._elements.values())
+        elif isinstance(expression, type) and issubclass(expression, Element):
+            if self._index_dirty:
+                self._rebuild_index()
+            yield from list(self._elements_by_type.get(expression, {}).values())
         elif isinstance(expression, type):
-            yield from (e for e in self._elements.values() if isinstance(e, expression))
+            for e in list(self._elements.values()):
+                if isinstance(e, expression):
+                    yield e
         else:
-            yield from (e for e in self._elements.values() if expression(e))
+            for e in list(self._elements.values()):
+                if expression(e):
+                    yield e
 
     def lselect(
         self, expression: Callable[[Element], bool] | type[T] | None = None
@@ -167,6 +221,24 @@ class ElementFactory(Service):
         """
         return list(self.select(expression))
 
+    @property
+    def style_sheet(self) -> StyleSheet | None:
+        """The style sheet of the model, if any.
+
+        The style sheet is requested for every item that is updated or
+        drawn, so the lookup is cached. The cache is invalidated when a
+        style sheet is created or deleted.
+        """
+        if not self._style_sheet_cached:
+            self._style_sheet = next(self.select(StyleSheet), None)
+            self._style_sheet_cached = True
+        return self._style_sheet
+
+    @property
+    def bulk_loading(self) -> bool:
+        """``True`` while in a :meth:`bulk_load` block."""
+        return self._bulk_loading
+
     def keys(self) -> Iterator[Id]:
         """Return a list with all id's in the factory."""
         return iter(self._elements.keys())
@@ -175,15 +247,43 @@ class ElementFactory(Service):
         """Return a list with all elements in the factory."""
         return iter(self._elements.values())
 
+    def defer(self, loader: DeferredLoader) -> None:
+        """Register a loader for elements that are created on demand.
+
+        Elements are loaded on first access. :meth:`load_deferred`
+        loads all elements at once, e.g. before the model is saved.
+        """
+        self._deferred_loaders.append(loader)
+
+    def load_deferred(self) -> None:
+        """Load all elements that have not been loaded yet."""
+        loaders, self._deferred_loaders = self._deferred_loaders, []
+        for loader in loaders:
+            loader.load_all()
+
+    def reorder(self, ids: Iterable[Id]) -> None:
+        """Order elements by ``ids``.
+
+        Elements not in ``ids`` are placed last, in their current order.
+        """
+        elements = self._elements
+        ordered = OrderedDict((id, elements[id]) for id in ids if id in elements)
+        ordered.update(elements)
+        self._elements = ordered
+        self._index_dirty = True
+
     def is_empty(self) -> bool:
         """Returns True if the factory holds no elements."""
         return bool(self._elements)
 
     def watcher(
-        self, element: Element, default_handler: Handler | None = None
+        self,
+        element: Element,
+        default_handler: Handler | None = None,
+        subscribed: bool = True,
     ) -> EventWatcherProtocol:
         element_dispatcher = self.element_dispatcher
-        return EventWatcher(element, element_dispatcher, default_handler)
+        return EventWatcher(element, element_dispatcher, default_handler, subscribed)
 
     def flush(self) -> None:
         """Flush all elements (remove them from the factory).
@@ -191,6 +291,10 @@ class ElementFactory(Service):
         Diagram elements are flushed first. The remaining elements are
         flushed next.
         """
+        loaders, self._deferred_loaders = self._deferred_loaders, []
+        for loader in loaders:
+            loader.discard()
+
         with self.block_events():
             for element in self.lselect(Diagram):
                 assert isinstance(element, Diagram)
@@ -206,6 +310,25 @@ class ElementFactory(Service):
         ModelReady event from gaphor.core.modeling.event."""
         self.handle(ModelReady(self))
 
+    @contextmanager
+    def bulk_load(self):
+        """Create and load many elements at once, e.g. from a file.
+
+        No events are emitted while bulk loading. Element creation is
+        not recorded, and type indexes are built once, when they are
+        needed. A single ModelReady event is emitted when the block
+        completes successfully.
+        """
+        self._bulk_loading = True
+        try:
+            with self.block_events():
+                yield self
+        finally:
+            self._bulk_loading = False
+        if self._index_dirty:
+            self._rebuild_index()
+        self.model_ready()
+
     @contextmanager
     def block_events(self, new_event_manager: EventHandler | None = None):
         """Block events from being emitted.
@@ -227,6 +350,31 @@ class ElementFactory(Service):
         elif isinstance(event, UnlinkEvent):
             self._on_unlink_event(event)
 
+    def _index_element(self, element: Element) -> None:
+        """Register the element for every model class in its MRO.
+
+        This keeps ``select(type)`` proportional to the number of
+        matching elements, rather than the size of the model.
+        """
+        by_type = self._elements_by_type
+        for cls in type(element).__mro__:
+            if issubclass(cls, Element):
+                by_type.setdefault(cls, {})[element.id] = element
+
+    def _rebuild_index(self) -> None:
+        self._elements_by_type.clear()
+        self._index_dirty = False
+        for element in self._elements.values():
+            self._index_element(element)
+
+    def _unindex_element(self, element: Element) -> None:
+        by_type = self._elements_by_type
+        for cls in type(element).__mro__:
+            if (elements := by_type.get(cls)) is not None:
+                elements.pop(element.id, None)
+                if not elements:
+                    del by_type[cls]
+
     @event_handler(UnlinkEvent)
     def _on_unlink_event(self, event):
         element = event.element
@@ -236,6 +384,11 @@ class ElementFactory(Service):
             del self._elements[element.id]
         except KeyError:
             return
+        if not self._index_dirty:
+            self._unindex_element(element)
+        if isinstance(element, StyleSheet):
+            self._style_sheet = None
+            self._style_sheet_cached = False
         if self.event_manager:
             self.event_manager.handle(
                 ElementDeleted(self, event.element, event.diagram)
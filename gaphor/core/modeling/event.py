@@ -48,6 +48,14 @@ class AttributeUpdated(ElementUpdated):
         self.old_value = old_value
         self.new_value = new_value
 
+    @property
+    def coalesce_key(self):
+        """Events with the same key can be merged, in an event batch."""
+        return (type(self), self.element, self.property)
+
+    def merge(self, newer):
+        return type(self)(self.element, self.property, self.old_value, newer.new_value)
+
 
 class AssociationUpdated(ElementUpdated):
     """An association element has changed."""
@@ -79,6 +87,13 @@ class AssociationSet(AssociationUpdated):
         self.old_value = old_value
         self.new_value = new_value
 
+    @property
+    def coalesce_key(self):
+        return (type(self), self.element, self.property)
+
+    def merge(self, newer):
+        return type(self)(self.element, self.property, self.old_value, newer.new_value)
+
 
 class AssociationAdded(AssociationUpdated):
     """An association element has been added."""
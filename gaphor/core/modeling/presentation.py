@@ -39,11 +39,14 @@ class Presentation(Matrices, Element, Generic[S]):
             if self.diagram:
                 self.diagram.request_update(self)
 
-        self._watcher = self.watcher(default_handler=update)
+        self._watcher = self.watcher(
+            default_handler=update, subscribed=diagram.attached
+        )
+        self._eager_watcher = self.watcher()
         self.watch("subject")
         self.watch("children")
-        self.watch("diagram", self._on_diagram_changed)
-        self.watch("parent", self._on_parent_changed)
+        self.watch("diagram", self._on_diagram_changed, lazy=False)
+        self.watch("parent", self._on_parent_changed, lazy=False)
         self.matrix.add_handler(self._on_matrix_changed)
 
     subject: relation_one[S]
@@ -55,18 +58,35 @@ class Presentation(Matrices, Element, Generic[S]):
         if self.diagram:
             self.diagram.request_update(self)
 
-    def watch(self, path, handler=None):
+    def watch(self, path, handler=None, lazy=True):
         """Watch a certain path of elements starting with the DiagramItem. The
         handler is optional and will default to a simple self.request_update().
 
         Watches should be set in the constructor, so they can be registered
         and unregistered in one shot.
 
+        If the model has lazy watchers, the handler is only registered
+        while the diagram is attached (see :meth:`Diagram.attach`).
+        Handlers that change the model should not be lazy.
+
         This interface is fluent(returns self).
         """
-        self._watcher.watch(path, handler)
+        (self._watcher if lazy else self._eager_watcher).watch(path, handler)
         return self
 
+    def subscribe_watchers(self) -> None:
+        """Register the lazy handlers, and bring the item up to date."""
+        self._watcher.subscribe_all()
+        self.reconcile()
+
+    def unsubscribe_watchers(self) -> None:
+        """Unregister the lazy handlers."""
+        self._watcher.unsubscribe_all()
+
+    def reconcile(self) -> None:
+        """Update the item for changes that its lazy handlers have missed."""
+        self.request_update()
+
     def change_parent(self, new_parent):
         """Change the parent and update the item's matrix so the item visually
         remains in the same place."""
@@ -96,6 +116,7 @@ class Presentation(Matrices, Element, Generic[S]):
 
     def inner_unlink(self, _unlink_event: UnlinkEvent) -> None:
         self._watcher.unsubscribe_all()
+        self._eager_watcher.unsubscribe_all()
         self.matrix.remove_handler(self._on_matrix_changed)
 
         if self.parent:
@@ -143,5 +164,12 @@ class MatrixUpdated(RevertibleEvent):
         super().__init__(element)
         self.old_value = old_value
 
+    @property
+    def coalesce_key(self):
+        return (type(self), self.element)
+
+    def merge(self, newer):
+        return self
+
     def revert(self, target):
         target.matrix.set(*self.old_value)
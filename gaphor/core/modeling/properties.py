@@ -39,7 +39,7 @@ from typing import (
     overload,
 )
 
-from gaphor.core.modeling.collection import collection
+from gaphor.core.modeling.collection import collection, lazycollection
 from gaphor.core.modeling.event import (
     AssociationAdded,
     AssociationDeleted,
@@ -60,6 +60,10 @@ __all__ = ["attribute", "enumeration", "association", "derivedunion", "redefine"
 
 log = logging.getLogger(__name__)
 
+# The properties of each element class, see Element.umlproperties().
+# The cache is cleared when a property is created, or added to a class.
+umlproperties_cache: dict[type, tuple[umlproperty, ...]] = {}
+
 
 E = TypeVar("E")
 
@@ -141,6 +145,10 @@ class umlproperty:
         self._dependent_properties: set[derived | redefine] = set()
         self.name = name
         self._name = f"_{name}"
+        umlproperties_cache.clear()
+
+    def __set_name__(self, owner, name):
+        umlproperties_cache.clear()
 
     def __get__(self, obj, class_=None):
         return self.get(obj) if obj else self
@@ -178,7 +186,13 @@ class umlproperty:
         raise NotImplementedError()
 
     def handle(self, event):
-        event.element.handle(event)
+        element = event.element
+        element.handle(event)
+        if (model := element._model) and model.bulk_loading:
+            # Nobody is listening: skip computing derived values and
+            # events, just make sure they're calculated when needed.
+            invalidate_dependents(self, element)
+            return
         for d in self._dependent_properties:
             d.propagate(event)
 
@@ -369,6 +383,17 @@ class association(umlproperty):
             setattr(obj, self._name, v)
         return v
 
+    def defer(self, obj, loader: Callable[[list[T]], bool]) -> None:
+        """Load (part of) the values of ``obj`` when they're first accessed.
+
+        ``loader`` is called on first access. See :class:`lazycollection`.
+        """
+        assert self.upper != 1, "Only multiplicity many associations can be deferred"
+        v: lazycollection = lazycollection(self, obj, self.type, loader)
+        if existing := getattr(obj, self._name, None):
+            v.items = existing.items
+        setattr(obj, self._name, v)
+
     def set(
         self, obj, value: T | None, index: int | None = None, from_opposite=False
     ) -> None:
@@ -577,6 +602,8 @@ class associationstub(umlproperty):
 class unioncache:
     """Small cache helper object for derivedunions."""
 
+    __slots__ = ("owner", "data", "version")
+
     def __init__(self, owner: object, data: object, version: int) -> None:
         self.owner = owner
         self.data = data
@@ -630,11 +657,24 @@ class derived(umlproperty, Generic[T]):
         )
 
     def postload(self, obj):
-        self.version += 1
+        self.invalidate(obj)
 
     def save(self, obj, save_func):
         pass
 
+    def invalidate(self, obj):
+        """Make sure the value is calculated again for ``obj``.
+
+        Only the cache of ``obj`` is invalidated, if ``obj`` owns this
+        property. Otherwise the caches of all elements are invalidated.
+        """
+        if object_has_property(obj, self):
+            uc = getattr(obj, self._name, None)
+            if uc is not None and uc.owner is self:
+                uc.version = 0
+        else:
+            self.version += 1
+
     def __str__(self):
         return f"<derived {self.name}: {self.type} {str(list(map(str, self.subsets)))[1:-1]}>"
 
@@ -688,13 +728,13 @@ class derived(umlproperty, Generic[T]):
         if self.upper == 1:
             old_value = hasattr(event.element, self._name) and self.get(event.element)
             # Make sure unions are created again
-            self.version += 1
+            self.invalidate(event.element)
             new_value = self.get(event.element)
             if old_value != new_value:
                 self.handle(DerivedSet(event.element, self, old_value, new_value))
         else:
             # Make sure unions are created again
-            self.version += 1
+            self.invalidate(event.element)
 
             if isinstance(event, AssociationSet):
                 self.handle(DerivedDeleted(event.element, self, event.old_value))
@@ -716,6 +756,15 @@ class derived(umlproperty, Generic[T]):
                 )
 
 
+def invalidate_dependents(prop: umlproperty, obj) -> None:
+    """Invalidate the derived properties of ``obj`` that depend on
+    ``prop``, directly or indirectly."""
+    for d in prop._dependent_properties:
+        if isinstance(d, derived):
+            d.invalidate(obj)
+        invalidate_dependents(d, obj)
+
+
 def object_has_property(obj, prop):
     found = getattr(type(obj), prop.name, None)
     while isinstance(found, redefine):
@@ -766,7 +815,7 @@ class derivedunion(derived[T]):
         if event.property not in self.subsets:
             return
         # Make sure unions are created again
-        self.version += 1
+        self.invalidate(event.element)
 
         if not isinstance(event, AssociationUpdated):
             return
@@ -2,7 +2,7 @@
 
 import pytest
 
-from gaphor.core.modeling.collection import collection
+from gaphor.core.modeling.collection import collection, lazycollection
 
 
 class MockElement:
@@ -126,3 +126,30 @@ def test_swap():
     c.swap("a", "c")
     assert c.items == ["c", "b", "a"]
     assert o.events
+
+
+def test_lazy_collection_loads_on_first_access():
+    def loader(items):
+        items.append(1)
+        return True
+
+    c: lazycollection[int] = lazycollection(None, None, int, loader)
+
+    assert c.loaded_items == []
+    assert list(c) == [1]
+    assert list(c) == [1]
+
+
+def test_lazy_collection_retries_if_not_loaded():
+    ready = False
+
+    def loader(items):
+        if ready:
+            items.append(1)
+        return ready
+
+    c: lazycollection[int] = lazycollection(None, None, int, loader)
+
+    assert len(c) == 0
+    ready = True
+    assert len(c) == 1
@@ -82,11 +82,36 @@ def test_diagram_stylesheet(element_factory):
     assert diagram.styleSheet is styleSheet
 
 
+def test_diagram_stylesheet_follows_created_and_deleted_style_sheets(
+    element_factory,
+):
+    diagram = element_factory.create(Diagram)
+    assert diagram.styleSheet is None
+
+    styleSheet = element_factory.create(StyleSheet)
+    assert diagram.styleSheet is styleSheet
+
+    styleSheet.unlink()
+    assert diagram.styleSheet is None
+
+
+def test_diagram_stylesheet_with_blocked_events(element_factory):
+    diagram = element_factory.create(Diagram)
+    assert diagram.styleSheet is None
+
+    with element_factory.block_events():
+        styleSheet = element_factory.create(StyleSheet)
+
+    assert diagram.styleSheet is styleSheet
+
+
 class ViewMock:
     def __init__(self):
+        self.updated_items = set()
         self.removed_items = set()
 
     def request_update(self, items, removed_items) -> None:
+        self.updated_items.update(items)
         self.removed_items.update(removed_items)
 
 
@@ -128,3 +153,66 @@ def test_order_grouped_presentations(diagram):
     example_1.parent = example_2
 
     assert list(diagram.get_all_items()) == [example_2, example_1]
+
+
+def watches_subject(element_factory, item):
+    return (item, Presentation.subject) in element_factory.element_dispatcher._handlers
+
+
+@pytest.fixture
+def lazy_diagram(element_factory):
+    element_factory.lazy_watchers = True
+    return element_factory.create(Diagram)
+
+
+def test_lazy_watchers_are_not_registered_for_detached_diagram(
+    element_factory, lazy_diagram
+):
+    example = lazy_diagram.create(Example)
+
+    assert not lazy_diagram.attached
+    assert not watches_subject(element_factory, example)
+
+
+def test_lazy_watchers_are_registered_while_view_is_registered(
+    element_factory, lazy_diagram
+):
+    example = lazy_diagram.create(Example)
+    view = ViewMock()
+
+    lazy_diagram.register_view(view)
+    attached = watches_subject(element_factory, example)
+    lazy_diagram.unregister_view(view)
+
+    assert attached
+    assert not watches_subject(element_factory, example)
+
+
+def test_items_are_updated_when_diagram_is_attached(element_factory, lazy_diagram):
+    example = lazy_diagram.create(Example)
+    example.subject = element_factory.create(Diagram)
+    view = ViewMock()
+
+    lazy_diagram.register_view(view)
+
+    assert example in view.updated_items
+
+
+def test_items_are_ordered_when_diagram_is_attached(lazy_diagram):
+    example_1 = lazy_diagram.create(Example)
+    example_2 = lazy_diagram.create(Example)
+    example_1.parent = example_2
+
+    lazy_diagram.attach()
+
+    assert list(lazy_diagram.get_all_items()) == [example_2, example_1]
+
+
+def test_eager_watchers_are_registered_for_detached_diagram(lazy_diagram):
+    parent = lazy_diagram.create(Example)
+    example = lazy_diagram.create(Example)
+
+    example.parent = parent
+    parent.matrix.scale(2, 2)
+
+    assert tuple(example.matrix_i2c) == (2, 0, 0, 2, 0, 0)
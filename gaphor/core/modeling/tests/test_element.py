@@ -1,6 +1,7 @@
 import pytest
 
 from gaphor.core.modeling.element import Element
+from gaphor.core.modeling.properties import attribute
 
 
 def test_element_note():
@@ -15,3 +16,55 @@ def test_element_can_not_set_random_property():
 
     with pytest.raises(AttributeError):
         e.random_property = 1
+
+
+def test_umlproperties_are_sorted_by_name():
+    class A(Element):
+        b = attribute("b", str)
+        a = attribute("a", str)
+
+    names = [p.name for p in A.umlproperties()]
+
+    assert names == sorted(names)
+    assert {"a", "b"} < set(names)
+
+
+def test_umlproperties_follow_class_extensions():
+    class A(Element):
+        pass
+
+    class B(A):
+        pass
+
+    assert set(B.umlproperties()) == set(Element.umlproperties())
+
+    A.extra = attribute("extra", str)
+
+    assert set(B.umlproperties()) == set(Element.umlproperties()) | {A.extra}
+
+
+def test_umlproperties_follow_replaced_properties():
+    class A(Element):
+        extra = attribute("extra", str)
+
+    old = A.extra
+    assert old in A.umlproperties()
+
+    A.extra = attribute("extra", int)
+
+    assert old not in A.umlproperties()
+    assert A.extra in A.umlproperties()
+
+
+def test_element_can_set_property_added_to_class():
+    class A(Element):
+        pass
+
+    a = A()
+    with pytest.raises(AttributeError):
+        a.extra = "Hello"
+
+    A.extra = attribute("extra", str)
+    a.extra = "Hello"
+
+    assert a.extra == "Hello"
@@ -419,3 +419,44 @@ def test_cyclic(element_factory, dispatcher, handler):
 
     a.unlink()
     assert 1 == len(dispatcher._handlers)
+
+
+def test_paths_are_compiled_once(dispatcher, element_factory, handler):
+    a = element_factory.create(UML.Class)
+    b = element_factory.create(UML.Class)
+    dispatcher.subscribe(handler, a, "ownedOperation.ownedParameter.name")
+    dispatcher.subscribe(handler, b, "ownedOperation.ownedParameter.name")
+
+    assert len(dispatcher._paths) == 1
+
+
+def test_paths_share_remainders(dispatcher, element_factory, handler):
+    dispatcher.subscribe(
+        handler, element_factory.create(UML.Class), "ownedOperation.ownedParameter.name"
+    )
+    dispatcher.subscribe(
+        handler, element_factory.create(UML.Operation), "ownedParameter.name"
+    )
+
+    assert len(dispatcher._nodes) == 3
+
+
+def test_handler_is_called_once_for_several_paths(element_factory, dispatcher, handler):
+    element = element_factory.create(UML.Transition)
+    dispatcher.subscribe(handler, element, "guard")
+    dispatcher.subscribe(handler, element, "guard.specification")
+
+    element.guard = element_factory.create(UML.Constraint)
+
+    assert len(handler.events) == 1
+
+
+def test_unsubscribe_all(dispatcher, uml_class, uml_operation, event, handler):
+    uml_class.ownedOperation = uml_operation
+    dispatcher.subscribe(event.handler, uml_class, "ownedOperation.name")
+    dispatcher.subscribe(handler, uml_class, "ownedOperation.name")
+
+    dispatcher.unsubscribe_all([event.handler, handler])
+
+    assert not dispatcher._handlers
+    assert not dispatcher._reverse
@@ -4,6 +4,7 @@ from collections.abc import Container, Iterable
 import pytest
 
 from gaphor.core import event_handler
+from gaphor.core.modeling.element import Element
 from gaphor.core.modeling.event import (
     ElementCreated,
     ElementDeleted,
@@ -181,3 +182,185 @@ def test_indirect_delete_of_element(event_manager, element_factory):
 
     assert operation._model is None
     assert operation not in element_factory
+
+
+def test_select_by_type_includes_subclasses(element_factory):
+    operation = element_factory.create(Operation)
+    parameter = element_factory.create(Parameter)
+
+    assert element_factory.lselect(Operation) == [operation]
+    assert element_factory.lselect(Parameter) == [parameter]
+    assert element_factory.lselect(Element) == [operation, parameter]
+
+
+def test_select_by_type_after_unlink(element_factory):
+    operation = element_factory.create(Operation)
+    parameter = element_factory.create(Parameter)
+
+    operation.unlink()
+
+    assert element_factory.lselect(Operation) == []
+    assert element_factory.lselect(Element) == [parameter]
+
+
+def test_select_by_type_after_flush(element_factory):
+    element_factory.create(Operation)
+    element_factory.flush()
+
+    assert element_factory.lselect(Operation) == []
+    assert element_factory.lselect(Element) == []
+
+
+def test_select_by_type_matches_full_scan(element_factory):
+    for _ in range(3):
+        element_factory.create(Operation)
+        element_factory.create(Parameter)
+
+    for type_ in (Element, Operation, Parameter, Presentation):
+        assert element_factory.lselect(type_) == element_factory.lselect(
+            lambda e, t=type_: isinstance(e, t)
+        )
+
+
+def test_bulk_load_emits_only_model_ready(element_factory):
+    with element_factory.bulk_load():
+        operation = element_factory.create(Operation)
+        operation.name = "op"
+        operation.ownedParameter = element_factory.create(Parameter)
+
+    assert len(events) == 1, events
+    assert isinstance(last_event, ModelReady)
+
+
+def test_bulk_load_select_by_type(element_factory):
+    with element_factory.bulk_load():
+        operation = element_factory.create(Operation)
+        assert element_factory.lselect(Operation) == [operation]
+        parameter = element_factory.create(Parameter)
+
+    assert element_factory.lselect(Parameter) == [parameter]
+    assert element_factory.lselect(Element) == [operation, parameter]
+
+
+def test_bulk_load_unlink(element_factory):
+    with element_factory.bulk_load():
+        operation = element_factory.create(Operation)
+        operation.unlink()
+
+    assert operation not in element_factory
+    assert element_factory.lselect(Operation) == []
+
+
+def test_no_model_ready_when_bulk_load_fails(element_factory):
+    with pytest.raises(ValueError), element_factory.bulk_load():
+        element_factory.create(Operation)
+        raise ValueError()
+
+    assert events == [], events
+    assert element_factory.lselect(Operation)
+
+
+def test_bulk_load_derived_union_is_up_to_date(element_factory):
+    with element_factory.bulk_load():
+        assert element_factory.bulk_loading
+        operation = element_factory.create(Operation)
+        assert list(operation.ownedElement) == []
+        parameter = element_factory.create(Parameter)
+        operation.ownedParameter = parameter
+
+        assert list(operation.ownedElement) == [parameter]
+        assert parameter.owner is operation
+
+    assert not element_factory.bulk_loading
+    assert list(operation.ownedElement) == [parameter]
+
+
+def test_create_while_selecting(element_factory):
+    element_factory.create(Operation)
+
+    for _ in element_factory.select(Element):
+        element_factory.create(Parameter)
+
+    assert len(element_factory.lselect(Parameter)) == 1
+
+
+def test_reorder(element_factory):
+    operation = element_factory.create(Operation)
+    parameter = element_factory.create(Parameter)
+    new_parameter = element_factory.create(Parameter)
+
+    element_factory.reorder([parameter.id, "unknown", operation.id])
+
+    assert list(element_factory.values()) == [parameter, operation, new_parameter]
+
+
+def test_reorder_select_by_type(element_factory):
+    parameter = element_factory.create(Parameter)
+    new_parameter = element_factory.create(Parameter)
+
+    element_factory.reorder([new_parameter.id])
+
+    assert element_factory.lselect(Parameter) == [new_parameter, parameter]
+
+
+def test_select_with_expression_is_lazy(element_factory):
+    element_factory.create(Operation)
+    element_factory.create(Operation)
+    selected = []
+
+    def expression(element):
+        selected.append(element)
+        return True
+
+    next(element_factory.select(expression))
+
+    assert len(selected) == 1
+
+
+class DeferredLoader:
+    def __init__(self, element_factory):
+        self.element_factory = element_factory
+        self.loaded = False
+        self.discarded = False
+
+    def load_element(self, id):
+        if id == "deferred":
+            self.load_all()
+
+    def load_all(self):
+        if not self.loaded:
+            self.loaded = True
+            self.element_factory.create_as(Operation, "deferred")
+
+    def discard(self):
+        self.discarded = True
+
+
+def test_load_deferred(element_factory):
+    loader = DeferredLoader(element_factory)
+    element_factory.defer(loader)
+
+    element_factory.load_deferred()
+    element_factory.load_deferred()
+
+    assert len(element_factory.lselect(Operation)) == 1
+
+
+def test_lookup_deferred_element(element_factory):
+    loader = DeferredLoader(element_factory)
+    element_factory.defer(loader)
+
+    assert element_factory.lookup("unknown") is None
+    assert isinstance(element_factory.lookup("deferred"), Operation)
+    assert element_factory["deferred"] is element_factory.lookup("deferred")
+
+
+def test_flush_discards_deferred_elements(element_factory):
+    loader = DeferredLoader(element_factory)
+    element_factory.defer(loader)
+
+    element_factory.flush()
+    element_factory.load_deferred()
+
+    assert loader.discarded
+    assert element_factory.lselect(Operation) == []
@@ -552,6 +552,45 @@ def test_derivedunion():
     assert d in a.u
 
 
+def test_derivedunion_is_invalidated_per_element():
+    class A(Element):
+        a: relation_many[A]
+        u: relation_many[A]
+
+    A.a = association("a", A)
+    A.u = derivedunion("u", A, 0, "*", A.a)
+
+    a = A()
+    b = A()
+    a_union = a.u
+    b_union = b.u
+
+    a.a = c = A()
+
+    assert b.u is b_union
+    assert a.u is not a_union
+    assert list(a.u) == [c]
+    assert list(b.u) == []
+
+
+def test_derivedunion_of_derivedunion_is_invalidated():
+    class A(Element):
+        a: relation_many[A]
+        u: relation_many[A]
+        uu: relation_many[A]
+
+    A.a = association("a", A)
+    A.u = derivedunion("u", A, 0, "*", A.a)
+    A.uu = derivedunion("uu", A, 0, "*", A.u)
+
+    a = A()
+    assert list(a.uu) == []
+
+    a.a = b = A()
+
+    assert list(a.uu) == [b]
+
+
 def test_derivedunion_notify_for_single_derived_property():
     class A(Element):
         pass
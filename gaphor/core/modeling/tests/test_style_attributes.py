@@ -1,5 +1,5 @@
 from gaphor import UML
-from gaphor.core.modeling.diagram import StyledItem
+from gaphor.core.modeling.diagram import StyledItem, attrnames
 from gaphor.UML.classes import ClassItem
 
 
@@ -84,3 +84,14 @@ def test_mixed_case_attributes(diagram, element_factory):
 
     assert node.attribute("ownedattribute") == "property"
     assert node.attribute("ownedattribute.name") == "first"
+
+
+def test_attribute_names_are_resolved_per_class(diagram, element_factory):
+    class_ = element_factory.create(UML.Class)
+    class_.isAbstract = True
+    classitem = diagram.create(ClassItem, subject=class_)
+
+    node = StyledItem(classitem)
+
+    assert node.attribute("subject.isabstract") == "true"
+    assert attrnames(UML.Class)["isabstract"] == "isAbstract"
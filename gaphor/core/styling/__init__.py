@@ -1,9 +1,19 @@
 from __future__ import annotations
 
 import operator
-from typing import Iterator, Protocol, Sequence, TypedDict, Union
+from collections import OrderedDict
+from typing import (
+    Dict,
+    Hashable,
+    Iterator,
+    Protocol,
+    Sequence,
+    Tuple,
+    TypedDict,
+    Union,
+)
 
-from gaphor.core.styling.compiler import compile_style_sheet
+from gaphor.core.styling.compiler import CompiledSelector, compile_style_sheet
 from gaphor.core.styling.declarations import (
     FONT_SIZE_VALUES,
     Color,
@@ -119,19 +129,120 @@ def resolve_variables(style: Style, style_layers: Sequence[Style]) -> Style:
     return new_style
 
 
+CompiledRule = Tuple[CompiledSelector, Tuple[int, int, int], int, Dict[str, object]]
+
+
 class CompiledStyleSheet:
-    def __init__(self, *css: str):
-        self.selectors = [
-            (selspec[0], selspec[1], order, declarations)
+    """A compiled style sheet.
+
+    Match results are cached. The cache key is built from the properties
+    of a node the selectors depend on: name, state, dark mode, and the
+    attributes used in attribute selectors. If selectors depend on the
+    parent of a node, the parent's properties are part of the key as
+    well. Style sheets with selectors that inspect the children of a
+    node (``:has()``, ``:empty``) are not cached.
+
+    Compiling a new style sheet automatically starts with a fresh cache.
+    """
+
+    def __init__(self, *css: str, cache_size: int = 4096):
+        self.selectors: list[CompiledRule] = [
+            (selspec[0], selspec[1], order, declarations)  # type: ignore[misc]
             for order, (selspec, declarations) in enumerate(compile_style_sheet(*css))
             if selspec != "error"
         ]
+        # Rules are bucketed by the name of the node they apply to,
+        # so only rules that can possibly match a node are evaluated.
+        self._universal_rules: list[CompiledRule] = []
+        self._rules_by_name: dict[str, list[CompiledRule]] = {}
+        for rule in self.selectors:
+            if (local_name := rule[0].local_name) is None:
+                self._universal_rules.append(rule)
+            else:
+                self._rules_by_name.setdefault(local_name, []).append(rule)
+        self._rules_for_name: dict[str, list[CompiledRule]] = {}
+
+        self._cache: OrderedDict[Hashable, Style] = OrderedDict()
+        self._cache_size = cache_size
+        self._cache_attributes = tuple(
+            sorted({a for pred, *_ in self.selectors for a in pred.attributes})
+        )
+        self._cache_attributes_for_name: dict[str, tuple[str, ...]] = {}
+        self._cache_ancestors = any(pred.ancestors for pred, *_ in self.selectors)
+        self._cacheable = cache_size > 0 and not any(
+            pred.descendants for pred, *_ in self.selectors
+        )
+
+    def rules_for_name(self, name: str) -> list[CompiledRule]:
+        """All rules that may apply to a node with the given name, in
+        style sheet order."""
+        try:
+            return self._rules_for_name[name]
+        except KeyError:
+            rules = self._rules_for_name[name] = sorted(
+                self._rules_by_name.get(name, []) + self._universal_rules,
+                key=RULE_ORDER_KEY,
+            )
+            return rules
 
     def match(self, node: StyleNode) -> Style:
+        if not self._cacheable:
+            return self._match(node)
+
+        key = self._cache_key(node)
+        cache = self._cache
+        try:
+            style = cache[key]
+        except KeyError:
+            style = cache[key] = self._match(node)
+            if len(cache) > self._cache_size:
+                cache.popitem(last=False)
+        else:
+            cache.move_to_end(key)
+        return style.copy()
+
+    def _cache_key(self, node: StyleNode) -> Hashable:
+        name = node.name()
+        key: tuple = (
+            getattr(node, "dark_mode", None),
+            name,
+            tuple(node.state()),
+            tuple(node.attribute(a) for a in self._attributes_for_name(name)),
+        )
+        if self._cache_ancestors:
+            attributes = self._cache_attributes
+            current = node.parent()
+            while current:
+                key += (
+                    current.name(),
+                    tuple(current.state()),
+                    tuple(current.attribute(a) for a in attributes),
+                )
+                current = current.parent()
+        return key
+
+    def _attributes_for_name(self, name: str) -> tuple[str, ...]:
+        try:
+            return self._cache_attributes_for_name[name]
+        except KeyError:
+            attributes = self._cache_attributes_for_name[name] = tuple(
+                sorted(
+                    {
+                        a
+                        for pred, *_ in self.rules_for_name(name)
+                        for a in pred.attributes
+                    }
+                )
+            )
+            return attributes
+
+    def _match(self, node: StyleNode) -> Style:
         results = sorted(
             (
                 (specificity, order, declarations)
-                for pred, specificity, order, declarations in self.selectors
+                for pred, specificity, order, declarations in self.rules_for_name(
+                    node.name()
+                )
                 if pred(node)
             ),
             key=MATCH_SORT_KEY,
@@ -140,3 +251,4 @@ class CompiledStyleSheet:
 
 
 MATCH_SORT_KEY = operator.itemgetter(0, 1)
+RULE_ORDER_KEY = operator.itemgetter(2)
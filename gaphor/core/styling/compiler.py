@@ -4,7 +4,10 @@ Based on cssselect2.compiler, written by Simon Sapin and Guillaume
 Ayoub.
 """
 
+from __future__ import annotations
+
 import re
+from dataclasses import dataclass, replace
 from functools import singledispatch
 from typing import Callable, Dict, Iterator, Literal, Tuple, Union
 
@@ -17,8 +20,31 @@ from gaphor.core.styling.declarations import parse_declarations
 split_whitespace = re.compile("[^ \t\r\n\f]+").findall
 
 
+@dataclass(frozen=True)
+class CompiledSelector:
+    """A compiled selector.
+
+    Calling it will tell if a node matches the selector. It also tells
+    which parts of a node the selector depends on, so match results can
+    be cached.
+    """
+
+    predicate: Callable[[object], bool]
+    local_name: str | None = None
+    "The (lower case) node name the selector requires, if any."
+    attributes: frozenset[str] = frozenset()
+    "Attributes (lower case) the selector inspects."
+    ancestors: bool = False
+    "True if the selector inspects the parents of a node."
+    descendants: bool = False
+    "True if the selector inspects the children of a node."
+
+    def __call__(self, el) -> bool:
+        return self.predicate(el)
+
+
 Rule = Union[
-    Tuple[Tuple[Callable[[object], bool], Tuple[int, int, int]], Dict[str, object]],
+    Tuple[Tuple[CompiledSelector, Tuple[int, int, int]], Dict[str, object]],
     Tuple[Literal["error"], Union[tinycss2.ast.ParseError, selectors.SelectorError]],
 ]
 
@@ -70,8 +96,8 @@ def compile_rules(rules):
         yield from ((selector, declaration) for selector in selector_list)
 
 
-def _combine(a, b):
-    return lambda el: a(el) and b(el)
+def _combine(a, b: CompiledSelector) -> CompiledSelector:
+    return replace(b, predicate=lambda el: a(el) and b(el))
 
 
 def compile_selector_list(input):
@@ -82,11 +108,72 @@ def compile_selector_list(input):
     Returns a list of compiled selectors.
     """
     return [
-        (compile_node(selector), selector.specificity)
+        (compile_selector(selector), selector.specificity)
         for selector in selectors.selectors(input)
     ]
 
 
+def compile_selector(selector) -> CompiledSelector:
+    predicate = compile_node(selector)
+    simple_selectors = list(_simple_selectors(selector))
+    return CompiledSelector(
+        predicate,
+        local_name=_local_name(selector),
+        attributes=frozenset(
+            s.lower_name
+            for s in simple_selectors
+            if isinstance(s, selectors.AttributeSelector)
+        ),
+        ancestors=any(
+            isinstance(s, selectors.CombinedSelector) for s in simple_selectors
+        ),
+        descendants=any(
+            isinstance(
+                s,
+                (
+                    selectors.PseudoClassSelector,
+                    selectors.FunctionalPseudoClassSelector,
+                ),
+            )
+            and s.name in ("empty", "has")
+            for s in simple_selectors
+        ),
+    )
+
+
+def _local_name(selector) -> str | None:
+    """The name a node should have to match the selector.
+
+    This is the local name of the right-most compound selector.
+    """
+    if isinstance(selector, selectors.CombinedSelector):
+        return _local_name(selector.right)
+    elif isinstance(selector, selectors.CompoundSelector):
+        return next(
+            (
+                sel.lower_local_name
+                for sel in selector.simple_selectors
+                if isinstance(sel, selectors.LocalNameSelector)
+            ),
+            None,
+        )
+    return None
+
+
+def _simple_selectors(selector):
+    """Iterate all (nested) selectors a selector is composed of."""
+    yield selector
+    if isinstance(selector, selectors.CombinedSelector):
+        yield from _simple_selectors(selector.left)
+        yield from _simple_selectors(selector.right)
+    elif isinstance(selector, selectors.CompoundSelector):
+        for sel in selector.simple_selectors:
+            yield from _simple_selectors(sel)
+    elif isinstance(selector, selectors.FunctionalPseudoClassSelector):
+        for sel in selectors.selectors(selector.arguments):
+            yield from _simple_selectors(sel)
+
+
 @singledispatch
 def compile_node(selector):
     """Dynamic dispatch selector nodes.
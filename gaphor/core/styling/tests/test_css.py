@@ -336,3 +336,110 @@ def test_color_schemes():
     assert normal_props.get("line-width") == 1.0
     assert dark_props.get("line-width") == 2.0
     assert light_props.get("line-width") == 3.0
+
+
+def test_match_results_are_cached():
+    css = "mytype { line-width: 3 }"
+
+    compiled_style_sheet = CompiledStyleSheet(css)
+    compiled_style_sheet.match(Node("mytype"))
+    props = compiled_style_sheet.match(Node("mytype"))
+
+    assert props.get("line-width") == 3
+    assert len(compiled_style_sheet._cache) == 1
+
+
+def test_cached_match_depends_on_state_and_attributes():
+    css = """
+        mytype { line-width: 1 }
+        mytype:hover { line-width: 2 }
+        mytype[subject.name=foo] { line-width: 3 }
+    """
+
+    compiled_style_sheet = CompiledStyleSheet(css)
+
+    assert compiled_style_sheet.match(Node("mytype")).get("line-width") == 1
+    assert (
+        compiled_style_sheet.match(Node("mytype", state=("hover",))).get("line-width")
+        == 2
+    )
+    assert (
+        compiled_style_sheet.match(
+            Node("mytype", attributes={"subject.name": "foo"})
+        ).get("line-width")
+        == 3
+    )
+    assert compiled_style_sheet.match(Node("mytype")).get("line-width") == 1
+
+
+def test_cached_match_depends_on_parent():
+    css = """
+        mytype { line-width: 1 }
+        parent > mytype { line-width: 2 }
+    """
+
+    compiled_style_sheet = CompiledStyleSheet(css)
+    orphan = Node("mytype")
+    child = Node("mytype", parent=Node("parent"))
+
+    assert compiled_style_sheet.match(orphan).get("line-width") == 1
+    assert compiled_style_sheet.match(child).get("line-width") == 2
+
+
+def test_match_is_not_cached_for_selectors_that_depend_on_children():
+    css = "mytype:empty { line-width: 2 }"
+
+    compiled_style_sheet = CompiledStyleSheet(css)
+    node = Node("mytype")
+
+    assert compiled_style_sheet.match(node).get("line-width") == 2
+
+    Node("child", parent=node)
+
+    assert compiled_style_sheet.match(node).get("line-width") is None
+    assert not compiled_style_sheet._cache
+
+
+def test_match_cache_is_bounded():
+    css = "* { line-width: 1 }"
+
+    compiled_style_sheet = CompiledStyleSheet(css, cache_size=2)
+    for name in ("a", "b", "c"):
+        compiled_style_sheet.match(Node(name))
+
+    assert list(compiled_style_sheet._cache) == [
+        (None, "b", (), ()),
+        (None, "c", (), ()),
+    ]
+
+
+def test_rules_are_bucketed_by_name():
+    css = """
+        * { line-width: 1 }
+        mytype { line-width: 2 }
+        parent > mytype { line-width: 3 }
+        other { line-width: 4 }
+        :is(mytype) { line-width: 5 }
+    """
+
+    compiled_style_sheet = CompiledStyleSheet(css)
+
+    def rule_order(name):
+        return [order for _, _, order, _ in compiled_style_sheet.rules_for_name(name)]
+
+    assert rule_order("mytype") == [0, 1, 2, 4]
+    assert rule_order("other") == [0, 3, 4]
+    assert rule_order("none") == [0, 4]
+
+
+def test_bucketed_rules_respect_specificity():
+    css = """
+        parent > mytype { line-width: 3 }
+        mytype { line-width: 2 }
+        * { line-width: 1 }
+    """
+
+    compiled_style_sheet = CompiledStyleSheet(css)
+    props = compiled_style_sheet.match(Node("mytype", parent=Node("parent")))
+
+    assert props.get("line-width") == 3
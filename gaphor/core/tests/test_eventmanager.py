@@ -2,6 +2,8 @@ import pytest
 from exceptiongroup import ExceptionGroup
 
 from gaphor.core.eventmanager import event_handler
+from gaphor.core.modeling import Element
+from gaphor.core.modeling.event import AttributeUpdated
 
 
 class Event:
@@ -100,3 +102,79 @@ def test_priority_handler_error_in_handler_and_second_event(event_manager):
         event_manager.handle(event)
 
     assert other_events
+
+
+class CoalescingEvent:
+    def __init__(self, key, value):
+        self.coalesce_key = key
+        self.value = value
+
+    def merge(self, newer):
+        return CoalescingEvent(self.coalesce_key, newer.value)
+
+
+def test_batch_delivers_events_at_end_of_block(event_manager, subscriber):
+    event = Event()
+
+    with event_manager.batch():
+        event_manager.handle(event)
+        assert not subscriber.events
+
+    assert subscriber.events == [event]
+
+
+def test_batch_delivers_to_priority_handlers_directly(event_manager):
+    handler, events = create_handler(CoalescingEvent)
+    event_manager.priority_subscribe(handler)
+
+    with event_manager.batch():
+        event_manager.handle(CoalescingEvent("a", 1))
+        event_manager.handle(CoalescingEvent("a", 2))
+        assert [e.value for e in events] == [1, 2]
+
+
+def test_batch_coalesces_events(event_manager):
+    handler, events = create_handler(CoalescingEvent)
+    event_manager.subscribe(handler)
+
+    with event_manager.batch():
+        event_manager.handle(CoalescingEvent("a", 1))
+        event_manager.handle(CoalescingEvent("b", 1))
+        event_manager.handle(CoalescingEvent("a", 2))
+
+    assert [(e.coalesce_key, e.value) for e in events] == [("a", 2), ("b", 1)]
+
+
+def test_nested_batch(event_manager, subscriber):
+    event = Event()
+
+    with event_manager.batch():
+        with event_manager.batch():
+            event_manager.handle(event)
+        assert not subscriber.events
+
+    assert subscriber.events == [event]
+
+
+def test_batch_delivers_events_on_error(event_manager, subscriber):
+    event = Event()
+
+    with pytest.raises(ValueError), event_manager.batch():
+        event_manager.handle(event)
+        raise ValueError()
+
+    assert subscriber.events == [event]
+
+
+def test_batch_coalesces_attribute_updates(event_manager, element_factory):
+    handler, events = create_handler(AttributeUpdated)
+    event_manager.subscribe(handler)
+    element = element_factory.create(Element)
+
+    with event_manager.batch():
+        element.note = "a"
+        element.note = "b"
+
+    assert len(events) == 1
+    assert events[0].old_value is None
+    assert events[0].new_value == "b"
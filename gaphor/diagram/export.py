@@ -14,37 +14,42 @@ def escape_filename(diagram_name):
 
 
 def render(diagram, new_surface, padding=8, write_to_png=None) -> None:
-    diagram.update_now(diagram.get_all_items())
+    diagram.attach()
+    try:
+        diagram.update_now(diagram.get_all_items())
 
-    painter = new_painter(diagram)
+        painter = new_painter(diagram)
 
-    # Update bounding boxes with a temporary Cairo Context
-    # (used for stuff like calculating font metrics)
-    bounding_box = calc_bounding_box(diagram, painter)
-    type_padding = diagram_type_height(diagram)
+        # Update bounding boxes with a temporary Cairo Context
+        # (used for stuff like calculating font metrics)
+        bounding_box = calc_bounding_box(diagram, painter)
+        type_padding = diagram_type_height(diagram)
 
-    w, h = (
-        bounding_box.width + 2 * padding,
-        bounding_box.height + 2 * padding + type_padding,
-    )
+        w, h = (
+            bounding_box.width + 2 * padding,
+            bounding_box.height + 2 * padding + type_padding,
+        )
 
-    with new_surface(w, h) as surface:
-        cr = cairo.Context(surface)
+        with new_surface(w, h) as surface:
+            cr = cairo.Context(surface)
 
-        bg_color = diagram.style(StyledDiagram(diagram)).get("background-color")
-        if bg_color and bg_color[3]:
-            cr.rectangle(0, 0, w, h)
-            cr.set_source_rgba(*bg_color)
-            cr.fill()
+            bg_color = diagram.style(StyledDiagram(diagram)).get("background-color")
+            if bg_color and bg_color[3]:
+                cr.rectangle(0, 0, w, h)
+                cr.set_source_rgba(*bg_color)
+                cr.fill()
 
-        cr.translate(
-            -bounding_box.x + padding, -bounding_box.y + padding + type_padding
-        )
-        painter.paint(diagram.get_all_items(), cr)
-        cr.show_page()
+            cr.translate(
+                -bounding_box.x + padding, -bounding_box.y + padding + type_padding
+            )
+            painter.paint(diagram.get_all_items(), cr)
+            cr.show_page()
+
+            if write_to_png:
+                surface.write_to_png(write_to_png)
 
-        if write_to_png:
-            surface.write_to_png(write_to_png)
+    finally:
+        diagram.detach()
 
 
 def diagram_type_height(diagram):
@@ -80,6 +80,13 @@ class HandlePositionEvent(RevertibleEvent):
         self.handle_index = element.handles().index(handle)
         self.old_value = old_value
 
+    @property
+    def coalesce_key(self):
+        return (type(self), self.element, self.handle_index)
+
+    def merge(self, newer):
+        return self
+
     def revert(self, target):
         target.handles()[self.handle_index].pos = self.old_value
         target.request_update()
@@ -141,6 +148,10 @@ class ElementPresentation(gaphas.Element, HandlePositionUpdate, Presentation[S])
         """Updating the shape configuration, e.g. when extra elements have to
         be drawn or when styling changes."""
 
+    def reconcile(self):
+        self.update_shapes()
+        super().reconcile()
+
     def update(self, context):
         if not self.shape:
             self.update_shapes()
@@ -503,6 +514,10 @@ class AttachedPresentation(HandlePositionUpdate, Presentation[S]):
         """Updating the shape configuration, e.g. when extra elements have to
         be drawn or when styling changes."""
 
+    def reconcile(self):
+        self.update_shapes()
+        super().reconcile()
+
     def update(self, context):
         side = self.connected_side()
         if not self.shape or self._last_connected_side != side:
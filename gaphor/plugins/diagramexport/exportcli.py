@@ -76,7 +76,7 @@ def export_command(args):
     # we should have some gaphor files to be processed at this point
     for model in args.model:
         log.debug("loading model %s", model)
-        with open(model, encoding="utf-8") as file_obj:
+        with storage.open_model(model) as file_obj:
             storage.load(file_obj, factory, modeling_language)
         log.debug("ready for rendering")
 
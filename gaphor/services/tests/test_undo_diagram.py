@@ -1,6 +1,7 @@
 from gaphor import UML
 from gaphor.core import Transaction
 from gaphor.core.modeling import Diagram
+from gaphor.storage import storage
 from gaphor.UML.classes import ClassItem
 
 
@@ -46,3 +47,18 @@ def test_redo_should_show_item_on_diagram(event_manager, element_factory, undo_m
     items, removed_items = view.updates[-1]
 
     assert cls.id in (item.id for item in items), items
+
+
+def test_undo_remove_lazy_loaded_diagram(
+    event_manager, element_factory, modeling_language, undo_manager, test_models
+):
+    with open(test_models / "all-elements.gaphor", encoding="utf-8") as file_obj:
+        storage.load(file_obj, element_factory, modeling_language, lazy=True)
+    diagram = next(element_factory.select(Diagram))
+
+    with Transaction(event_manager):
+        diagram.unlink()
+    undo_manager.undo_transaction()
+
+    diagram = next(element_factory.select(Diagram))
+    assert len(diagram.ownedPresentation) == 66
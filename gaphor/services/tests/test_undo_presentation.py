@@ -10,8 +10,10 @@ from gaphas.connector import Handle
 from gaphas.segment import Segment
 
 from gaphor.core import Transaction
+from gaphor.core.modeling.event import RevertibleEvent
 from gaphor.diagram.presentation import ElementPresentation, LinePresentation
 from gaphor.diagram.tests.fixtures import connect
+from gaphor.services.undomanager import ActionStack
 from gaphor.UML import Class
 from gaphor.UML.classes import ClassItem, GeneralizationItem
 
@@ -162,6 +164,61 @@ def test_line_handle_position(diagram, undo_manager, event_manager, index):
     assert tuple(handle.pos) == new_pos
 
 
+def test_drag_is_undone_at_once(diagram, undo_manager, event_manager):
+    with Transaction(event_manager):
+        element = diagram.create(ElementPresentation)
+    original = tuple(element.matrix)
+    handle = element.handles()[2]
+    old_pos = handle.pos.tuple()
+
+    for _ in range(10):
+        with Transaction(event_manager):
+            element.matrix.translate(1, 1)
+            handle.pos = (handle.pos.x + 1, handle.pos.y + 1)
+
+    assert len(undo_manager._undo_stack[-1]._actions) == 2
+
+    undo_manager.undo_transaction()
+
+    assert tuple(element.matrix) == original
+    assert handle.pos.tuple() == old_pos
+
+    undo_manager.redo_transaction()
+
+    assert tuple(element.matrix) == (1, 0, 0, 1, 10, 10)
+    assert handle.pos.tuple() == (old_pos[0] + 10, old_pos[1] + 10)
+
+
+def references(data, element):
+    if data is element:
+        return True
+    if isinstance(data, (tuple, list, set)):
+        return any(references(d, element) for d in data)
+    if isinstance(data, ActionStack):
+        return references((data._actions, data.keys or ()), element)
+    if isinstance(data, RevertibleEvent):
+        return references(list(vars(data).values()), element)
+    return False
+
+
+def test_undo_history_does_not_reference_items(diagram, undo_manager, event_manager):
+    with Transaction(event_manager):
+        element = diagram.create(ElementPresentation)
+    with Transaction(event_manager):
+        element.matrix.translate(10, 10)
+        element.handles()[2].pos = (50, 50)
+    with Transaction(event_manager):
+        element.unlink()
+
+    assert not references(undo_manager._undo_stack, element)
+
+    undo_manager.undo_transaction()
+    undo_manager.undo_transaction()
+    (element,) = diagram.ownedPresentation
+
+    assert tuple(element.matrix) == (1, 0, 0, 1, 0, 0)
+
+
 def test_line_handle_on_inserted_handle(diagram, undo_manager, event_manager):
     with Transaction(event_manager):
         line = diagram.create(LinePresentation)
@@ -1,11 +1,14 @@
 """Test the UndoManager."""
+import gc
+import weakref
+
 import pytest
 
 from gaphor.core import event_handler
 from gaphor.core.modeling import Element
-from gaphor.core.modeling.event import AssociationUpdated
+from gaphor.core.modeling.event import AssociationUpdated, RevertibleEvent
 from gaphor.core.modeling.properties import association, attribute, derivedunion
-from gaphor.services.undomanager import NotInTransactionException
+from gaphor.services.undomanager import NotInTransactionException, estimate_size
 from gaphor.tests.raises import raises_exception_group
 from gaphor.transaction import Transaction
 
@@ -458,3 +461,201 @@ def test_redo_stack(event_manager, element_factory, undo_manager):
     assert element_factory.size() == 2
 
     assert element_factory.lookup(p.id)
+
+
+def test_many_small_transactions_can_be_undone(
+    event_manager, element_factory, undo_manager
+):
+    for _ in range(50):
+        with Transaction(event_manager):
+            element_factory.create(Element)
+
+    while undo_manager.can_undo():
+        undo_manager.undo_transaction()
+
+    assert element_factory.size() == 0
+
+
+def test_undo_history_is_limited_by_memory(
+    event_manager, element_factory, undo_manager
+):
+    undo_manager.memory_limit = 10_000
+    for _ in range(200):
+        with Transaction(event_manager):
+            element_factory.create(Element)
+
+    assert 0 < undo_manager.memory_usage <= 10_000
+    assert 1 < len(undo_manager._undo_stack) < 200
+
+
+def test_latest_transaction_is_kept(event_manager, element_factory, undo_manager):
+    undo_manager.memory_limit = 0
+    with Transaction(event_manager):
+        element_factory.create(Element)
+    with Transaction(event_manager):
+        element_factory.create(Element)
+
+    assert len(undo_manager._undo_stack) == 1
+
+    undo_manager.undo_transaction()
+
+    assert element_factory.size() == 1
+    assert len(undo_manager._redo_stack) == 1
+
+
+def test_memory_usage(event_manager, element_factory, undo_manager):
+    class A(Element):
+        attr = attribute("attr", str)
+
+    undo_manager.coalesce_window = 0
+    with Transaction(event_manager):
+        a = element_factory.create(A)
+    with Transaction(event_manager):
+        a.attr = "x" * 1000
+
+    usage = undo_manager.memory_usage
+    with Transaction(event_manager):
+        a.attr = "y"
+
+    assert undo_manager.memory_usage > usage + 1000
+
+    undo_manager.undo_transaction()
+    undo_manager.undo_transaction()
+
+    assert undo_manager._redo_size > 1000
+
+    undo_manager.reset()
+
+    assert undo_manager.memory_usage == 0
+
+
+def test_estimate_size_of_revertible_event():
+    event = RevertibleEvent(None)
+    event.old_value = "x" * 1000
+
+    assert estimate_size(event) > 1000
+
+
+class Named(Element):
+    name = attribute("name", str)
+    other = attribute("other", str)
+
+
+def test_coalesce_attribute_updates(event_manager, element_factory, undo_manager):
+    with Transaction(event_manager):
+        a = element_factory.create(Named)
+
+    for n in range(10):
+        with Transaction(event_manager):
+            a.name = str(n)
+
+    assert len(undo_manager._undo_stack) == 2
+    assert len(undo_manager._undo_stack[-1]._actions) == 1
+
+    undo_manager.undo_transaction()
+
+    assert a.name is None
+
+    undo_manager.redo_transaction()
+
+    assert a.name == "9"
+
+
+def test_coalesce_within_transaction(event_manager, element_factory, undo_manager):
+    with Transaction(event_manager):
+        a = element_factory.create(Named)
+
+    with Transaction(event_manager):
+        a.name = "a"
+        a.name = "b"
+        a.name = "c"
+
+    assert len(undo_manager._undo_stack[-1]._actions) == 1
+
+    undo_manager.undo_transaction()
+
+    assert a.name is None
+
+
+def test_do_not_coalesce_after_time_window(
+    event_manager, element_factory, undo_manager
+):
+    undo_manager.coalesce_window = 0
+    with Transaction(event_manager):
+        a = element_factory.create(Named)
+
+    with Transaction(event_manager):
+        a.name = "a"
+    with Transaction(event_manager):
+        a.name = "b"
+
+    assert len(undo_manager._undo_stack) == 3
+
+
+def test_do_not_coalesce_other_properties(event_manager, element_factory, undo_manager):
+    with Transaction(event_manager):
+        a = element_factory.create(Named)
+
+    with Transaction(event_manager):
+        a.name = "a"
+    with Transaction(event_manager):
+        a.other = "b"
+
+    assert len(undo_manager._undo_stack) == 3
+
+    undo_manager.undo_transaction()
+
+    assert a.name == "a"
+    assert a.other is None
+
+
+def test_do_not_coalesce_with_created_elements(
+    event_manager, element_factory, undo_manager
+):
+    with Transaction(event_manager):
+        a = element_factory.create(Named)
+        a.name = "a"
+    with Transaction(event_manager):
+        a.name = "b"
+
+    assert len(undo_manager._undo_stack) == 2
+
+    undo_manager.undo_transaction()
+
+    assert a.name == "a"
+
+
+def test_do_not_coalesce_after_undo(event_manager, element_factory, undo_manager):
+    with Transaction(event_manager):
+        a = element_factory.create(Named)
+
+    with Transaction(event_manager):
+        a.name = "a"
+    with Transaction(event_manager):
+        a.other = "b"
+    undo_manager.undo_transaction()
+    with Transaction(event_manager):
+        a.name = "c"
+
+    assert len(undo_manager._undo_stack) == 3
+
+    undo_manager.undo_transaction()
+
+    assert a.name == "a"
+
+
+def test_undo_history_does_not_keep_elements_alive(
+    event_manager, element_factory, undo_manager
+):
+    with Transaction(event_manager):
+        a = element_factory.create(Named)
+    with Transaction(event_manager):
+        a.name = "a"
+    element_factory.flush()
+
+    ref = weakref.ref(a)
+    del a
+    gc.collect()
+
+    assert ref() is None
+    assert undo_manager.can_undo()
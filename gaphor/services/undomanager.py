@@ -2,16 +2,26 @@
 
 Undoing and redoing actions is managed through the UndoManager.
 
-An undo action should be a callable object (called with no arguments).
+An undo action is a callable object, recorded together with the
+arguments it is called with. Arguments are plain data, such as element
+ids and old values. Revertible events are kept without the element they
+were emitted for, and transactions refer to changed properties by
+element id, so the undo history does not keep elements alive.
 
-An undo action should return a callable object that acts as redo function.
-If None is returned the undo action is considered to be the redo action as well.
+An undo action that is executed records the redo action, the same way.
 
-NOTE: it would be nice to use actions in conjunction with functools.partial.
+The undo history is limited by (estimated) memory use, not by the
+number of transactions.
+
+Consecutive transactions that change the same properties, such as
+dragging an item or typing a name, are merged into one transaction.
 """
 
+import copy
 import logging
-from typing import Callable, List
+import sys
+import time
+from typing import List
 
 from gaphor.abc import ActionProvider, Service
 from gaphor.action import action
@@ -30,7 +40,7 @@ from gaphor.core.modeling.event import (
 )
 from gaphor.core.modeling.presentation import Presentation
 from gaphor.core.modeling.properties import association as association_property
-from gaphor.diagram.copypaste import deserialize, serialize
+from gaphor.diagram.copypaste import serialize
 from gaphor.event import (
     ActionEnabled,
     ServiceEvent,
@@ -43,6 +53,42 @@ from gaphor.transaction import Transaction, transactional
 logger = logging.getLogger(__name__)
 
 
+# Memory the undo history, and the redo history, may take
+UNDO_MEMORY_LIMIT = 32 * 2**20
+
+# Transactions committed within this many seconds of the previous one
+# are merged with it, if they only change the same properties
+COALESCE_WINDOW = 1.0
+
+
+def estimate_size(value) -> int:
+    """Estimate the memory used by the data of an undo action."""
+    if isinstance(value, (tuple, list)):
+        return sys.getsizeof(value) + sum(estimate_size(v) for v in value)
+    elif isinstance(value, (str, bytes, int, float)):
+        return sys.getsizeof(value)
+    elif isinstance(value, RevertibleEvent):
+        data = value.__dict__
+        return (
+            sys.getsizeof(value)
+            + sys.getsizeof(data)
+            + sum(estimate_size(v) for v in data.values())
+        )
+    # Properties and types are shared
+    return 0
+
+
+def undo_key(event):
+    """The key of the property changed by ``event``, if it can be
+    coalesced.
+
+    Elements in the key are replaced by their id.
+    """
+    if (key := getattr(event, "coalesce_key", None)) is None:
+        return None
+    return tuple(k.id if isinstance(k, Element) else k for k in key)
+
+
 class ActionStack:
     """A transaction.
 
@@ -51,24 +97,45 @@ class ActionStack:
     played back when a transaction is executed. This executing a
     transaction has the effect of performing the actions recorded, which
     will typically undo actions performed by the user.
+
+    ``size`` is an estimate of the memory used by the transaction.
+
+    ``keys`` are the keys of the properties the transaction reverts, or
+    ``None`` if it contains actions without a key.
     """
 
     def __init__(self):
-        self._actions: List[Callable[[], None]] = []
-
-    def add(self, action):
-        self._actions.append(action)
+        self._actions: List[tuple] = []
+        self.size = sys.getsizeof(self) + sys.getsizeof(self._actions)
+        self.keys: set | None = set()
+
+    def add(self, action, *args, key=None):
+        if key is None:
+            self.keys = None
+        elif self.keys is not None:
+            if key in self.keys:
+                # The oldest value is all that's needed to revert
+                return
+            self.keys.add(key)
+
+        record = (action, *args)
+        self._actions.append(record)
+        self.size += sys.getsizeof(record) + 8 + sum(estimate_size(a) for a in args)
 
     def can_execute(self):
         return bool(self._actions)
 
+    def can_merge(self, newer):
+        """Check if this transaction also reverts a newer transaction."""
+        return bool(newer.keys) and self.keys is not None and newer.keys <= self.keys
+
     @transactional
     def execute(self):
         self._actions.reverse()
 
-        for act in self._actions:
-            logger.debug(act.__doc__)
-            act()
+        for act, *args in self._actions:
+            logger.debug("%s %s", act.__doc__, args)
+            act(*args)
 
 
 class UndoManagerStateChanged(ServiceEvent):
@@ -90,12 +157,23 @@ class UndoManager(Service, ActionProvider):
     performed action.
     """
 
-    def __init__(self, event_manager, element_factory):
+    def __init__(
+        self,
+        event_manager,
+        element_factory,
+        memory_limit=UNDO_MEMORY_LIMIT,
+        coalesce_window=COALESCE_WINDOW,
+    ):
         self.event_manager = event_manager
         self.element_factory: RepositoryProtocol = element_factory
         self._undo_stack: List[ActionStack] = []
         self._redo_stack: List[ActionStack] = []
-        self._stack_depth = 20
+        self._undo_size = 0
+        self._redo_size = 0
+        self.memory_limit = memory_limit
+        self.coalesce_window = coalesce_window
+        self._last_commit: ActionStack | None = None
+        self._last_commit_time = 0.0
         self._current_transaction = None
         self._undoing = 0
         self._rolling_back = 0
@@ -116,10 +194,38 @@ class UndoManager(Service, ActionProvider):
 
     def clear_undo_stack(self):
         self._undo_stack = []
+        self._undo_size = 0
         self._current_transaction = None
+        self._last_commit = None
 
     def clear_redo_stack(self):
         del self._redo_stack[:]
+        self._redo_size = 0
+
+    @property
+    def memory_usage(self) -> int:
+        """Estimated memory used by the undo and redo history, in bytes."""
+        return self._undo_size + self._redo_size
+
+    def _update_memory_usage(self):
+        self._undo_size = sum(tx.size for tx in self._undo_stack)
+        self._redo_size = sum(tx.size for tx in self._redo_stack)
+
+    def _evict(self, stack: List[ActionStack], size: int) -> int:
+        """Remove the oldest transactions from a stack, until the stack
+        fits in the memory limit.
+
+        The latest transaction is always kept. Returns the new size
+        of the stack.
+        """
+        n = 0
+        while size > self.memory_limit and n < len(stack) - 1:
+            size -= stack[n].size
+            n += 1
+        if n:
+            logger.debug("Evict %d transactions from undo history", n)
+            del stack[:n]
+        return size
 
     @event_handler(ModelReady)
     def reset(self, event=None):
@@ -133,10 +239,15 @@ class UndoManager(Service, ActionProvider):
         assert not self._current_transaction
         self._current_transaction = ActionStack()
 
-    def add_undo_action(self, action, requires_transaction=True):
-        """Add an action to undo."""
+    def add_undo_action(self, action, *args, key=None, requires_transaction=True):
+        """Add an action to undo.
+
+        ``action`` is called with ``args`` when the transaction is
+        undone. Actions with a ``key`` set a property to its old value.
+        Only the first action for a key is kept.
+        """
         if self._current_transaction:
-            self._current_transaction.add(action)
+            self._current_transaction.add(action, *args, key=key)
             self._action_executed()
         elif requires_transaction:
             undo_stack = list(self._undo_stack)
@@ -144,11 +255,12 @@ class UndoManager(Service, ActionProvider):
 
             try:
                 with Transaction(self.event_manager):
-                    action()
+                    action(*args)
             finally:
                 # Restore stacks and act like nothing happened
                 self._redo_stack = redo_stack
                 self._undo_stack = undo_stack
+                self._update_memory_usage()
 
             raise NotInTransactionException(
                 f"Updating state outside of a transaction: {action.__doc__}."
@@ -158,16 +270,38 @@ class UndoManager(Service, ActionProvider):
     def commit_transaction(self, event=None):
         assert self._current_transaction
 
-        if self._current_transaction.can_execute():
-            self.clear_redo_stack()
-            self._undo_stack.append(self._current_transaction)
-            while len(self._undo_stack) > self._stack_depth:
-                del self._undo_stack[0]
+        transaction = self._current_transaction
+        if transaction.can_execute():
+            now = time.monotonic()
+            if self._can_coalesce(transaction, now):
+                logger.debug("Merge transaction with the previous transaction")
+            else:
+                self.clear_redo_stack()
+                if self._last_commit:
+                    self._last_commit.keys = None
+                self._undo_stack.append(transaction)
+                self._undo_size = self._evict(
+                    self._undo_stack, self._undo_size + transaction.size
+                )
+                self._last_commit = transaction
+            self._last_commit_time = now
 
         self._current_transaction = None
 
         self._action_executed()
 
+    def _can_coalesce(self, transaction: ActionStack, now: float) -> bool:
+        """Check if the last committed transaction also reverts
+        ``transaction``, so ``transaction`` is not needed."""
+        return (
+            not self._undoing
+            and self._last_commit is not None
+            and bool(self._undo_stack)
+            and self._undo_stack[-1] is self._last_commit
+            and now - self._last_commit_time < self.coalesce_window
+            and self._last_commit.can_merge(transaction)
+        )
+
     @event_handler(TransactionRollback)
     def rollback_transaction(self, event=None):
         """Roll back the transaction we're in."""
@@ -195,6 +329,8 @@ class UndoManager(Service, ActionProvider):
         finally:
             # Discard all data collected in the rollback "transaction"
             self._undo_stack = undo_stack
+            self._update_memory_usage()
+            self._last_commit = None
             self._rolling_back -= 1
 
         self._action_executed()
@@ -229,10 +365,11 @@ class UndoManager(Service, ActionProvider):
             if self._undo_stack:
                 self._redo_stack.extend(self._undo_stack)
             self._undo_stack = undo_stack
+            self._update_memory_usage()
+            self._last_commit = None
             self._undoing -= 1
 
-        while len(self._redo_stack) > self._stack_depth:
-            del self._redo_stack[0]
+        self._redo_size = self._evict(self._redo_stack, self._redo_size)
 
         self._action_executed()
 
@@ -253,6 +390,8 @@ class UndoManager(Service, ActionProvider):
                 transaction.execute()
         finally:
             self._redo_stack = redo_stack
+            self._update_memory_usage()
+            self._last_commit = None
             self._undoing -= 1
 
         self._action_executed()
@@ -306,32 +445,30 @@ class UndoManager(Service, ActionProvider):
 
     @event_handler(RevertibleEvent)
     def undo_reversible_event(self, event: RevertibleEvent):
-        element_id = event.element.id
-
-        def undo_reversible_event():
-            element = self.lookup(element_id)
-            event.revert(element)
-
-        undo_reversible_event.__doc__ = (
-            f"Reverse event {event.__class__.__name__} for element {event.element}."
-        )
-
+        # The element is looked up when the event is reverted
+        revertible = copy.copy(event)
+        del revertible.element
         self.add_undo_action(
-            undo_reversible_event, requires_transaction=event.requires_transaction
+            self._revert_event,
+            event.element.id,
+            revertible,
+            key=undo_key(event),
+            requires_transaction=event.requires_transaction,
         )
 
+    def _revert_event(self, element_id, event):
+        """Reverse a revertible event."""
+        element = self.lookup(element_id)
+        event.revert(element)
+
     @event_handler(ElementCreated)
     def undo_create_element_event(self, event: ElementCreated):
-        element_id = event.element.id
-
-        def undo_create_event():
-            element = self.lookup(element_id)
-            element.unlink()
+        self.add_undo_action(self._undo_create_element, event.element.id)
 
-        undo_create_event.__doc__ = f"Undo create element {event.element}."
-        del event
-
-        self.add_undo_action(undo_create_event)
+    def _undo_create_element(self, element_id):
+        """Undo create element."""
+        element = self.lookup(element_id)
+        element.unlink()
 
     @event_handler(ElementDeleted)
     def undo_delete_element_event(self, event: ElementDeleted):
@@ -339,111 +476,112 @@ class UndoManager(Service, ActionProvider):
         element_id = event.element.id
 
         if isinstance(event.element, Presentation):
-            diagram_id = event.diagram.id
-            data = {}
+            # References can not be restored, only values are kept
+            data = []
 
             def save_func(name, value):
-                data[name] = serialize(value)
+                vtype, ser = serialize(value)
+                if vtype == "v":
+                    data.append((name, ser))
 
             event.element.save(save_func)
 
-            def undo_delete_event():
-                # If diagram is not there, for some reason, recreate it.
-                # It's probably removed in the same transaction.
-                try:
-                    diagram: Diagram = self.lookup(diagram_id)  # type: ignore[assignment]
-                except ValueError:
-                    diagram = self.element_factory.create_as(Diagram, diagram_id)
-
-                element = diagram.create_as(element_type, element_id)
-                for name, ser in data.items():
-                    for value in deserialize(ser, lambda ref: None):
-                        element.load(name, value)
-
+            self.add_undo_action(
+                self._undo_delete_presentation,
+                element_type,
+                element_id,
+                event.diagram.id,
+                tuple(data),
+            )
         else:
+            self.add_undo_action(self._undo_delete_element, element_type, element_id)
 
-            def undo_delete_event():
-                self.element_factory.create_as(element_type, element_id)
+    def _undo_delete_element(self, element_type, element_id):
+        """Recreate element."""
+        self.element_factory.create_as(element_type, element_id)
 
-        undo_delete_event.__doc__ = f"Recreate element {element_type} ({element_id})."
-        del event
+    def _undo_delete_presentation(self, element_type, element_id, diagram_id, data):
+        """Recreate presentation element."""
+        # If diagram is not there, for some reason, recreate it.
+        # It's probably removed in the same transaction.
+        try:
+            diagram: Diagram = self.lookup(diagram_id)  # type: ignore[assignment]
+        except ValueError:
+            diagram = self.element_factory.create_as(Diagram, diagram_id)
 
-        self.add_undo_action(undo_delete_event)
+        element = diagram.create_as(element_type, element_id)
+        for name, value in data:
+            element.load(name, value)
 
     @event_handler(AttributeUpdated)
     def undo_attribute_change_event(self, event: AttributeUpdated):
-        attribute = event.property
-        element_id = event.element.id
-        value = event.old_value
-
-        def undo_attribute_change_event():
-            element = self.lookup(element_id)
-            attribute.set(element, value)
-
-        undo_attribute_change_event.__doc__ = (
-            f"Revert {event.element}.{attribute.name} to {value}."
+        self.add_undo_action(
+            self._undo_attribute_change,
+            event.element.id,
+            event.property,
+            event.old_value,
+            key=undo_key(event),
         )
-        del event
 
-        self.add_undo_action(undo_attribute_change_event)
+    def _undo_attribute_change(self, element_id, attribute, value):
+        """Revert attribute."""
+        element = self.lookup(element_id)
+        attribute.set(element, value)
 
     @event_handler(AssociationSet)
     def undo_association_set_event(self, event: AssociationSet):
         association = event.property
         if type(association) is not association_property:
             return
-        element_id = event.element.id
-        value_id = event.old_value and event.old_value.id
 
-        def undo_association_set_event():
-            element = self.lookup(element_id)
-            value = value_id and self.lookup(value_id)
-            association.set(element, value, from_opposite=True)
-
-        undo_association_set_event.__doc__ = (
-            f"Revert {event.element}.{association.name} to {event.old_value}."
+        self.add_undo_action(
+            self._undo_association_set,
+            event.element.id,
+            association,
+            event.old_value and event.old_value.id,
         )
-        del event
 
-        self.add_undo_action(undo_association_set_event)
+    def _undo_association_set(self, element_id, association, value_id):
+        """Revert association."""
+        element = self.lookup(element_id)
+        value = value_id and self.lookup(value_id)
+        association.set(element, value, from_opposite=True)
 
     @event_handler(AssociationAdded)
     def undo_association_add_event(self, event: AssociationAdded):
         association = event.property
         if type(association) is not association_property:
             return
-        element_id = event.element.id
-        value_id = event.new_value.id
 
-        def undo_association_add_event():
-            element = self.lookup(element_id)
-            value = self.lookup(value_id)
-            association.delete(element, value, from_opposite=True)
-
-        undo_association_add_event.__doc__ = (
-            f"{event.element}.{association.name} delete {event.new_value}."
+        self.add_undo_action(
+            self._undo_association_add,
+            event.element.id,
+            association,
+            event.new_value.id,
         )
-        del event
 
-        self.add_undo_action(undo_association_add_event)
+    def _undo_association_add(self, element_id, association, value_id):
+        """Delete value from association."""
+        element = self.lookup(element_id)
+        value = self.lookup(value_id)
+        association.delete(element, value, from_opposite=True)
 
     @event_handler(AssociationDeleted)
     def undo_association_delete_event(self, event: AssociationDeleted):
         association = event.property
         if type(association) is not association_property:
             return
-        element_id = event.element.id
-        value_id = event.old_value.id
-        index = event.index
 
-        def undo_association_delete_event():
-            element = self.lookup(element_id)
-            value = self.lookup(value_id)
-            association.set(element, value, index=index, from_opposite=True)
-
-        undo_association_delete_event.__doc__ = (
-            f"{event.element}.{association.name} add {event.old_value}."
+        self.add_undo_action(
+            self._undo_association_delete,
+            event.element.id,
+            association,
+            event.old_value.id,
+            event.index,
         )
-        del event
 
-        self.add_undo_action(undo_association_delete_event)
+    def _undo_association_delete(self, element_id, association, value_id, index):
+        """Add value to association."""
+        element = self.lookup(element_id)
+        value = self.lookup(value_id)
+        association.set(element, value, index=index, from_opposite=True)
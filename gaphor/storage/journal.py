@@ -0,0 +1,238 @@
+"""An append-only journal of changes to a model.
+
+Once a model is loaded from, or saved to, a file, every committed
+transaction is appended to a journal. A journal entry contains the
+element records of the elements changed in the transaction, in the
+same form as they're parsed from a model file, and the ids of the
+elements that have been deleted.
+
+If Gaphor stops without saving the model, the journal is still there.
+Replaying the journal on top of the records parsed from the model file
+recovers the model as it was.
+
+Entries are written by a background thread. Entries that are committed
+in quick succession are written, and synced to disk, in one go.
+
+A journal is only used for the exact file contents it was started for.
+"""
+
+from __future__ import annotations
+
+import io
+import logging
+import marshal
+import os
+import queue
+import threading
+from pathlib import Path
+from typing import Iterable
+
+from gaphor.core import event_handler
+from gaphor.core.modeling import Element
+from gaphor.core.modeling.event import (
+    ElementCreated,
+    ElementDeleted,
+    ElementUpdated,
+    ModelFlushed,
+    RevertibleEvent,
+)
+from gaphor.event import TransactionCommit
+from gaphor.storage.parser import element
+from gaphor.storage.storage import element_saver
+
+__all__ = ["Journal", "read_journal", "replay"]
+
+log = logging.getLogger(__name__)
+
+MAGIC = b"GAPHOR-JOURNAL"
+FORMAT_VERSION = 1
+
+Record = tuple[str, str, dict[str, str], dict[str, "str | list[str]"]]
+Entry = tuple[list[str], list[Record]]
+
+
+def _header(file_hash: str) -> bytes:
+    return b"%s %d %d %s\n" % (
+        MAGIC,
+        FORMAT_VERSION,
+        marshal.version,
+        file_hash.encode("ascii"),
+    )
+
+
+def read_journal(path: str | os.PathLike, file_hash: str) -> list[Entry]:
+    """Read the entries from a journal.
+
+    ``file_hash`` is the hash of the contents of the model file, as
+    computed by :func:`gaphor.storage.snapshot.content_hash`. If the
+    journal was written for other file contents, no entries are
+    returned. An entry that was not completely written is ignored.
+    """
+    try:
+        data = Path(path).read_bytes()
+    except OSError:
+        return []
+
+    header = _header(file_hash)
+    if not data.startswith(header):
+        log.debug("Journal %s is for another model file", path)
+        return []
+
+    entries = []
+    f = io.BytesIO(data)
+    f.seek(len(header))
+    while f.tell() < len(data):
+        try:
+            entries.append(marshal.load(f))
+        except (EOFError, ValueError, TypeError):
+            log.warning("Journal %s has an incomplete entry", path)
+            break
+    return entries
+
+
+def replay(elements: dict[str, element], entries: Iterable[Entry]) -> None:
+    """Apply journal entries to element records.
+
+    The records should be upgraded to the current version.
+    """
+    for deleted, records in entries:
+        for id in deleted:
+            elements.pop(id, None)
+        for id, type, values, references in records:
+            elem = element(id, type)
+            elem.values = values
+            elem.references = references
+            elements[id] = elem
+
+
+class _Recorder:
+    """Collect values and references in an element record, the way
+    :class:`gaphor.storage.xmlwriter.XMLWriter` writes them."""
+
+    def __init__(self):
+        self.values: dict[str, str] = {}
+        self.refs: dict[str, str | list[str]] = {}
+
+    def value(self, name, value):
+        self.values[name] = value
+
+    def reference(self, name, refid):
+        self.refs[name] = refid
+
+    def references(self, name, refids):
+        self.refs[name] = list(refids)
+
+
+class _Writer(threading.Thread):
+    """Append entries to a journal file, and sync them to disk."""
+
+    def __init__(self, path: Path):
+        super().__init__(name="gaphor-journal", daemon=True)
+        self.path = path
+        self.queue: queue.SimpleQueue[
+            Entry | threading.Event | None
+        ] = queue.SimpleQueue()
+
+    def run(self):
+        with open(self.path, "ab") as f:
+            while True:
+                batch = [self.queue.get()]
+                while not self.queue.empty():
+                    batch.append(self.queue.get())
+
+                for item in batch:
+                    if isinstance(item, tuple):
+                        marshal.dump(item, f)
+                f.flush()
+                os.fsync(f.fileno())
+
+                for item in batch:
+                    if isinstance(item, threading.Event):
+                        item.set()
+                if None in batch:
+                    return
+
+
+class Journal:
+    """Record committed changes to a model in a journal file.
+
+    Nothing is recorded until the journal is opened with :meth:`open`.
+    """
+
+    def __init__(self, event_manager, element_factory):
+        self.event_manager = event_manager
+        self.element_factory = element_factory
+        self.path: Path | None = None
+        self._changed: dict[Element, None] = {}
+        self._writer: _Writer | None = None
+
+        event_manager.subscribe(self._on_element_changed)
+        event_manager.subscribe(self._on_transaction_commit)
+        event_manager.subscribe(self._on_model_flushed)
+
+    def shutdown(self) -> None:
+        self.event_manager.unsubscribe(self._on_element_changed)
+        self.event_manager.unsubscribe(self._on_transaction_commit)
+        self.event_manager.unsubscribe(self._on_model_flushed)
+        self.close()
+
+    def open(self, path: str | os.PathLike, file_hash: str, append=False) -> None:
+        """Start recording changes in the journal file ``path``.
+
+        ``file_hash`` is the hash of the contents of the model file. The
+        journal is started from scratch, unless ``append`` is set.
+        """
+        self.close()
+        self.path = Path(path)
+        if not append or not self.path.exists():
+            with open(self.path, "wb") as f:
+                f.write(_header(file_hash))
+        self._changed.clear()
+        self._writer = _Writer(self.path)
+        self._writer.start()
+
+    def flush(self) -> None:
+        """Wait until all entries are written to disk."""
+        if self._writer:
+            written = threading.Event()
+            self._writer.queue.put(written)
+            written.wait()
+
+    def close(self, remove=False) -> None:
+        """Stop recording changes.
+
+        If ``remove`` is set, the journal file is removed, e.g. when
+        the changes no longer need to be recovered.
+        """
+        if self._writer:
+            self._writer.queue.put(None)
+            self._writer.join()
+            self._writer = None
+        if remove and self.path:
+            self.path.unlink(missing_ok=True)
+        self.path = None
+
+    def record(self, element: Element) -> Record:
+        recorder = _Recorder()
+        element.save(element_saver(self.element_factory, recorder))
+        return (element.id, type(element).__name__, recorder.values, recorder.refs)
+
+    @event_handler(ElementUpdated, RevertibleEvent, ElementCreated, ElementDeleted)
+    def _on_element_changed(self, event) -> None:
+        if self._writer:
+            self._changed[event.element] = None
+
+    @event_handler(TransactionCommit)
+    def _on_transaction_commit(self, event) -> None:
+        if not (self._writer and self._changed):
+            return
+
+        changed, self._changed = self._changed, {}
+        lookup = self.element_factory.lookup
+        deleted = [e.id for e in changed if lookup(e.id) is not e]
+        records = [self.record(e) for e in changed if lookup(e.id) is e]
+        self._writer.queue.put((deleted, records))
+
+    @event_handler(ModelFlushed)
+    def _on_model_flushed(self, event) -> None:
+        self._changed.clear()
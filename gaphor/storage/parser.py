@@ -21,9 +21,13 @@ takes a long time. The yielded values are the percentage of the file read.
 
 from __future__ import annotations
 
+import gzip
+import io
 import logging
 import os
-from collections import OrderedDict
+import sys
+from typing import AnyStr, Callable
+from xml.parsers import expat
 from xml.sax import SAXParseException, handler, make_parser, xmlreader
 
 from gaphor.core.modeling import Element
@@ -37,6 +41,8 @@ log = logging.getLogger(__name__)
 class base:
     """Simple base class for element, and canvas."""
 
+    __slots__ = ("values", "references")
+
     def __init__(self):
         self.values: dict[str, str] = {}
         self.references: dict[str, str | list[str]] = {}
@@ -59,8 +65,15 @@ class base:
         except KeyError:
             return None
 
+    def release(self):
+        """Free values and references, once they have been loaded."""
+        self.values = {}
+        self.references = {}
+
 
 class element(base):
+    __slots__ = ("id", "type", "element")
+
     def __init__(self, id: str, type: str, canvas: canvas | None = None):
         base.__init__(self)
         self.id = id
@@ -69,7 +82,7 @@ class element(base):
 
 
 class canvas(base):
-    pass
+    __slots__ = ()
 
 
 XMLNS = "http://gaphor.sourceforge.net/model"
@@ -143,8 +156,10 @@ class GaphorLoader(handler.ContentHandler):
         """Start of document: all our attributes are initialized."""
         self.version = None
         self.gaphor_version = ""
-        self.elements: dict[str, element] = OrderedDict()
+        self.elements: dict[str, element] = {}
         self._stack: list[tuple[element | canvas, State]] = []
+        # Ids are referenced many times: share one string per id.
+        self._ids: dict[str, str] = {}
         self.text = ""
         self._start_element_handlers = (
             self.start_element,
@@ -160,6 +175,10 @@ class GaphorLoader(handler.ContentHandler):
     def endDocument(self):
         if len(self._stack) != 0:
             raise ParserException("Invalid XML document.")
+        self._ids.clear()
+
+    def intern_id(self, id: str) -> str:
+        return self._ids.setdefault(id, id)
 
     def startElement(self, name, attrs):
         self.text = ""
@@ -175,8 +194,8 @@ class GaphorLoader(handler.ContentHandler):
         if state == GAPHOR:
             if "id" not in attrs:
                 log.exception(f"File corrupt: Element {name} has no id")
-            id = attrs["id"]
-            e = element(id, name)
+            id = self.intern_id(attrs["id"])
+            e = element(id, sys.intern(name))
             if id in self.elements.keys():
                 log.exception(
                     f"File corrupt: duplicate element. Remove element {name} with id {id} and try again"
@@ -215,7 +234,7 @@ class GaphorLoader(handler.ContentHandler):
         # to store the <ref>, <reflist> or <val> content:
         if state in (ELEMENT, DIAGRAM, CANVAS, ITEM):
             # handle 'normal' attributes
-            self.push(name, ATTR)
+            self.push(sys.intern(name), ATTR)
             return True
 
     def start_reference(self, state, name, attrs):
@@ -227,7 +246,7 @@ class GaphorLoader(handler.ContentHandler):
         # Reference with multiplicity 1:
         elif state == ATTR and name == "ref":
             n = self.peek()
-            self.peek(2).references[n] = attrs["refid"]
+            self.peek(2).references[n] = self.intern_id(attrs["refid"])
             self.push(None, REF)
             return True
 
@@ -236,7 +255,7 @@ class GaphorLoader(handler.ContentHandler):
             n = self.peek()
             # Fetch the element instance from the stack
             r = self.peek(3).references
-            refid = attrs["refid"]
+            refid = self.intern_id(attrs["refid"])
             try:
                 r[n].append(refid)
             except KeyError:
@@ -313,28 +332,172 @@ class ErrorHandler:
         log.warning(exception)
 
 
-def parse_generator(file_obj, loader):
+CHUNK_SIZE = 2**20
+
+
+def parse_generator(file_obj, loader, chunk_size=CHUNK_SIZE):
     """The generator based version of parse().
 
     parses the file and load it with ContentHandler loader. Returns a
     progress percentage.
+
+    The file is read in large chunks and parsed by expat directly. The
+    common tags (``<val>``, ``<ref>``, ``<reflist>``, and attributes) are
+    handled by specialised callbacks. All other tags are passed on to the
+    loader.
     """
     assert file_obj.seekable()
     assert isinstance(loader, GaphorLoader), "loader should be a GaphorLoader"
 
-    parser = new_parser(loader)
-    file_size = get_file_size(file_obj)
+    loader.startDocument()
+    parser = new_expat_parser(loader)
+    progress = file_progress(file_obj)
     count = 0
+    # The end of the text parsed so far, to find conflict markers that
+    # start in the previous chunk.
+    tail = None
 
-    for line in file_obj:
+    while chunk := file_obj.read(chunk_size):
         try:
-            parser.feed(line)
-        except SAXParseException as e:
-            if line.startswith("<<<<<"):
+            parser.Parse(chunk, False)
+        except expat.ExpatError as e:
+            # A conflict marker can continue in the next chunk
+            ahead = file_obj.read(len(MERGE_CONFLICT_MARKER))
+            if has_merge_conflict(chunk + ahead, tail):
                 raise MergeConflictDetected from e
-            raise
-        count += len(line)
-        yield (count * 100) / file_size
+            raise SAXParseException(str(e), e, ExpatErrorLocator(e)) from None
+        tail = merge_conflict_tail(chunk, tail)
+        count += len(chunk)
+        yield progress(count)
+
+    try:
+        # Signal the end of the document, chunk is empty by now
+        parser.Parse(chunk, True)
+    except expat.ExpatError as e:
+        if has_merge_conflict(chunk, tail):
+            raise MergeConflictDetected from e
+        raise SAXParseException(str(e), e, ExpatErrorLocator(e)) from None
+    loader.endDocument()
+
+
+def new_expat_parser(loader):
+    """Create an expat parser that feeds ``loader``."""
+    parser = expat.ParserCreate(namespace_separator=" ")
+    parser.buffer_text = True
+    parser.buffer_size = 2**16
+
+    stack = loader._stack
+    intern_id = loader.intern_id
+    local_names: dict[str, str | None] = {}
+    start_element = loader.start_element
+    start_other = loader.startElement
+    end_other = loader.endElement
+
+    def local_name(name):
+        try:
+            return local_names[name]
+        except KeyError:
+            ns, _, local = name.rpartition(" ")
+            n = sys.intern(local) if not ns or ns == XMLNS else None
+            local_names[name] = n
+            return n
+
+    def start(name, attrs):
+        if not (name := local_name(name)):
+            return
+        loader.text = ""
+        state = stack[-1][1] if stack else ROOT
+        if state == ATTR:
+            if name == "val":
+                stack.append((None, VAL))
+            elif name == "ref":
+                stack[-2][0].references[stack[-1][0]] = intern_id(attrs["refid"])
+                stack.append((None, REF))
+            elif name == "reflist":
+                stack.append((stack[-1][0], REFLIST))
+            else:
+                loader.invalid_tag(state, name, attrs)
+        elif state == REFLIST and name == "ref":
+            references = stack[-3][0].references
+            attr_name = stack[-1][0]
+            refid = intern_id(attrs["refid"])
+            try:
+                references[attr_name].append(refid)
+            except KeyError:
+                references[attr_name] = [refid]
+            stack.append((None, REF))
+        elif state == ELEMENT or (state == DIAGRAM and name != "canvas"):
+            stack.append((name, ATTR))
+        elif state == GAPHOR:
+            start_element(state, name, attrs)
+        else:
+            start_other(name, attrs)
+
+    def end(name):
+        if not (name := local_name(name)):
+            return
+        state = stack[-1][1]
+        if state == VAL:
+            stack[-3][0].values[stack[-2][0]] = loader.text
+            stack.pop()
+        elif state in (REF, ATTR, ELEMENT, DIAGRAM, REFLIST):
+            stack.pop()
+        else:
+            end_other(name)
+
+    def characters(content):
+        loader.text += content
+
+    parser.StartElementHandler = start
+    parser.EndElementHandler = end
+    parser.CharacterDataHandler = characters
+    return parser
+
+
+MERGE_CONFLICT_MARKER = "\n<<<<<<<"
+
+
+def has_merge_conflict(chunk: AnyStr, tail: AnyStr | None = None) -> bool:
+    """Check if a line in ``chunk`` starts with a merge conflict marker.
+
+    ``tail`` is the end of the text before ``chunk``, as returned by
+    :func:`merge_conflict_tail`. Without a tail, ``chunk`` is the start
+    of the file.
+    """
+    if isinstance(chunk, str):
+        return MERGE_CONFLICT_MARKER in (tail or "\n") + chunk
+    return MERGE_CONFLICT_MARKER.encode() in (tail or b"\n") + chunk
+
+
+def merge_conflict_tail(chunk: AnyStr, tail: AnyStr | None = None) -> AnyStr:
+    """The end of the text, up to and including ``chunk``.
+
+    The tail is as long as a merge conflict marker. The start of the
+    file counts as the start of a line.
+    """
+    n = len(MERGE_CONFLICT_MARKER)
+    if isinstance(chunk, str):
+        return ((tail or "\n") + chunk[-n:])[-n:]
+    return ((tail or b"\n") + chunk[-n:])[-n:]
+
+
+class ExpatErrorLocator(xmlreader.Locator):
+    """Provide the position of an expat error for a SAXParseException."""
+
+    def __init__(self, error: expat.ExpatError):
+        self.error = error
+
+    def getColumnNumber(self):
+        return self.error.offset
+
+    def getLineNumber(self):
+        return self.error.lineno
+
+    def getPublicId(self):
+        return None
+
+    def getSystemId(self):
+        return None
 
 
 def new_parser(loader):
@@ -347,6 +510,21 @@ def new_parser(loader):
     return parser
 
 
+def file_progress(file_obj) -> Callable[[int], float]:
+    """Create a function that returns the percentage of ``file_obj`` read,
+    given the number of characters read.
+
+    For compressed files, the position in the compressed file is used.
+    """
+    if isinstance(compressed := getattr(file_obj, "buffer", None), gzip.GzipFile):
+        raw: io.BufferedIOBase = compressed.fileobj  # type: ignore[assignment]
+        raw_size = get_file_size(raw)
+        return lambda count: (raw.tell() * 100) / raw_size
+
+    file_size = get_file_size(file_obj)
+    return lambda count: (count * 100) / file_size
+
+
 def get_file_size(file_obj):
     orig_pos = file_obj.tell()
     file_size = file_obj.seek(0, os.SEEK_END)
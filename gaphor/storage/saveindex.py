@@ -0,0 +1,122 @@
+"""An index of the elements in the last saved model file.
+
+While saving, the position of every element in the file is recorded.
+Elements that are changed, created or deleted afterwards are marked
+dirty. On the next save to the same file, the text of clean elements
+is copied from the previous file, instead of serializing those
+elements again. The output is the same as that of a full save.
+
+Positions are character offsets in the (decompressed) text of a model
+file.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+from pathlib import Path
+
+from gaphor.core import event_handler
+from gaphor.core.modeling.event import (
+    ElementCreated,
+    ElementDeleted,
+    ElementUpdated,
+    ModelFlushed,
+    ModelReady,
+    RevertibleEvent,
+)
+from gaphor.storage.storage import open_model
+
+__all__ = ["SaveIndex"]
+
+log = logging.getLogger(__name__)
+
+
+class SaveIndex:
+    """Keep track of element positions in the last saved model file.
+
+    The index subscribes to ``event_manager`` to find out which elements
+    changed since the last save.
+    """
+
+    def __init__(self, event_manager):
+        self.event_manager = event_manager
+        self.spans: dict[str, tuple[int, int]] = {}
+        self.dirty: set[str] = set()
+        self.length = 0
+        self._filename: Path | None = None
+        self._stat: tuple[int, int] | None = None
+
+        event_manager.subscribe(self._on_element_changed)
+        event_manager.subscribe(self._on_model_replaced)
+
+    def shutdown(self) -> None:
+        self.event_manager.unsubscribe(self._on_element_changed)
+        self.event_manager.unsubscribe(self._on_model_replaced)
+
+    def clear(self) -> None:
+        """Forget the last saved file: the next save is a full save."""
+        self.spans = {}
+        self.dirty = set()
+        self.length = 0
+        self._filename = None
+        self._stat = None
+
+    def begin(self) -> set[str]:
+        """Start saving.
+
+        Returns the ids of the elements changed since the last save.
+        Elements changed from now on are saved again next time.
+        """
+        dirty, self.dirty = self.dirty, set()
+        return dirty
+
+    def update(self, spans: dict[str, tuple[int, int]], length: int) -> None:
+        """Record the element positions of a model that has been written."""
+        self.spans = spans
+        self.length = length
+
+    def written(self, filename: str | os.PathLike) -> None:
+        """The model has been written to ``filename``."""
+        self._filename = Path(filename)
+        self._stat = _stat(self._filename)
+
+    def read(self, filename: str | os.PathLike) -> str | None:
+        """The contents of the previous model file, if the index applies to
+        ``filename``.
+
+        Returns ``None`` if the model has not been saved to this file
+        before, or if the file has been changed since.
+        """
+        filename = Path(filename)
+        if (
+            not self.spans
+            or filename != self._filename
+            or _stat(filename) != self._stat
+        ):
+            return None
+
+        try:
+            with open_model(filename) as f:
+                text = f.read()
+        except (OSError, ValueError):
+            log.warning("Could not read %s", filename, exc_info=True)
+            return None
+
+        return text if len(text) == self.length else None
+
+    @event_handler(ElementUpdated, RevertibleEvent, ElementCreated, ElementDeleted)
+    def _on_element_changed(self, event) -> None:
+        self.dirty.add(event.element.id)
+
+    @event_handler(ModelReady, ModelFlushed)
+    def _on_model_replaced(self, event) -> None:
+        self.clear()
+
+
+def _stat(filename: Path) -> tuple[int, int] | None:
+    try:
+        st = filename.stat()
+    except OSError:
+        return None
+    return st.st_size, st.st_mtime_ns
@@ -0,0 +1,110 @@
+"""Binary snapshots of parsed model files.
+
+A snapshot contains the element records of a model, as parsed from the
+XML file and after all upgrades have been applied. Reopening an
+unchanged model from a snapshot skips both XML parsing and upgrades.
+
+A snapshot is only used if it was written by the same snapshot format
+and for the exact same file contents. In all other cases the model is
+loaded from XML, as usual.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import marshal
+import os
+from pathlib import Path
+
+from gaphor.storage.parser import element
+
+__all__ = ["Snapshot"]
+
+log = logging.getLogger(__name__)
+
+MAGIC = b"GAPHOR-SNAPSHOT"
+FORMAT_VERSION = 1
+
+
+def content_hash(filename: str | os.PathLike) -> str:
+    """A hash of the contents of a file."""
+    digest = hashlib.blake2b(digest_size=24)
+    with open(filename, "rb") as f:
+        while chunk := f.read(2**20):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class Snapshot:
+    """A snapshot of a model file, stored in ``path``.
+
+    ``file_hash`` is the hash of the contents of the model file, as
+    computed by :func:`content_hash`.
+    """
+
+    def __init__(self, path: str | os.PathLike, file_hash: str):
+        self.path = Path(path)
+        self.file_hash = file_hash
+
+    @classmethod
+    def for_file(cls, filename: str | os.PathLike, path: str | os.PathLike):
+        return cls(path, content_hash(filename))
+
+    def _header(self) -> bytes:
+        return b"%s %d %d %s\n" % (
+            MAGIC,
+            FORMAT_VERSION,
+            marshal.version,
+            self.file_hash.encode("ascii"),
+        )
+
+    def load(self) -> tuple[dict[str, element], str] | None:
+        """Load element records and the Gaphor version they are compatible
+        with.
+
+        Returns ``None`` if there's no valid snapshot for the model
+        file.
+        """
+        try:
+            data = self.path.read_bytes()
+        except OSError:
+            return None
+
+        header = self._header()
+        if not data.startswith(header):
+            log.debug("Snapshot %s is outdated", self.path)
+            return None
+
+        try:
+            gaphor_version, records = marshal.loads(data[len(header) :])
+            elements = {}
+            for id, type, values, references in records:
+                elem = element(id, type)
+                elem.values = values
+                elem.references = references
+                elements[id] = elem
+        except (EOFError, ValueError, TypeError):
+            log.warning("Snapshot %s is corrupt", self.path, exc_info=True)
+            return None
+
+        return elements, gaphor_version
+
+    def save(self, elements: dict[str, element], gaphor_version: str) -> None:
+        """Save element records.
+
+        ``gaphor_version`` is the version of Gaphor the records are
+        compatible with, i.e. the records have been upgraded.
+        """
+        records = [
+            (elem.id, elem.type, elem.values, elem.references)
+            for elem in elements.values()
+        ]
+        tmp_path = self.path.with_name(f"{self.path.name}.tmp")
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(self._header())
+                marshal.dump((gaphor_version, records), f)
+            tmp_path.replace(self.path)
+        except (OSError, ValueError):
+            log.warning("Could not write snapshot %s", self.path, exc_info=True)
@@ -6,36 +6,82 @@ file. `save(file_obj)` stores the current model in a file.
 
 __all__ = ["load", "save"]
 
+import gzip
 import io
 import logging
-from functools import partial
+import os
+from dataclasses import dataclass
 from typing import Callable, Iterable
 
 from gaphor import application
 from gaphor.core.modeling import Diagram, Element, ElementFactory, Presentation
 from gaphor.core.modeling.collection import collection
 from gaphor.core.modeling.modelinglanguage import ModelingLanguage
+from gaphor.core.modeling.properties import association
 from gaphor.core.modeling.stylesheet import StyleSheet
 from gaphor.storage.parser import GaphorLoader, parse_generator, element
+from gaphor.storage.snapshot import Snapshot
 from gaphor.storage.xmlwriter import XMLWriter
 
 FILE_FORMAT_VERSION = "3.0"
 NAMESPACE_MODEL = "http://gaphor.sourceforge.net/model"
 
+# Number of characters written between progress updates while saving
+PROGRESS_INTERVAL = 2**18
+
+# Compressed models are gzip files
+GZIP_MAGIC = b"\x1f\x8b"
+COMPRESS_LEVEL = 1
+
 log = logging.getLogger(__name__)
 
 
-def save(out=None, element_factory=None, status_queue=None):
-    for status in save_generator(out, element_factory):
+def is_compressed(filename: str | os.PathLike) -> bool:
+    """Check if a model file is compressed."""
+    with open(filename, "rb") as f:
+        return f.read(len(GZIP_MAGIC)) == GZIP_MAGIC
+
+
+def open_model(filename: str | os.PathLike, errors: str = "strict") -> io.TextIOBase:
+    """Open a model file for reading.
+
+    Compressed models are detected and decompressed while reading.
+    """
+    if is_compressed(filename):
+        return gzip.open(filename, "rt", encoding="utf-8", errors=errors)  # type: ignore[return-value]
+    return open(filename, encoding="utf-8", errors=errors)
+
+
+def create_model(
+    filename: str | os.PathLike, compressed: bool = False
+) -> io.TextIOBase:
+    """Create a model file for writing, optionally compressed."""
+    if compressed:
+        return gzip.open(filename, "wt", encoding="utf-8", compresslevel=COMPRESS_LEVEL)  # type: ignore[return-value]
+    return open(filename, "w", encoding="utf-8")
+
+
+def save(out=None, element_factory=None, status_queue=None, index=None, previous=None):
+    for status in save_generator(out, element_factory, index, previous):
         if status_queue:
             status_queue(status)
 
 
-def save_generator(out, element_factory):
+def save_generator(out, element_factory, index=None, previous=None):
     """Save the current model using @writer, which is a
-    gaphor.storage.xmlwriter.XMLWriter instance."""
+    gaphor.storage.xmlwriter.XMLWriter instance.
+
+    The model is written in one pass. Progress is reported every
+    ``PROGRESS_INTERVAL`` characters written, so large elements do not
+    hold up the caller.
 
-    writer = XMLWriter(out)
+    If a :class:`~gaphor.storage.saveindex.SaveIndex` is provided, the
+    position of each element is recorded in ``index``. ``previous`` is
+    the text of the model file the index refers to. Elements that did
+    not change since are copied from it, instead of saved again.
+    """
+
+    writer = XMLWriter(out, buffered=True)
     writer.startDocument()
     writer.startPrefixMapping("", NAMESPACE_MODEL)
     writer.startElementNS(
@@ -47,22 +93,45 @@ def save_generator(out, element_factory):
         },
     )
 
+    element_factory.load_deferred()
+    save_func = element_saver(element_factory, writer)
     size = element_factory.size()
+    next_progress = PROGRESS_INTERVAL
+    if index is not None:
+        old_spans = index.spans if previous is not None else {}
+        dirty = index.begin()
+        spans = {}
     for n, e in enumerate(element_factory.values(), start=1):
-        clazz = e.__class__.__name__
-        assert e.id
-        writer.startElement(clazz, {"id": str(e.id)})
-        e.save(partial(save_element, element_factory=element_factory, writer=writer))
-        writer.endElement(clazz)
+        if index is not None:
+            start = writer.mark()
+            if (span := old_spans.get(e.id)) and e.id not in dirty:
+                writer.fragment(previous[span[0] : span[1]])
+            else:
+                save_element_block(e, writer, save_func)
+            spans[e.id] = (start, writer.position)
+        else:
+            save_element_block(e, writer, save_func)
 
-        if n % 25 == 0:
+        if writer.written >= next_progress:
+            next_progress = writer.written + PROGRESS_INTERVAL
             yield (n * 100) / size
 
     writer.endElementNS((NAMESPACE_MODEL, "gaphor"), None)
     writer.endPrefixMapping("")
+    if index is not None:
+        index.update(spans, writer.position)
     writer.endDocument()
 
 
+def save_element_block(element, writer, save_func):
+    """Write an element, with its attributes and references."""
+    clazz = element.__class__.__name__
+    assert element.id
+    writer.startElement(clazz, {"id": str(element.id)})
+    element.save(save_func)
+    writer.endElement(clazz)
+
+
 def save_element(name, value, element_factory, writer):
     """Save attributes and references from items in the gaphor.UML module.
 
@@ -70,9 +139,19 @@ def save_element(name, value, element_factory, writer):
     gaphor.core.modeling.collection (which contains a list of references
     to other UML elements) or a Diagram (which contains diagram items).
     """
+    element_saver(element_factory, writer)(name, value)
+
+
+def element_saver(element_factory, writer):
+    """Create a function that saves attributes and references, as
+    called from ``Element.save()``.
+
+    See :func:`save_element`.
+    """
 
     def resolvable(value):
-        if value.id and value in element_factory:
+        # Elements are live as long as they belong to the model.
+        if value._model is element_factory or (value.id and value in element_factory):
             return True
         log.warning(
             f"Model has unknown reference {value.id}. Reference will be skipped."
@@ -85,47 +164,39 @@ def save_element(name, value, element_factory, writer):
         This applies to both UML and canvas items.
         """
         if resolvable(value):
-            writer.startElement(name, {})
-            writer.startElement("ref", {"refid": value.id})
-            writer.endElement("ref")
-            writer.endElement(name)
+            writer.reference(name, value.id)
 
     def save_collection(name, value):
         """Save a list of references."""
-        if value:
-            writer.startElement(name, {})
-            writer.startElement("reflist", {})
-            for v in value:
-                if resolvable(v):
-                    writer.startElement("ref", {"refid": v.id})
-                    writer.endElement("ref")
-            writer.endElement("reflist")
-            writer.endElement(name)
+        if items := value.items:
+            writer.references(name, (v.id for v in items if resolvable(v)))
 
     def save_value(name, value):
         """Save a value (attribute)."""
         if value is not None:
-            writer.startElement(name, {})
-            writer.startElement("val", {})
-            if isinstance(value, bool):
-                # Write booleans as 0/1.
-                writer.characters(str(int(value)))
-            else:
-                writer.characters(str(value))
-            writer.endElement("val")
-            writer.endElement(name)
-
-    if isinstance(value, Element):
-        save_reference(name, value)
-    elif isinstance(value, collection):
-        save_collection(name, value)
-    else:
-        save_value(name, value)
+            # Write booleans as 0/1.
+            writer.value(name, str(int(value) if isinstance(value, bool) else value))
+
+    def save_func(name, value):
+        if isinstance(value, Element):
+            save_reference(name, value)
+        elif isinstance(value, collection):
+            save_collection(name, value)
+        else:
+            save_value(name, value)
 
+    return save_func
 
-def load_elements(elements, element_factory, modeling_language, gaphor_version="1.0.0"):
+
+def load_elements(
+    elements,
+    element_factory,
+    modeling_language,
+    gaphor_version="1.0.0",
+    lazy=False,
+):
     for _ in load_elements_generator(
-        elements, element_factory, modeling_language, gaphor_version
+        elements, element_factory, modeling_language, gaphor_version, lazy
     ):
         pass
 
@@ -135,13 +206,22 @@ def load_elements_generator(
     element_factory: ElementFactory,
     modeling_language: ModelingLanguage,
     gaphor_version: str,
+    lazy: bool = False,
 ) -> Iterable[float]:
     """Load a file and create a model if possible.
 
+    If ``lazy`` is set, only model elements and diagrams are created.
+    The presentation items of a diagram are created once the diagram's
+    ``ownedPresentation``, or an element's ``presentation``, is accessed.
+
+    Element records are released once they have been loaded.
+
     Exceptions: IOError, ValueError.
     """
     log.debug(f"Loading {len(elements)} elements")
 
+    upgrade_elements(elements, gaphor_version)
+
     # The elements are iterated three times:
     size = len(elements) * 3
     progress = 0
@@ -152,53 +232,50 @@ def load_elements_generator(
         if progress % 30 == 0:
             yield (progress * 100) / size
 
+    deferred: dict[str, list[element]] | None = {} if lazy else None
+    deferred_references: dict[tuple[Element, str], list[str]] = {}
+    order: list[str] = []
+
     # First create elements and canvas items in the factory
     # The elements are stored as attribute 'element' on the parser objects:
     yield from _load_elements_and_canvasitems(
         elements,
         element_factory,
         modeling_language,
-        gaphor_version,
         update_status_queue,
+        deferred,
+        order if lazy else None,
+    )
+    yield from _load_attributes_and_references(
+        elements, update_status_queue, deferred_references
     )
-    yield from _load_attributes_and_references(elements, update_status_queue)
 
     upgrade_ensure_style_sheet_is_present(element_factory)
 
     for _id, elem in list(elements.items()):
         yield from update_status_queue()
-        assert elem.element
-        elem.element.postload()
+        if elem.element:
+            elem.element.postload()
+
+    if deferred:
+        deferred_presentation = DeferredPresentation(
+            deferred, order, element_factory, modeling_language
+        )
+        _defer_presentation(deferred_presentation, deferred_references)
+        element_factory.defer(deferred_presentation)
 
 
 def _load_elements_and_canvasitems(
     elements: dict[str, element],
     element_factory: ElementFactory,
     modeling_language: ModelingLanguage,
-    gaphor_version: str,
     update_status_queue: Callable[[], Iterable[float]],
+    deferred: dict[str, list[element]] | None = None,
+    order: list[str] | None = None,
 ):
     def create_element(elem):
         if elem.element:
             return
-        if version_lower_than(gaphor_version, (2, 1, 0)):
-            elem = upgrade_element_owned_comment_to_comment(elem)
-        if version_lower_than(gaphor_version, (2, 3, 0)):
-            elem = upgrade_package_owned_classifier_to_owned_type(elem)
-            elem = upgrade_implementation_to_interface_realization(elem)
-            elem = upgrade_feature_parameters_to_owned_parameter(elem)
-            elem = upgrade_parameter_owner_formal_param(elem)
-        if version_lower_than(gaphor_version, (2, 5, 0)):
-            elem = upgrade_diagram_element(elem)
-        if version_lower_than(gaphor_version, (2, 6, 0)):
-            elem = upgrade_generalization_arrow_direction(elem)
-        if version_lower_than(gaphor_version, (2, 9, 0)):
-            elem = upgrade_flow_item_to_control_flow_item(elem, elements)
-        if version_lower_than(gaphor_version, (2, 19, 0)):
-            elem = upgrade_delete_property_information_flow(elem)
-            elem = upgrade_decision_node_item_show_type(elem)
-        if version_lower_than(gaphor_version, (2, 20, 0)):
-            elem = upgrade_note_on_model_element_only(elem, elements)
         if not (cls := modeling_language.lookup_element(elem.type)):
             raise UnknownModelElementError(
                 f"Type {elem.type} cannot be loaded: no such element"
@@ -217,29 +294,40 @@ def _load_elements_and_canvasitems(
             diagram_elem = elements[diagram_id]
             create_element(diagram_elem)
             assert isinstance(diagram_elem.element, Diagram)
-            elem.element = element_factory.create_as(cls, elem.id, diagram_elem.element)
+            if deferred is not None:
+                deferred.setdefault(diagram_id, []).append(elem)
+            else:
+                elem.element = element_factory.create_as(
+                    cls, elem.id, diagram_elem.element
+                )
         else:
             elem.element = element_factory.create_as(cls, elem.id)
 
+        if order is not None:
+            order.append(elem.id)
+
     for _id, elem in list(elements.items()):
         yield from update_status_queue()
         create_element(elem)
 
 
-def _load_attributes_and_references(elements, update_status_queue):
+def _load_attributes_and_references(
+    elements, update_status_queue, deferred_references=None
+):
     for _id, elem in list(elements.items()):
         yield from update_status_queue()
-        # Ensure that all elements have their element instance ready...
-        assert elem.element
+        if not elem.element:
+            # Deferred presentation item
+            continue
 
         # load attributes and references:
-        for name, value in list(elem.values.items()):
+        for name, value in elem.values.items():
             try:
                 elem.element.load(name, value)
             except AttributeError:
                 log.exception(f"Invalid attribute name {elem.type}.{name}")
 
-        for name, refids in list(elem.references.items()):
+        for name, refids in elem.references.items():
             if isinstance(refids, list):
                 for refid in refids:
                     try:
@@ -249,25 +337,201 @@ def _load_attributes_and_references(elements, update_status_queue):
                             f"Invalid ID for reference ({refid}) for element {elem.type}.{name}"
                         )
                     else:
-                        elem.element.load(name, ref.element)
+                        if ref.element:
+                            elem.element.load(name, ref.element)
+                        else:
+                            deferred_references[elem.element, name] = refids
             else:
                 try:
                     ref = elements[refids]
                 except KeyError:
                     log.exception(f"Invalid ID for reference ({refids})")
                 else:
-                    elem.element.load(name, ref.element)
+                    if ref.element:
+                        elem.element.load(name, ref.element)
+
+        elem.release()
+
+
+class DeferredPresentation:
+    """Presentation items of diagrams, that are created on demand.
+
+    ``records`` maps diagram ids to the element records of the
+    presentation items on the diagram. ``order`` contains the ids of
+    all elements, in the order they would have been created if loaded
+    at once. ``diagram_of`` maps the ids of items that are not loaded
+    yet to the id of their diagram.
+    """
+
+    def __init__(
+        self,
+        records: dict[str, list[element]],
+        order: list[str],
+        element_factory: ElementFactory,
+        modeling_language: ModelingLanguage,
+    ):
+        self.records = records
+        self.order = order
+        self.diagram_of = {
+            elem.id: diagram_id
+            for diagram_id, diagram_records in records.items()
+            for elem in diagram_records
+        }
+        self.element_factory = element_factory
+        self.modeling_language = modeling_language
+        self._loading = False
+
+    def loader(
+        self, diagram_ids: Iterable[str], refids: list[str] | None = None
+    ) -> Callable[[list[Element]], bool]:
+        """A loader for :meth:`association.defer`.
+
+        Items are ordered by ``refids``, the references as they were
+        saved.
+        """
+
+        def load(items: list[Element]) -> bool:
+            if not all(self.load(diagram_id) for diagram_id in diagram_ids):
+                return False
+            if refids:
+                position = {refid: n for n, refid in enumerate(refids)}
+                items.sort(key=lambda e: position.get(e.id, len(position)))
+            return True
+
+        return load
+
+    def load(self, diagram_id: str) -> bool:
+        """Create the presentation items of a diagram.
+
+        Returns ``False`` if items can not be created right now, because
+        another diagram is being loaded.
+        """
+        if self._loading:
+            return False
+        if (records := self.records.pop(diagram_id, None)) is None:
+            return True
+        for elem in records:
+            del self.diagram_of[elem.id]
+
+        diagram = self.element_factory.lookup(diagram_id)
+        if not isinstance(diagram, Diagram):
+            # The diagram has been removed in the mean time
+            return True
+
+        self._loading = True
+        try:
+            with self.element_factory.block_events():
+                loaded = self._load(diagram, records)
+        finally:
+            self._loading = False
+
+        if element_dispatcher := self.element_factory.element_dispatcher:
+            element_dispatcher.reconnect(loaded)
+        return True
+
+    def load_element(self, id: str) -> None:
+        """Create the item with ``id``, and the other items on its
+        diagram."""
+        if diagram_id := self.diagram_of.get(id):
+            self.load(diagram_id)
+
+    def load_all(self) -> None:
+        """Create all remaining items.
+
+        Elements are put back in load order, so a saved model is not
+        shuffled by the order in which diagrams have been opened.
+        """
+        for diagram_id in list(self.records):
+            self.load(diagram_id)
+        self.element_factory.reorder(self.order)
+
+    def discard(self) -> None:
+        self.records.clear()
+        self.diagram_of.clear()
+
+    def _load(self, diagram: Diagram, records: list[element]) -> set[Element]:
+        """Create items, and return the items and the elements they
+        reference."""
+        element_factory = self.element_factory
+        lookup = element_factory.lookup
+        referenced: set[Element] = {diagram}
+
+        log.debug(f"Loading {len(records)} items of diagram {diagram.name}")
+
+        loaded: list[tuple[element, Element]] = []
+        for elem in records:
+            subject_id = elem.references.get("subject")
+            if isinstance(subject_id, str) and not lookup(subject_id):
+                # Subject has been removed, and the item with it
+                continue
+            cls = self.modeling_language.lookup_element(elem.type)
+            elem.element = element_factory.create_as(cls, elem.id, diagram)  # type: ignore[arg-type]
+            loaded.append((elem, elem.element))
+            referenced.add(elem.element)
+
+        for elem, item in loaded:
+            for name, value in elem.values.items():
+                try:
+                    item.load(name, value)
+                except AttributeError:
+                    log.exception(f"Invalid attribute name {elem.type}.{name}")
+
+            for name, refids in elem.references.items():
+                for refid in refids if isinstance(refids, list) else [refids]:
+                    if ref := lookup(refid):
+                        item.load(name, ref)
+                        referenced.add(ref)
+
+        for _elem, item in loaded:
+            item.postload()
+        diagram.postload()
+
+        return referenced
+
+
+def _defer_presentation(
+    deferred: DeferredPresentation,
+    deferred_references: dict[tuple[Element, str], list[str]],
+) -> None:
+    diagram_of = dict(deferred.diagram_of)
+    for (owner, name), refids in deferred_references.items():
+        diagram_ids = {diagram_of[refid] for refid in refids if refid in diagram_of}
+        prop = getattr(type(owner), name)
+        if prop is Diagram.ownedPresentation:
+            # A diagram orders its items when they're loaded
+            prop.defer(owner, deferred.loader(diagram_ids))
+        elif isinstance(prop, association) and prop.upper != 1:
+            prop.defer(owner, deferred.loader(diagram_ids, refids))
+        else:
+            for diagram_id in diagram_ids:
+                deferred.load(diagram_id)
+
+    # Diagrams that do not reference (all of) their items
+    owned_presentation: association = Diagram.ownedPresentation  # type: ignore[assignment]
+    for diagram_id in deferred.records:
+        diagram = deferred.element_factory.lookup(diagram_id)
+        assert isinstance(diagram, Diagram)
+        if (diagram, "ownedPresentation") not in deferred_references:
+            owned_presentation.defer(diagram, deferred.loader([diagram_id]))
 
 
 def load(
-    file_obj: io.TextIOBase, element_factory, modeling_language, status_queue=None
+    file_obj: io.TextIOBase,
+    element_factory,
+    modeling_language,
+    status_queue=None,
+    snapshot: Snapshot | None = None,
+    lazy: bool = False,
+    journal: list | None = None,
 ):
     """Load a file and create a model if possible.
 
     Optionally, a status queue function can be given, to which the
     progress is written (as status_queue(progress)).
     """
-    for status in load_generator(file_obj, element_factory, modeling_language):
+    for status in load_generator(
+        file_obj, element_factory, modeling_language, snapshot, lazy, journal
+    ):
         if status_queue:
             status_queue(status)
 
@@ -276,24 +540,42 @@ def load_generator(
     file_obj: io.TextIOBase,
     element_factory: ElementFactory,
     modeling_language: ModelingLanguage,
+    snapshot: Snapshot | None = None,
+    lazy: bool = False,
+    journal: list | None = None,
 ) -> Iterable[int]:
     """Load a file and create a model if possible.
 
     This function is a generator. It will yield values from 0 to 100 (%)
     to indicate its progression.
+
+    If a snapshot is provided, the model is loaded from the snapshot
+    if it matches the file. Otherwise the file is parsed, and the
+    snapshot is updated once the model is loaded.
+
+    If ``lazy`` is set, presentation items are created when their
+    diagram is first used. See :func:`load_elements_generator`.
+
+    ``journal`` contains journal entries, with changes made to the
+    model after it was saved. See :mod:`gaphor.storage.journal`.
     """
     assert isinstance(file_obj, io.TextIOBase)
 
-    # Use the incremental parser and yield the percentage of the file.
-    loader = GaphorLoader()
-    for percentage in parse_generator(file_obj, loader):
-        if percentage:
-            yield percentage / 2
-        else:
-            yield percentage
+    if snapshot and (records := snapshot.load()):
+        elements, gaphor_version = records
+        snapshot = None
+        yield 50
+    else:
+        # Use the incremental parser and yield the percentage of the file.
+        loader = GaphorLoader()
+        for percentage in parse_generator(file_obj, loader):
+            if percentage:
+                yield percentage / 2
+            else:
+                yield percentage
 
-    elements = loader.elements
-    gaphor_version = loader.gaphor_version
+        elements = loader.elements
+        gaphor_version = loader.gaphor_version
 
     if version_lower_than(gaphor_version, (0, 17, 0)):
         raise ValueError(
@@ -302,18 +584,28 @@ def load_generator(
 
     log.info(f"Read {len(elements)} elements from file")
 
+    if snapshot:
+        # Records are released while loading: save them first
+        gaphor_version = upgrade_elements(elements, gaphor_version)
+        snapshot.save(elements, gaphor_version)
+
+    if journal:
+        from gaphor.storage.journal import replay
+
+        gaphor_version = upgrade_elements(elements, gaphor_version)
+        replay(elements, journal)
+
     element_factory.flush()
-    with element_factory.block_events():
+    with element_factory.bulk_load():
         for percentage in load_elements_generator(
-            elements, element_factory, modeling_language, gaphor_version
+            elements, element_factory, modeling_language, gaphor_version, lazy
         ):
             if percentage:
                 yield percentage / 2 + 50
             else:
                 yield percentage
 
-    yield 100
-    element_factory.model_ready()
+        yield 100
 
 
 def version_lower_than(gaphor_version, version):
@@ -331,129 +623,162 @@ class UnknownModelElementError(Exception):
     pass
 
 
+@dataclass(frozen=True)
+class UpgradeStep:
+    """Upgrade element records of models saved before ``version``.
+
+    A step applies to elements of one of ``types``, and to elements
+    with a value or reference named after one of ``keys``.
+    """
+
+    version: tuple[int, int]
+    upgrade: Callable[[element, dict[str, element]], element]
+    types: frozenset[str] = frozenset()
+    keys: frozenset[str] = frozenset()
+
+    def applies_to(self, elem: element) -> bool:
+        keys = self.keys
+        return (
+            elem.type in self.types
+            or not keys.isdisjoint(elem.values)
+            or not keys.isdisjoint(elem.references)
+        )
+
+
+UPGRADE_STEPS: list[UpgradeStep] = []
+
+
+def upgrade_step(
+    version: tuple[int, int],
+    types: Iterable[str] = (),
+    keys: Iterable[str] = (),
+):
+    """Register an upgrade function for models saved before ``version``."""
+
+    def register(func):
+        UPGRADE_STEPS.append(
+            UpgradeStep(version, func, frozenset(types), frozenset(keys))
+        )
+        return func
+
+    return register
+
+
+def applicable_upgrade_steps(gaphor_version: str) -> list[UpgradeStep]:
+    """The upgrade steps for a model saved by ``gaphor_version``, in the
+    order they should be applied."""
+    return sorted(
+        (
+            step
+            for step in UPGRADE_STEPS
+            if version_lower_than(gaphor_version, step.version)
+        ),
+        key=lambda step: step.version,
+    )
+
+
 # since 2.2.0
+def upgrade_elements(elements: dict[str, element], gaphor_version: str) -> str:
+    """Upgrade element records of a model saved by ``gaphor_version``.
+
+    Returns the version the records are compatible with.
+    """
+    if upgrade_steps := applicable_upgrade_steps(gaphor_version):
+        for elem in list(elements.values()):
+            for step in upgrade_steps:
+                if step.applies_to(elem):
+                    elem = step.upgrade(elem, elements)
+    version: str = application.distribution().version
+    return version
+
+
 def upgrade_ensure_style_sheet_is_present(factory):
     style_sheet = next(factory.select(StyleSheet), None)
     if not style_sheet:
         factory.create(StyleSheet)
 
 
-# since 2.1.0
-def upgrade_element_owned_comment_to_comment(elem):
-    for name, refids in dict(elem.references).items():
-        if name == "ownedComment":
-            elem.references["comment"] = refids
-            del elem.references["ownedComment"]
-            break
+@upgrade_step((2, 1), keys=["ownedComment"])
+def upgrade_element_owned_comment_to_comment(elem, elements):
+    elem.references["comment"] = elem.references.pop("ownedComment")
     return elem
 
 
-# since 2.3.0
-def upgrade_package_owned_classifier_to_owned_type(elem):
-    for name, refids in dict(elem.references).items():
-        if name == "ownedClassifier":
-            elem.references["ownedType"] = refids
-            del elem.references["ownedClassifier"]
-            break
+@upgrade_step((2, 3), keys=["ownedClassifier"])
+def upgrade_package_owned_classifier_to_owned_type(elem, elements):
+    elem.references["ownedType"] = elem.references.pop("ownedClassifier")
     return elem
 
 
-# since 2.3.0
-def upgrade_implementation_to_interface_realization(elem):
-    if elem.type == "Implementation":
-        elem.type = "InterfaceRealization"
+@upgrade_step((2, 3), types=["Implementation"])
+def upgrade_implementation_to_interface_realization(elem, elements):
+    elem.type = "InterfaceRealization"
     return elem
 
 
-# since 2.3.0
-def upgrade_feature_parameters_to_owned_parameter(elem):
-    formal_params = []
-    return_results = []
-    for name, refids in dict(elem.references).items():
-        if name == "formalParameter":
-            formal_params = refids
-            del elem.references["formalParameter"]
-        elif name == "returnResult":
-            return_results = refids
-            del elem.references["returnResult"]
+@upgrade_step((2, 3), keys=["formalParameter", "returnResult"])
+def upgrade_feature_parameters_to_owned_parameter(elem, elements):
+    formal_params = elem.references.pop("formalParameter", [])
+    return_results = elem.references.pop("returnResult", [])
     elem.references["ownedParameter"] = formal_params + return_results
     return elem
 
 
-# since 2.3.0
-def upgrade_parameter_owner_formal_param(elem):
-    for name, refids in dict(elem.references).items():
-        if name == "ownerReturnParam":
-            elem.references["ownerFormalParam"] = refids
-            del elem.references["ownerReturnParam"]
-            break
+@upgrade_step((2, 3), keys=["ownerReturnParam"])
+def upgrade_parameter_owner_formal_param(elem, elements):
+    elem.references["ownerFormalParam"] = elem.references.pop("ownerReturnParam")
     return elem
 
 
-# since 2.5.0
-def upgrade_diagram_element(elem):
-    if elem.type == "Diagram":
-        for name, refids in dict(elem.references).items():
-            if name == "package":
-                elem.references["element"] = refids
-                del elem.references["package"]
-                break
+@upgrade_step((2, 5), types=["Diagram"])
+def upgrade_diagram_element(elem, elements):
+    if "package" in elem.references:
+        elem.references["element"] = elem.references.pop("package")
     return elem
 
 
-# since 2.6.0
-def upgrade_generalization_arrow_direction(elem):
-    if elem.type == "GeneralizationItem":
-        head_ids, tail_ids = 0, 0
-        for name, refids in dict(elem.references).items():
-            if name == "head-connection":
-                head_ids = refids
-            elif name == "tail-connection":
-                tail_ids = refids
-        if head_ids and tail_ids:
-            elem.references["head-connection"], elem.references["tail-connection"] = (
-                tail_ids,
-                head_ids,
-            )
+@upgrade_step((2, 6), types=["GeneralizationItem"])
+def upgrade_generalization_arrow_direction(elem, elements):
+    head_ids = elem.references.get("head-connection")
+    tail_ids = elem.references.get("tail-connection")
+    if head_ids and tail_ids:
+        elem.references["head-connection"], elem.references["tail-connection"] = (
+            tail_ids,
+            head_ids,
+        )
     return elem
 
 
-# since 2.19.0
-def upgrade_decision_node_item_show_type(elem):
-    if elem.type == "DecisionNodeItem":
-        if "show_type" in elem.values:
-            elem.values["show_underlying_type"] = elem.values["show_type"]
-            del elem.values["show_type"]
+@upgrade_step((2, 19), types=["DecisionNodeItem"])
+def upgrade_decision_node_item_show_type(elem, elements):
+    if "show_type" in elem.values:
+        elem.values["show_underlying_type"] = elem.values.pop("show_type")
     return elem
 
 
-# since 2.9.0
+@upgrade_step((2, 9), types=["FlowItem"])
 def upgrade_flow_item_to_control_flow_item(elem, elements):
-    if elem.type == "FlowItem":
-        if subject_id := elem.references.get("subject"):
-            subject_type = elements[subject_id].type
-        else:
-            subject_type = "ControlFlow"
+    if subject_id := elem.references.get("subject"):
+        subject_type = elements[subject_id].type
+    else:
+        subject_type = "ControlFlow"
 
-        elem.type = f"{subject_type}Item"
+    elem.type = f"{subject_type}Item"
     return elem
 
 
-# since 2.19.0
-def upgrade_delete_property_information_flow(elem):
-    if (
-        elem.type in ("Property", "Port", "ProxyPort")
-        and "informationFlow" in elem.references
-    ):
+@upgrade_step((2, 19), types=["Property", "Port", "ProxyPort"])
+def upgrade_delete_property_information_flow(elem, elements):
+    if "informationFlow" in elem.references:
         del elem.references["informationFlow"]
     return elem
 
 
-# since 2.20.0
+@upgrade_step((2, 20), keys=["note"])
 def upgrade_note_on_model_element_only(
     elem: element, elements: dict[str, element]
 ) -> element:
-    if elem.type.endswith("Item") and "note" in elem.values:
+    if elem.type.endswith("Item"):
         if subject := elements.get(elem.references.get("subject", None)):  # type: ignore[arg-type]
             if subject.values.get("note"):
                 subject.values["note"] += "\n\n" + elem.values["note"]
@@ -0,0 +1,188 @@
+from io import StringIO
+
+import pytest
+
+from gaphor import UML
+from gaphor.core.modeling import Diagram, ElementFactory
+from gaphor.services.undomanager import UndoManager
+from gaphor.storage import storage
+from gaphor.storage.journal import Journal, read_journal
+from gaphor.storage.snapshot import content_hash
+from gaphor.transaction import Transaction
+from gaphor.UML.classes import ClassItem
+
+
+@pytest.fixture
+def model_file(element_factory, modeling_language, test_models, tmp_path):
+    with open(test_models / "all-elements-v2.5.gaphor", encoding="utf-8") as f:
+        storage.load(f, element_factory, modeling_language)
+
+    model_file = tmp_path / "model.gaphor"
+    with storage.create_model(model_file) as out:
+        storage.save(out, element_factory)
+    return model_file
+
+
+@pytest.fixture
+def journal(event_manager, element_factory, model_file, tmp_path):
+    journal = Journal(event_manager, element_factory)
+    journal.open(tmp_path / "model.journal", content_hash(model_file))
+    yield journal
+    journal.shutdown()
+
+
+@pytest.fixture
+def undo_manager(event_manager, element_factory):
+    undo_manager = UndoManager(event_manager, element_factory)
+    yield undo_manager
+    undo_manager.shutdown()
+
+
+def full_save(element_factory):
+    out = StringIO()
+    storage.save(out, element_factory)
+    return out.getvalue()
+
+
+def reload(element_factory, modeling_language):
+    """The model as it's loaded from a file: presentation items may be
+    ordered differently."""
+    reloaded = ElementFactory()
+    storage.load(StringIO(full_save(element_factory)), reloaded, modeling_language)
+    return full_save(reloaded)
+
+
+def recover(model_file, journal, modeling_language):
+    journal.flush()
+    entries = read_journal(journal.path, content_hash(model_file))
+    element_factory = ElementFactory()
+    with open(model_file, encoding="utf-8") as f:
+        storage.load(f, element_factory, modeling_language, journal=entries)
+    return element_factory
+
+
+def rename(element_factory):
+    class_ = next(element_factory.select(UML.Class))
+    class_.name = f"{class_.name}!"
+
+
+def create(element_factory):
+    element_factory.create(UML.Class).name = "New"
+
+
+def delete(element_factory):
+    next(element_factory.select(UML.Class)).unlink()
+
+
+def move_item(element_factory):
+    next(element_factory.select(ClassItem)).matrix.translate(10, 10)
+
+
+def delete_diagram(element_factory):
+    next(element_factory.select(Diagram)).unlink()
+
+
+@pytest.mark.parametrize("change", [rename, create, delete, move_item, delete_diagram])
+def test_recover_change(
+    element_factory, event_manager, modeling_language, model_file, journal, change
+):
+    with Transaction(event_manager):
+        change(element_factory)
+
+    recovered = recover(model_file, journal, modeling_language)
+
+    assert full_save(recovered) == reload(element_factory, modeling_language)
+
+
+def test_recover_many_changes(
+    element_factory, event_manager, modeling_language, model_file, journal
+):
+    for change in [rename, move_item, create, delete, delete_diagram]:
+        with Transaction(event_manager):
+            change(element_factory)
+
+    recovered = recover(model_file, journal, modeling_language)
+
+    assert full_save(recovered) == reload(element_factory, modeling_language)
+
+
+def test_recover_undone_delete(
+    element_factory,
+    event_manager,
+    modeling_language,
+    model_file,
+    journal,
+    undo_manager,
+):
+    with Transaction(event_manager):
+        delete_diagram(element_factory)
+    undo_manager.undo_transaction()
+
+    recovered = recover(model_file, journal, modeling_language)
+
+    assert full_save(recovered) == reload(element_factory, modeling_language)
+
+
+def test_changes_are_recorded_per_transaction(
+    element_factory, event_manager, model_file, journal
+):
+    for _ in range(3):
+        with Transaction(event_manager):
+            rename(element_factory)
+    journal.flush()
+
+    assert len(read_journal(journal.path, content_hash(model_file))) == 3
+
+
+def test_nothing_is_recorded_before_open(
+    element_factory, event_manager, model_file, tmp_path
+):
+    journal = Journal(event_manager, element_factory)
+    with Transaction(event_manager):
+        rename(element_factory)
+    journal.open(tmp_path / "model.journal", content_hash(model_file))
+    journal.flush()
+
+    assert read_journal(journal.path, content_hash(model_file)) == []
+    journal.shutdown()
+
+
+def test_incomplete_entry_is_ignored(
+    element_factory, event_manager, model_file, journal
+):
+    for _ in range(2):
+        with Transaction(event_manager):
+            rename(element_factory)
+    journal.flush()
+    path = journal.path
+    journal.close()
+    path.write_bytes(path.read_bytes()[:-1])
+
+    assert len(read_journal(path, content_hash(model_file))) == 1
+
+
+def test_journal_for_other_file_contents(element_factory, event_manager, journal):
+    with Transaction(event_manager):
+        rename(element_factory)
+    journal.flush()
+
+    assert read_journal(journal.path, "other hash") == []
+
+
+def test_journal_is_appended_to(element_factory, event_manager, model_file, journal):
+    with Transaction(event_manager):
+        rename(element_factory)
+    path = journal.path
+    journal.open(path, content_hash(model_file), append=True)
+    with Transaction(event_manager):
+        rename(element_factory)
+    journal.flush()
+
+    assert len(read_journal(path, content_hash(model_file))) == 2
+
+
+def test_close_and_remove_journal(journal):
+    path = journal.path
+    journal.close(remove=True)
+
+    assert not path.exists()
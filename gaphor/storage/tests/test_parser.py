@@ -1,6 +1,15 @@
 from io import StringIO
 
-from gaphor.storage.parser import parse
+import pytest
+
+from gaphor.storage.parser import (
+    GaphorLoader,
+    MergeConflictDetected,
+    element,
+    new_parser,
+    parse,
+    parse_generator,
+)
 
 
 def test_parsing_v2_1_model_with_grouped_item(test_models):
@@ -60,3 +69,98 @@ def test_parsing_of_xml_external_entities_should_fail(test_models):
 
     assert elements
     assert elements["0"].values["name"] == ""
+
+
+def sax_parse(file_obj):
+    loader = GaphorLoader()
+    parser = new_parser(loader)
+    for line in file_obj:
+        parser.feed(line)
+    parser.close()
+    return loader.elements
+
+
+def records(elements):
+    return [(e.id, e.type, e.values, e.references) for e in elements.values()]
+
+
+@pytest.mark.parametrize(
+    "model",
+    [
+        "all-elements.gaphor",
+        "node-component-v2.1.gaphor",
+        "test-model.gaphor",
+    ],
+)
+def test_parser_creates_same_records_as_sax_parser(test_models, model):
+    with (test_models / model).open(encoding="utf-8") as f:
+        elements = parse(f)
+        f.seek(0)
+        sax_elements = sax_parse(f)
+
+    assert records(elements) == records(sax_elements)
+
+
+def test_parsing_in_small_chunks(test_models):
+    loader = GaphorLoader()
+    with (test_models / "test-model.gaphor").open(encoding="utf-8") as f:
+        for _ in parse_generator(f, loader, chunk_size=7):
+            pass
+        f.seek(0)
+        sax_elements = sax_parse(f)
+
+    assert records(loader.elements) == records(sax_elements)
+
+
+MERGE_CONFLICT = """<?xml version="1.0" encoding="utf-8"?>
+<gaphor xmlns="http://gaphor.sourceforge.net/model" version="3.0">
+<Diagram id="58d6c536-66f8-11ec-b4c8-0456e5e540ed">
+<name>
+<<<<<<< HEAD
+<val>old</val>
+=======
+<val>new</val>
+>>>>>>> 12345678 (incoming change)
+</name>
+</Diagram>
+</gaphor>
+"""
+
+
+@pytest.mark.parametrize("split", range(1, 8))
+def test_merge_conflict_marker_split_over_chunks(split):
+    chunk_size = MERGE_CONFLICT.index("\n<<<<<<<") + split
+    loader = GaphorLoader()
+
+    with pytest.raises(MergeConflictDetected):
+        for _ in parse_generator(StringIO(MERGE_CONFLICT), loader, chunk_size):
+            pass
+
+
+def test_references_share_element_ids(test_models):
+    with (test_models / "all-elements.gaphor").open(encoding="utf-8") as f:
+        elements = parse(f)
+
+    for elem in elements.values():
+        for refids in elem.references.values():
+            for refid in refids if isinstance(refids, list) else [refids]:
+                if refid in elements:
+                    assert refid is elements[refid].id
+
+
+def test_records_have_no_instance_dict():
+    elem = element("1", "Class")
+
+    with pytest.raises(AttributeError):
+        elem.foo = "bar"  # type: ignore[attr-defined]
+
+
+def test_release_record():
+    elem = element("1", "Class")
+    elem.values["name"] = "Foo"
+    elem.references["ownedAttribute"] = ["2"]
+
+    elem.release()
+
+    assert elem.values == {}
+    assert elem.references == {}
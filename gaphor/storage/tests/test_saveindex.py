@@ -0,0 +1,183 @@
+from io import StringIO
+
+import pytest
+
+from gaphor import UML
+from gaphor.core.modeling import Diagram
+from gaphor.diagram.presentation import LinePresentation
+from gaphor.storage import storage
+from gaphor.storage.saveindex import SaveIndex
+from gaphor.transaction import Transaction
+from gaphor.UML.classes import ClassItem
+
+
+@pytest.fixture
+def save_index(event_manager):
+    save_index = SaveIndex(event_manager)
+    yield save_index
+    save_index.shutdown()
+
+
+@pytest.fixture
+def model(element_factory, modeling_language, test_models):
+    with open(test_models / "all-elements-v2.5.gaphor", encoding="utf-8") as f:
+        storage.load(f, element_factory, modeling_language)
+
+
+@pytest.fixture
+def save(element_factory, save_index, tmp_path):
+    filename = tmp_path / "model.gaphor"
+
+    def save():
+        previous = save_index.read(filename)
+        with storage.create_model(filename) as out:
+            storage.save(out, element_factory, index=save_index, previous=previous)
+        save_index.written(filename)
+        return filename.read_text(encoding="utf-8")
+
+    save.filename = filename  # type: ignore[attr-defined]
+    return save
+
+
+def full_save(element_factory):
+    out = StringIO()
+    storage.save(out, element_factory)
+    return out.getvalue()
+
+
+def test_index_element_positions(element_factory, model, save, save_index):
+    text = save()
+
+    assert save_index.length == len(text)
+    assert len(save_index.spans) == element_factory.size()
+    for element in element_factory.select():
+        start, end = save_index.spans[element.id]
+        assert text[start:end].startswith(
+            f'<{type(element).__name__} id="{element.id}"'
+        )
+
+
+def test_saved_file_is_previous_file(model, save, save_index):
+    text = save()
+
+    assert save_index.read(save.filename) == text
+
+
+def test_no_previous_file_before_save(save, save_index):
+    assert save_index.read(save.filename) is None
+
+
+def test_no_previous_file_for_other_file(model, save, save_index, tmp_path):
+    save()
+
+    assert save_index.read(tmp_path / "other.gaphor") is None
+
+
+def test_no_previous_file_if_file_changed(model, save, save_index):
+    save()
+    save.filename.write_text("changed", encoding="utf-8")
+
+    assert save_index.read(save.filename) is None
+
+
+def test_clean_elements_are_copied(element_factory, event_manager, save, save_index):
+    with Transaction(event_manager):
+        clean = element_factory.create(UML.Class)
+        clean.name = "Clean"
+        changed = element_factory.create(UML.Class)
+        changed.name = "Changed"
+    text = save()
+    with Transaction(event_manager):
+        changed.name = "Renamed"
+
+    # Tamper with the file, without changing its size
+    save.filename.write_text(text.replace("Clean", "Cl3an"), encoding="utf-8")
+    save_index.written(save.filename)
+    text = save()
+
+    assert "Cl3an" in text
+    assert "Renamed" in text
+
+
+def rename(element_factory):
+    next(element_factory.select(UML.Class)).name = "Renamed"
+
+
+def create(element_factory):
+    element_factory.create(UML.Class).name = "New"
+
+
+def delete(element_factory):
+    next(element_factory.select(UML.Class)).unlink()
+
+
+def move_item(element_factory):
+    next(element_factory.select(ClassItem)).matrix.translate(10, 10)
+
+
+def move_handle(element_factory):
+    line = next(element_factory.select(LinePresentation))
+    line.handles()[-1].pos = (100, 100)
+
+
+def delete_diagram(element_factory):
+    next(element_factory.select(Diagram)).unlink()
+
+
+def reorder(element_factory):
+    diagram = next(
+        d for d in element_factory.select(Diagram) if len(d.ownedPresentation) > 1
+    )
+    diagram.ownedPresentation.swap(*diagram.ownedPresentation[:2])
+
+
+@pytest.mark.parametrize(
+    "change",
+    [rename, create, delete, move_item, move_handle, delete_diagram, reorder],
+)
+def test_incremental_save_is_full_save(
+    element_factory, event_manager, model, save, save_index, change
+):
+    save()
+    with Transaction(event_manager):
+        change(element_factory)
+
+    assert save_index.read(save.filename)
+    assert save() == full_save(element_factory)
+
+
+def test_incremental_save_after_many_changes(
+    element_factory, event_manager, model, save
+):
+    for change in [rename, move_item, create, move_handle, delete]:
+        save()
+        with Transaction(event_manager):
+            change(element_factory)
+
+    assert save() == full_save(element_factory)
+
+
+def test_changes_while_saving_are_saved_next_time(
+    element_factory, event_manager, diagram, save, save_index
+):
+    with Transaction(event_manager):
+        item = diagram.create(ClassItem)
+    save()
+
+    previous = save_index.read(save.filename)
+    with storage.create_model(save.filename) as out:
+        for _ in storage.save_generator(out, element_factory, save_index, previous):
+            pass
+        with Transaction(event_manager):
+            item.matrix.translate(10, 10)
+    save_index.written(save.filename)
+
+    assert item.id in save_index.dirty
+
+
+def test_flush_clears_index(element_factory, model, save, save_index):
+    save()
+    element_factory.flush()
+
+    assert not save_index.spans
+    assert save_index.read(save.filename) is None
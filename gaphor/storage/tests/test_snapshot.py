@@ -0,0 +1,96 @@
+from io import StringIO
+
+import pytest
+
+from gaphor.storage import storage
+from gaphor.storage.parser import element
+from gaphor.storage.snapshot import Snapshot, content_hash
+
+
+@pytest.fixture
+def model_file(test_models):
+    return test_models / "all-elements-v2.5.gaphor"
+
+
+@pytest.fixture
+def snapshot(model_file, tmp_path):
+    return Snapshot.for_file(model_file, tmp_path / "model.snapshot")
+
+
+def load(model_file, element_factory, modeling_language, snapshot):
+    with open(model_file, encoding="utf-8") as file_obj:
+        storage.load(file_obj, element_factory, modeling_language, snapshot=snapshot)
+    return {e.id: type(e) for e in element_factory.select()}
+
+
+def test_content_hash_changes_with_content(tmp_path):
+    f = tmp_path / "model.gaphor"
+    f.write_text("a", encoding="utf-8")
+    hash_a = content_hash(f)
+    f.write_text("b", encoding="utf-8")
+
+    assert content_hash(f) != hash_a
+
+
+def test_save_and_load(tmp_path):
+    elem = element("1", "Class")
+    elem.values["name"] = "Foo"
+    elem.references["ownedAttribute"] = ["2"]
+    snapshot = Snapshot(tmp_path / "model.snapshot", "hash")
+
+    snapshot.save({"1": elem}, "2.20.0")
+    elements, gaphor_version = snapshot.load()  # type: ignore[misc]
+
+    assert gaphor_version == "2.20.0"
+    assert elements["1"].type == "Class"
+    assert elements["1"].values == {"name": "Foo"}
+    assert elements["1"].references == {"ownedAttribute": ["2"]}
+
+
+def test_no_snapshot(tmp_path):
+    snapshot = Snapshot(tmp_path / "model.snapshot", "hash")
+
+    assert snapshot.load() is None
+
+
+def test_snapshot_for_other_file_contents(tmp_path):
+    Snapshot(tmp_path / "model.snapshot", "hash").save({}, "2.20.0")
+
+    assert Snapshot(tmp_path / "model.snapshot", "other hash").load() is None
+
+
+def test_corrupt_snapshot(tmp_path):
+    snapshot = Snapshot(tmp_path / "model.snapshot", "hash")
+    snapshot.save({"1": element("1", "Class")}, "2.20.0")
+    data = snapshot.path.read_bytes()
+    snapshot.path.write_bytes(data[:-10])
+
+    assert snapshot.load() is None
+
+
+def test_load_writes_snapshot(model_file, element_factory, modeling_language, snapshot):
+    load(model_file, element_factory, modeling_language, snapshot)
+
+    assert snapshot.path.exists()
+    assert snapshot.load()
+
+
+def test_reload_from_snapshot(model_file, element_factory, modeling_language, snapshot):
+    from_xml = load(model_file, element_factory, modeling_language, snapshot)
+
+    # A snapshot does not need the XML file
+    storage.load(StringIO(""), element_factory, modeling_language, snapshot=snapshot)
+    from_snapshot = {e.id: type(e) for e in element_factory.select()}
+
+    assert from_snapshot == from_xml
+
+
+def test_snapshot_contains_upgraded_records(
+    model_file, element_factory, modeling_language, snapshot
+):
+    load(model_file, element_factory, modeling_language, snapshot)
+    elements, gaphor_version = snapshot.load()  # type: ignore[misc]
+
+    assert not storage.version_lower_than(gaphor_version, (2, 20, 0))
+    assert all(e.type != "FlowItem" for e in elements.values())
+    assert all("ownedClassifier" not in e.references for e in elements.values())
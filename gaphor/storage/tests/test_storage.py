@@ -2,14 +2,26 @@
 
 import re
 from io import StringIO
+from unittest.mock import Mock
 
 import pytest
 
 from gaphor import UML
-from gaphor.core.modeling import Comment, Diagram, StyleSheet
+from gaphor.core.changeset.apply import apply_change, applicable
+from gaphor.core.modeling import (
+    Comment,
+    Diagram,
+    ElementChange,
+    ElementFactory,
+    Presentation,
+    StyleSheet,
+    ValueChange,
+)
 from gaphor.diagram.general import CommentItem
 from gaphor.diagram.tests.fixtures import connect
 from gaphor.storage import storage
+from gaphor.storage.parser import element
+from gaphor.transaction import Transaction
 from gaphor.UML.classes import AssociationItem, ClassItem, InterfaceItem
 
 
@@ -290,6 +302,33 @@ def test_save_with_invalidreference(element_factory, saver, caplog):
     assert "Model has unknown reference" in caplog.text
 
 
+def test_save_with_reference_to_other_model(
+    element_factory, event_manager, saver, caplog
+):
+    c = element_factory.create(UML.Class)
+    p = ElementFactory(event_manager).create(UML.Package)
+    c.package = p
+
+    data = saver()
+
+    assert c.id in data
+    assert p.id not in data
+    assert "Model has unknown reference" in caplog.text
+
+
+def test_save_reports_progress_while_writing(element_factory):
+    for n in range(5000):
+        element_factory.create(UML.Class).name = f"Class {n:0100}"
+    out = StringIO()
+
+    progress = list(storage.save_generator(out, element_factory))
+
+    assert len(out.getvalue()) > 2 * storage.PROGRESS_INTERVAL
+    assert len(progress) >= 2
+    assert progress == sorted(progress)
+    assert all(0 < p <= 100 for p in progress)
+
+
 def test_save_and_load_with_invalid_element_type(element_factory, saver, loader):
     element_factory.create(UML.Package)
 
@@ -327,3 +366,171 @@ def test_save_and_load_with_invalid_reference(element_factory, saver, loader):
 
     assert not hasattr(package, "foobar")
     assert not package.name
+
+
+def test_save_and_load_compressed_model(element_factory, modeling_language, tmp_path):
+    element_factory.create(UML.Class).name = "Foo"
+    model_file = tmp_path / "model.gaphor"
+
+    with storage.create_model(model_file, compressed=True) as out:
+        storage.save(out, element_factory)
+    element_factory.flush()
+
+    progress = []
+    with storage.open_model(model_file) as file_obj:
+        storage.load(
+            file_obj, element_factory, modeling_language, status_queue=progress.append
+        )
+
+    assert storage.is_compressed(model_file)
+    assert next(element_factory.select(UML.Class)).name == "Foo"
+    assert progress == sorted(progress)
+    assert progress[-1] == 100
+
+
+def test_open_uncompressed_model(test_models):
+    model_file = test_models / "simple-items.gaphor"
+
+    with storage.open_model(model_file) as file_obj:
+        assert file_obj.read().startswith("<?xml")
+    assert not storage.is_compressed(model_file)
+
+
+def load_lazy(model_file, element_factory, modeling_language):
+    with open(model_file, encoding="utf-8") as file_obj:
+        storage.load(file_obj, element_factory, modeling_language, lazy=True)
+
+
+def test_lazy_load_creates_no_presentation_items(
+    element_factory, modeling_language, test_models
+):
+    load_lazy(test_models / "all-elements.gaphor", element_factory, modeling_language)
+
+    assert element_factory.lselect(Diagram)
+    assert element_factory.lselect(UML.Class)
+    assert not element_factory.lselect(Presentation)
+
+
+def test_lazy_load_creates_items_when_diagram_is_used(
+    element_factory, modeling_language, test_models
+):
+    load_lazy(test_models / "all-elements.gaphor", element_factory, modeling_language)
+    diagram = next(element_factory.select(Diagram))
+
+    items = list(diagram.get_all_items())
+
+    assert items
+    assert all(item.diagram is diagram for item in items)
+    assert set(element_factory.select(Presentation)) == set(items)
+
+
+def test_lazy_load_creates_items_for_presentation_of_element(
+    element_factory, modeling_language, test_models
+):
+    load_lazy(test_models / "all-elements.gaphor", element_factory, modeling_language)
+    klass = next(c for c in element_factory.select(UML.Class) if c.name == "Class")
+
+    assert klass.presentation
+    assert all(item.subject is klass for item in klass.presentation)
+
+
+def test_lazy_load_only_creates_items_of_used_diagram(
+    element_factory, modeling_language, test_models
+):
+    load_lazy(test_models / "RAAML-original.gaphor", element_factory, modeling_language)
+    diagram, *other_diagrams = element_factory.select(Diagram)
+
+    diagram_items = list(diagram.get_all_items())
+
+    assert set(element_factory.select(Presentation)) == set(diagram_items)
+
+
+def test_lazy_loaded_items_are_updated_when_subject_changes(
+    event_manager, element_factory, modeling_language, test_models
+):
+    load_lazy(test_models / "all-elements.gaphor", element_factory, modeling_language)
+    klass = next(c for c in element_factory.select(UML.Class) if c.name == "Class")
+    (item,) = klass.presentation
+    updates = []
+    item.diagram.register_view(
+        Mock(request_update=lambda items, removed_items: updates.extend(items))
+    )
+
+    with Transaction(event_manager):
+        klass.name = "NewName"
+
+    assert item in updates
+
+
+def test_lazy_load_model_with_pending_item_changes(
+    element_factory, modeling_language, test_models
+):
+    with open(test_models / "all-elements.gaphor", encoding="utf-8") as file_obj:
+        storage.load(file_obj, element_factory, modeling_language)
+    item = next(element_factory.select(ClassItem))
+    item_id = item.id
+    value_change = element_factory.create(ValueChange)
+    value_change.element_id = item_id
+    value_change.property_name = "show_attributes"
+    value_change.property_value = "0"
+    add_change = element_factory.create(ElementChange)
+    add_change.element_id = item_id
+    add_change.element_name = "ClassItem"
+    add_change.diagram_id = item.diagram.id
+    out = PseudoFile()
+    storage.save(out, element_factory=element_factory)
+
+    element_factory.flush()
+    storage.load(StringIO(out.data), element_factory, modeling_language, lazy=True)
+    (value_change,) = element_factory.select(ValueChange)
+    (add_change,) = element_factory.select(ElementChange)
+
+    assert not element_factory.lselect(Presentation)
+    assert applicable(value_change, element_factory)
+    assert not applicable(add_change, element_factory)
+
+    apply_change(value_change, element_factory, modeling_language)
+
+    assert element_factory[item_id].show_attributes == 0
+
+
+@pytest.mark.parametrize(
+    "model", ["all-elements.gaphor", "interaction.gaphor", "RAAML-incoming.gaphor"]
+)
+def test_save_lazy_loaded_model(element_factory, modeling_language, test_models, model):
+    path = test_models / model
+    with open(path, encoding="utf-8") as file_obj:
+        storage.load(file_obj, element_factory, modeling_language)
+    eager = PseudoFile()
+    storage.save(eager, element_factory=element_factory)
+
+    load_lazy(path, element_factory, modeling_language)
+    list(next(element_factory.select(Diagram)).get_all_items())
+    lazy = PseudoFile()
+    storage.save(lazy, element_factory=element_factory)
+
+    assert lazy.data == eager.data
+
+
+def test_flush_does_not_create_deferred_items(
+    element_factory, modeling_language, test_models, monkeypatch
+):
+    load_lazy(test_models / "all-elements.gaphor", element_factory, modeling_language)
+    monkeypatch.setattr(
+        storage.DeferredPresentation, "_load", lambda *args: pytest.fail("loading")
+    )
+
+    element_factory.flush()
+
+    assert element_factory.size() == 0
+
+
+def test_records_are_released_after_loading(element_factory, modeling_language):
+    elem = element("1", "Class")
+    elem.values["name"] = "Foo"
+
+    storage.load_elements({"1": elem}, element_factory, modeling_language)
+
+    assert elem.element
+    assert elem.element.name == "Foo"
+    assert elem.values == {}
@@ -1,7 +1,7 @@
 import pytest
 
 from gaphor.storage.parser import element
-from gaphor.storage.storage import load_elements
+from gaphor.storage.storage import applicable_upgrade_steps, load_elements
 from gaphor.storage.upgrade_canvasitem import upgrade_canvasitem
 from gaphor.UML import diagramitems
 
@@ -161,3 +161,33 @@ def test_upgrade_append_notes_on_model_element(loader, element_factory):
     assert not cls_item1.note
     assert not cls_item2.note
     assert cls.note == "my note\n\nanother note"
+
+
+def test_no_upgrade_steps_for_current_model():
+    assert applicable_upgrade_steps("2.20.0") == []
+
+
+def test_upgrade_steps_are_ordered_by_version():
+    steps = applicable_upgrade_steps("2.0.0")
+    versions = [step.version for step in steps]
+
+    assert steps
+    assert versions == sorted(versions)
+    assert all(step.types or step.keys for step in steps)
+
+
+def test_upgrade_steps_for_model_version():
+    steps = applicable_upgrade_steps("2.9.1")
+
+    assert {step.version for step in steps} == {(2, 19), (2, 20)}
+
+
+def test_upgrade_step_applies_to_keys():
+    (step,) = (s for s in applicable_upgrade_steps("2.0.0") if "ownedComment" in s.keys)
+    elem = element(id="1", type="Class")
+
+    assert not step.applies_to(elem)
+
+    elem.references["ownedComment"] = ["2"]
+
+    assert step.applies_to(elem)
@@ -83,3 +83,94 @@ def test_elements_ns_1():
         % sys.getdefaultencoding()
     )
     assert w.s == xml, w.s
+
+
+def write_element(write):
+    w = Writer()
+    xml_w = XMLWriter(w)
+    xml_w.startDocument()
+    xml_w.startElement("Class", {"id": "1"})
+    write(xml_w)
+    write(xml_w)
+    xml_w.endElement("Class")
+    return w.s
+
+
+def test_value_is_written_as_elements():
+    def elements(xml_w):
+        xml_w.startElement("name", {})
+        xml_w.startElement("val", {})
+        xml_w.characters("a < b")
+        xml_w.endElement("val")
+        xml_w.endElement("name")
+
+    assert write_element(lambda xml_w: xml_w.value("name", "a < b")) == write_element(
+        elements
+    )
+
+
+def test_reference_is_written_as_elements():
+    def elements(xml_w):
+        xml_w.startElement("owner", {})
+        xml_w.startElement("ref", {"refid": "2"})
+        xml_w.endElement("ref")
+        xml_w.endElement("owner")
+
+    assert write_element(lambda xml_w: xml_w.reference("owner", "2")) == write_element(
+        elements
+    )
+
+
+def test_references_are_written_as_elements():
+    def elements(xml_w):
+        xml_w.startElement("ownedElement", {})
+        xml_w.startElement("reflist", {})
+        for refid in ("2", "3"):
+            xml_w.startElement("ref", {"refid": refid})
+            xml_w.endElement("ref")
+        xml_w.endElement("reflist")
+        xml_w.endElement("ownedElement")
+
+    assert write_element(
+        lambda xml_w: xml_w.references("ownedElement", ["2", "3"])
+    ) == write_element(elements)
+
+
+def test_empty_references_are_written_as_elements():
+    def elements(xml_w):
+        xml_w.startElement("ownedElement", {})
+        xml_w.startElement("reflist", {})
+        xml_w.endElement("reflist")
+        xml_w.endElement("ownedElement")
+
+    assert write_element(
+        lambda xml_w: xml_w.references("ownedElement", [])
+    ) == write_element(elements)
+
+
+def test_buffered_output_is_written_at_end_of_document():
+    w = Writer()
+    xml_w = XMLWriter(w, buffered=True)
+    xml_w.startDocument()
+    xml_w.startElement("foo", {})
+    xml_w.endElement("foo")
+
+    assert w.s == ""
+
+    xml_w.endDocument()
+
+    xml = """<?xml version="1.0" encoding="%s"?>\n<foo/>""" % sys.getdefaultencoding()
+    assert w.s == xml
+
+
+def test_characters_written():
+    w = Writer()
+    xml_w = XMLWriter(w, buffered=True)
+    xml_w.startDocument()
+    xml_w.value("name", "foo")
+
+    assert xml_w.written == 0
+
+    xml_w.endDocument()
+
+    assert xml_w.written == len(w.s)
@@ -12,12 +12,31 @@ try:
 except ImportError:
     _error_handling = "strict"
 
+# Number of buffered writes before output is flushed
+BUFFER_SIZE = 2**14
+
 
 class XMLWriter(xml.sax.handler.ContentHandler):
-    def __init__(self, out, encoding="utf-8"):
+    """Write XML, one tag per line.
+
+    If ``buffered`` is set, output is collected and written to ``out``
+    in large chunks. The buffer is flushed at the end of the document,
+    or when ``flush()`` is called.
+
+    ``written`` is the number of characters written to ``out`` so far.
+    ``position`` also counts buffered output.
+    """
+
+    def __init__(self, out, encoding="utf-8", buffered=False):
         super().__init__()
         self._out = out
         self._encoding = encoding
+        self._buffer: List[str] = []
+        self._buffered = buffered
+        self._buffered_size = 0
+        self._counted = 0
+        self._write_out = self._buffer.append if buffered else self._write_direct
+        self.written = 0
         self._ns_contexts: List[Dict[str, str]] = [{}]  # contains uri -> prefix dicts
         self._current_context = self._ns_contexts[-1]
         self._undeclared_ns_maps: List[Tuple[str, str]] = []
@@ -38,33 +57,74 @@ class XMLWriter(xml.sax.handler.ContentHandler):
             text = text.decode(self._encoding, _error_handling)
 
         if self._next_newline:
-            self._out.write("\n")
+            self._write_out("\n")
             self._next_newline = False
 
         if start_tag and not self._in_start_tag:
             self._in_start_tag = True
-            self._out.write("<")
+            self._write_out("<")
         elif start_tag:
-            self._out.write(">")
-            self._out.write("\n")
-            self._out.write("<")
+            self._write_out(">")
+            self._write_out("\n")
+            self._write_out("<")
         elif end_tag and self._in_start_tag:
-            self._out.write("/>")
+            self._write_out("/>")
             self._in_start_tag = False
             self._next_newline = True
             return
         elif self._in_start_tag:
-            self._out.write(">")
+            self._write_out(">")
             self._in_start_tag = False
         elif end_tag:
-            self._out.write("</")
-            self._out.write(text)
-            self._out.write(">")
+            self._write_out("</")
+            self._write_out(text)
+            self._write_out(">")
             self._in_start_tag = False
             self._next_newline = True
             return
 
+        self._write_out(text)
+
+    def _close_pending(self):
+        """Write a pending newline, or close an open start tag."""
+        if self._next_newline:
+            self._write_out("\n")
+            self._next_newline = False
+        elif self._in_start_tag:
+            self._write_out(">\n")
+            self._in_start_tag = False
+
+    def _start_fragment(self):
+        """Prepare writing a complete fragment of XML."""
+        self._close_pending()
+        self._next_newline = True
+
+    def _write_direct(self, text):
         self._out.write(text)
+        self.written += len(text)
+
+    def flush(self):
+        """Write buffered output."""
+        if self._buffer:
+            self._write_direct("".join(self._buffer))
+            self._buffer.clear()
+            self._buffered_size = 0
+            self._counted = 0
+
+    @property
+    def position(self):
+        """The number of characters written so far, including buffered
+        output."""
+        if self._counted < len(self._buffer):
+            self._buffered_size += sum(map(len, self._buffer[self._counted :]))
+            self._counted = len(self._buffer)
+        return self.written + self._buffered_size
+
+    def mark(self):
+        """Finish the current line and return the position the next tag
+        or fragment starts at."""
+        self._close_pending()
+        return self.position
 
     def _qname(self, name):
         """Builds a qualified name from a (ns_url, localname) pair."""
@@ -80,6 +140,17 @@ class XMLWriter(xml.sax.handler.ContentHandler):
     def startDocument(self):
         self._write(f'<?xml version="1.0" encoding="{self._encoding}"?>\n')
 
+    def endDocument(self):
+        self.flush()
+
+    def fragment(self, text):
+        """Write a complete fragment of XML, such as a previously written
+        element, as is."""
+        self._start_fragment()
+        self._write_out(text)
+        if self._buffered and len(self._buffer) > BUFFER_SIZE:
+            self.flush()
+
     def startPrefixMapping(self, prefix, uri):
         self._ns_contexts.append(self._current_context.copy())
         self._current_context[uri] = prefix
@@ -92,23 +163,43 @@ class XMLWriter(xml.sax.handler.ContentHandler):
     def startElement(self, name, attrs):
         self._write(name, start_tag=True)
         for name, value in list(attrs.items()):
-            self._out.write(f" {name}={quoteattr(value)}")
+            self._write_out(f" {name}={quoteattr(value)}")
 
     def endElement(self, name):
         self._write(name, end_tag=True)
+        if self._buffered and len(self._buffer) > BUFFER_SIZE:
+            self.flush()
+
+    def value(self, name, value):
+        """Write ``<name><val>value</val></name>``."""
+        self._start_fragment()
+        self._write_out(f"<{name}>\n<val>{escape(value)}</val>\n</{name}>")
+
+    def reference(self, name, refid):
+        """Write ``<name><ref refid="refid"/></name>``."""
+        self._start_fragment()
+        self._write_out(f"<{name}>\n<ref refid={quoteattr(refid)}/>\n</{name}>")
+
+    def references(self, name, refids):
+        """Write ``<name><reflist><ref refid="refid"/>...</reflist></name>``."""
+        self._start_fragment()
+        if refs := "".join(f"\n<ref refid={quoteattr(r)}/>" for r in refids):
+            self._write_out(f"<{name}>\n<reflist>{refs}\n</reflist>\n</{name}>")
+        else:
+            self._write_out(f"<{name}>\n<reflist/>\n</{name}>")
 
     def startElementNS(self, name, qname, attrs):
         self._write(self._qname(name), start_tag=True)
 
         for prefix, uri in self._undeclared_ns_maps:
             if prefix:
-                self._out.write(f' xmlns:{prefix}="{uri}"')
+                self._write_out(f' xmlns:{prefix}="{uri}"')
             else:
-                self._out.write(f' xmlns="{uri}"')
+                self._write_out(f' xmlns="{uri}"')
         self._undeclared_ns_maps = []
 
         for name, value in list(attrs.items()):
-            self._out.write(f" {self._qname(name)}={quoteattr(value)}")
+            self._write_out(f" {self._qname(name)}={quoteattr(value)}")
 
     def endElementNS(self, name, qname):
         self._write(f"{self._qname(name)}", end_tag=True)
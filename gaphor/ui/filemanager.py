@@ -23,9 +23,13 @@ from gaphor.event import (
     SessionShutdown,
     SessionShutdownRequested,
 )
+from gaphor.services.properties import file_hash, get_cache_dir
 from gaphor.storage import storage
+from gaphor.storage.journal import Journal, read_journal
 from gaphor.storage.mergeconflict import split_ours_and_theirs
 from gaphor.storage.parser import MergeConflictDetected
+from gaphor.storage.saveindex import SaveIndex
+from gaphor.storage.snapshot import Snapshot, content_hash
 from gaphor.ui.errorhandler import error_handler
 from gaphor.ui.filedialog import GAPHOR_FILTER, save_file_dialog
 from gaphor.ui.statuswindow import StatusWindow
@@ -36,6 +40,10 @@ MAX_RECENT = 10
 log = logging.getLogger(__name__)
 
 
+def journal_path(filename: Path) -> Path:
+    return Path(get_cache_dir()) / f"{file_hash(filename)}.journal"
+
+
 def error_message(e):
     if not isinstance(e, IOError):
         return gettext(
@@ -54,22 +62,33 @@ def error_message(e):
     ).format(exc=str(e))
 
 
+# Create presentation items when their diagram is first used, and let
+# them watch the model only while their diagram is shown
+LAZY_LOADING = False
+
+
 def load_default_model(element_factory):
     element_factory.flush()
-    with element_factory.block_events():
+    with element_factory.bulk_load():
         element_factory.create(StyleSheet)
         model = element_factory.create(UML.Package)
         model.name = gettext("New model")
         diagram = element_factory.create(Diagram)
         diagram.element = model
         diagram.name = gettext("New diagram")
-    element_factory.model_ready()
 
 
 class FileManager(Service, ActionProvider):
     """The file service, responsible for loading and saving Gaphor models."""
 
-    def __init__(self, event_manager, element_factory, modeling_language, main_window):
+    def __init__(
+        self,
+        event_manager,
+        element_factory,
+        modeling_language,
+        main_window,
+        lazy_loading=LAZY_LOADING,
+    ):
         """File manager constructor.
 
         There is no current filename yet.
@@ -78,7 +97,12 @@ class FileManager(Service, ActionProvider):
         self.element_factory = element_factory
         self.modeling_language = modeling_language
         self.main_window = main_window
+        self.lazy_loading = lazy_loading
         self._filename: Path | None = None
+        self.compressed = False
+        self.save_index = SaveIndex(event_manager)
+        self.journal = Journal(event_manager, element_factory)
+        self.recovered = False
 
         event_manager.subscribe(self._on_session_shutdown_request)
         event_manager.subscribe(self._on_session_created)
@@ -87,6 +111,9 @@ class FileManager(Service, ActionProvider):
         """Called when shutting down the file manager service."""
         self.event_manager.unsubscribe(self._on_session_shutdown_request)
         self.event_manager.unsubscribe(self._on_session_created)
+        self.save_index.shutdown()
+        self.journal.close(remove=True)
+        self.journal.shutdown()
 
     @property
     def filename(self) -> Path | None:
@@ -117,9 +144,15 @@ class FileManager(Service, ActionProvider):
         generator updates the progress queue.  The loader is passed to a
         GIdleThread which executes the load generator. If loading is
         successful, the filename is set.
+
+        Changes that were not saved in a previous session are recovered
+        from the journal. With ``lazy_loading`` set, items are created
+        when their diagram is first used, and items on diagrams that are
+        not shown do not watch the model.
         """
         # First claim file name, so any other files will be opened in a different session
         self.filename = filename
+        self.element_factory.lazy_watchers = self.lazy_loading
 
         status_window = StatusWindow(
             gettext("Loading…"),
@@ -132,9 +165,18 @@ class FileManager(Service, ActionProvider):
             if on_load_done:
                 on_load_done()
             else:
-                self.event_manager.handle(ModelLoaded(self, filename))
+                self.event_manager.handle(
+                    ModelLoaded(self, filename, modified=self.recovered)
+                )
 
-        for _ in self._load_async(filename, status_window.progress, done):
+        for _ in self._load_async(
+            filename,
+            status_window.progress,
+            done,
+            use_snapshot=True,
+            lazy=self.lazy_loading,
+            recover=True,
+        ):
             pass
 
     def merge(
@@ -207,17 +249,44 @@ class FileManager(Service, ActionProvider):
         progress: Callable[[int], None] | None = None,
         done=None,
         element_factory=None,
+        use_snapshot=False,
+        lazy=False,
+        recover=False,
     ):
         try:
-            with open(filename, encoding="utf-8", errors="replace") as file_obj:
+            contents = content_hash(filename) if use_snapshot or recover else ""
+            snapshot = (
+                Snapshot(
+                    Path(get_cache_dir()) / f"{file_hash(filename)}.snapshot",
+                    contents,
+                )
+                if use_snapshot
+                else None
+            )
+            if element_factory is None:
+                self.compressed = storage.is_compressed(filename)
+            if recover:
+                self.journal.close()
+                journal = read_journal(journal_path(filename), contents)
+            else:
+                journal = []
+            with storage.open_model(filename, errors="replace") as file_obj:
                 for percentage in storage.load_generator(
                     file_obj,
                     element_factory or self.element_factory,
                     self.modeling_language,
+                    snapshot,
+                    lazy,
+                    journal,
                 ):
                     if progress:
                         progress(percentage)
                     yield percentage
+            if recover:
+                self.recovered = bool(journal)
+                self.journal.open(
+                    journal_path(filename), contents, append=bool(journal)
+                )
         except MergeConflictDetected:
             self.filename = None
             self.resolve_merge_conflict(filename)
@@ -290,14 +359,24 @@ class FileManager(Service, ActionProvider):
                 close=lambda: self.event_manager.handle(SessionShutdown(self)),
             )
 
-    def save(self, filename, on_save_done=None):
+    def save(self, filename, on_save_done=None, compressed=None):
         """Save the current UML model to the specified file name.
 
         Before writing the model file, this will verify that there are
         no orphan references.  It will also verify that the filename has
         the correct extension.  A status window is displayed while the
         GIdleThread is executed.  This thread actually saves the model.
+
+        The model is saved compressed if ``compressed`` is set. By default
+        a model is saved in the same format it was loaded from.
+
+        When saving to the same file again, only elements that changed
+        are saved. Other elements are copied from the file as it is.
+
+        Once saved, a new journal is started for the file.
         """
+        if compressed is None:
+            compressed = self.compressed
 
         if not filename or (filename.exists() and not filename.is_file()):
             return
@@ -311,14 +390,22 @@ class FileManager(Service, ActionProvider):
         @g_async()
         def async_saver():
             try:
-                with filename.open("w", encoding="utf-8") as out:
-                    for percentage in storage.save_generator(out, self.element_factory):
+                previous = self.save_index.read(filename)
+                with storage.create_model(filename, compressed) as out:
+                    for percentage in storage.save_generator(
+                        out, self.element_factory, self.save_index, previous
+                    ):
                         status_window.progress(percentage)
                         yield
 
+                self.save_index.written(filename)
+                self.journal.close(remove=True)
+                self.journal.open(journal_path(filename), content_hash(filename))
                 self.filename = filename
+                self.compressed = compressed
                 self.event_manager.handle(ModelSaved(self, filename))
             except Exception as e:
+                self.save_index.clear()
                 error_handler(
                     message=gettext("Unable to save model “{filename}”.").format(
                         filename=filename
@@ -77,7 +77,7 @@ class ModelMerge:
                     do_apply(n)
 
         if change_node:
-            with Transaction(self.event_manager):
+            with Transaction(self.event_manager), self.event_manager.batch():
                 do_apply(change_node)
 
         for item in self.model:
@@ -1,9 +1,14 @@
 import sys
 import textwrap
+from io import StringIO
 
 import pytest
 
 from gaphor import UML
+from gaphor.core.modeling import Diagram, Presentation
+from gaphor.storage import storage
+from gaphor.transaction import Transaction
+from gaphor.UML.classes import ClassItem
 from gaphor.ui.filemanager import FileManager
 
 try:
@@ -15,7 +20,10 @@ else:
 
 
 @pytest.fixture
-def file_manager(event_manager, element_factory, modeling_language):
+def file_manager(
+    event_manager, element_factory, modeling_language, monkeypatch, tmp_path
+):
+    monkeypatch.setattr("gaphor.ui.filemanager.get_cache_dir", lambda: tmp_path)
     main_window = None
     return FileManager(event_manager, element_factory, modeling_language, main_window)
 
@@ -68,6 +76,96 @@ def test_model_is_loaded_with_utf8_encoding(
     assert new_package.name == package_name
 
 
+def test_compressed_model_is_saved_compressed(
+    element_factory, file_manager: FileManager, tmp_path
+):
+    element_factory.create(UML.Class).name = "Foo"
+
+    model_file = tmp_path / "model.gaphor"
+    file_manager.save(model_file, compressed=True)
+    element_factory.flush()
+    file_manager.load(model_file)
+
+    assert file_manager.compressed
+    assert next(element_factory.select(UML.Class)).name == "Foo"
+
+    file_manager.save(model_file)
+
+    assert storage.is_compressed(model_file)
+
+
+def test_compression_is_detected_without_snapshot(
+    element_factory, file_manager: FileManager, tmp_path
+):
+    element_factory.create(UML.Class)
+
+    model_file = tmp_path / "model.gaphor"
+    file_manager.save(model_file, compressed=True)
+    element_factory.flush()
+    for _ in file_manager._load_async(model_file):
+        pass
+
+    assert file_manager.compressed
+
+
+@pytest.mark.parametrize("lazy_loading", [False, True])
+def test_load_model_lazily(
+    event_manager, element_factory, modeling_language, tmp_path, lazy_loading
+):
+    diagram = element_factory.create(Diagram)
+    diagram.create(ClassItem, subject=element_factory.create(UML.Class))
+    model_file = tmp_path / "model.gaphor"
+    with storage.create_model(model_file) as out:
+        storage.save(out, element_factory)
+    element_factory.flush()
+
+    file_manager = FileManager(
+        event_manager, element_factory, modeling_language, None, lazy_loading
+    )
+    file_manager.load(model_file)
+
+    assert element_factory.lazy_watchers == lazy_loading
+    assert bool(element_factory.lselect(Presentation)) != lazy_loading
+
+
+def test_model_is_saved_again_incrementally(
+    element_factory, file_manager: FileManager, tmp_path
+):
+    class_ = element_factory.create(UML.Class)
+    element_factory.create(UML.Package).name = "Bar"
+
+    model_file = tmp_path / "model.gaphor"
+    file_manager.save(model_file)
+    class_.name = "Foo"
+    file_manager.save(model_file)
+
+    out = StringIO()
+    storage.save(out, element_factory)
+
+    assert file_manager.save_index.spans
+    assert not file_manager.save_index.dirty
+    assert model_file.read_text(encoding="utf-8") == out.getvalue()
+
+
+def test_unsaved_changes_are_recovered(
+    element_factory, event_manager, file_manager: FileManager, tmp_path
+):
+    class_ = element_factory.create(UML.Class)
+    class_.name = "Foo"
+
+    model_file = tmp_path / "model.gaphor"
+    file_manager.save(model_file)
+    with Transaction(event_manager):
+        class_.name = "Bar"
+    file_manager.journal.flush()
+
+    element_factory.flush()
+    file_manager.load(model_file)
+
+    assert file_manager.recovered
+    assert next(element_factory.select(UML.Class)).name == "Bar"
+
+
 @pytest.mark.skipif(
     sys.platform != "win32", reason="Standard encoding on Windows is not UTF-8"
 )
@@ -137,6 +137,13 @@ def visible(element):
     )
 
 
+def owned_elements_of(element):
+    # Presentation items are never visible: do not load them for a diagram
+    return (
+        element.ownedDiagram if isinstance(element, Diagram) else element.ownedElement
+    )
+
+
 def tree_item_sort(a, b, _user_data=None):
     if isinstance(a, RelationshipItem):
         return -1
@@ -171,7 +178,7 @@ class TreeModel:
             return None
         elif owned_elements := [
             e
-            for e in item.element.ownedElement
+            for e in owned_elements_of(item.element)
             if e.owner is item.element and visible(e)
         ]:
             new_branch = Branch()
@@ -0,0 +1,79 @@
+"""Benchmark derived union caches after a model change.
+
+A change to one element only invalidates the derived unions of that
+element. This is compared to a refresh where the union caches of all
+elements are invalidated, which is what every change used to do.
+"""
+from io import StringIO
+
+import pytest
+
+from gaphor import UML
+from gaphor.core.modeling import Element
+from gaphor.storage import storage
+
+PACKAGE_COUNT = 100
+CLASS_COUNT = 100
+
+
+@pytest.fixture
+def large_packages(element_factory):
+    with element_factory.bulk_load():
+        root = element_factory.create(UML.Package)
+        for _ in range(PACKAGE_COUNT):
+            package = element_factory.create(UML.Package)
+            package.package = root
+            for _ in range(CLASS_COUNT):
+                cls = element_factory.create(UML.Class)
+                cls.package = package
+                cls.ownedAttribute = element_factory.create(UML.Property)
+    return element_factory
+
+
+def refresh(element_factory):
+    """Mimic the model browser: list the owned elements of all elements."""
+    for element in element_factory.select():
+        [e for e in element.ownedElement if e.owner is element]
+
+
+def invalidate_all():
+    Element.ownedElement.version += 1  # type: ignore[attr-defined]
+    Element.owner.version += 1  # type: ignore[attr-defined]
+
+
+def test_refresh_after_change(large_packages, measure):
+    package = next(large_packages.select(UML.Package))
+    refresh(large_packages)
+
+    def change_and_refresh():
+        large_packages.create(UML.Class).package = package
+        refresh(large_packages)
+
+    def change_invalidate_all_and_refresh():
+        large_packages.create(UML.Class).package = package
+        invalidate_all()
+        refresh(large_packages)
+
+    incremental = measure("per element invalidation", change_and_refresh, number=3)
+    global_ = measure(
+        "global invalidation", change_invalidate_all_and_refresh, number=3
+    )
+
+    assert incremental < global_
+
+
+def test_save_after_change(large_packages, measure):
+    package = next(large_packages.select(UML.Package))
+    storage.save(StringIO(), large_packages)
+
+    def change_and_save():
+        large_packages.create(UML.Class).package = package
+        storage.save(StringIO(), large_packages)
+
+    def change_invalidate_all_and_save():
+        large_packages.create(UML.Class).package = package
+        invalidate_all()
+        storage.save(StringIO(), large_packages)
+
+    measure("per element invalidation", change_and_save, number=1)
+    measure("global invalidation", change_invalidate_all_and_save, number=1)
@@ -0,0 +1,74 @@
+"""Benchmark property lookups while saving and unlinking a large model.
+
+Cached lookups through ``Element.umlproperties()`` are compared to
+scanning ``dir()`` of the element class, which is what
+``umlproperties()`` used to do for every call.
+
+The memory benchmark reports the memory used per element, including
+derived union caches, for a loaded model.
+"""
+import gc
+import tracemalloc
+from io import StringIO
+
+import pytest
+
+from gaphor.core.modeling.properties import derived, umlproperty
+from gaphor.storage import storage
+
+
+def dir_scan(cls):
+    return [
+        prop
+        for propname in dir(cls)
+        if not propname.startswith("_")
+        and isinstance(prop := getattr(cls, propname), umlproperty)
+    ]
+
+
+@pytest.fixture
+def uml_model(element_factory, modeling_language, models):
+    with open(models / "UML.gaphor", encoding="utf-8") as f:
+        storage.load(f, element_factory, modeling_language)
+    return element_factory
+
+
+def test_umlproperties(uml_model, measure):
+    elements = uml_model.lselect()
+
+    cached = measure(
+        "cached", lambda: [list(e.umlproperties()) for e in elements], number=3
+    )
+    scanned = measure(
+        "dir() scan", lambda: [dir_scan(type(e)) for e in elements], number=3
+    )
+
+    assert cached < scanned
+
+
+def test_save(uml_model, measure):
+    measure("save UML.gaphor", lambda: storage.save(StringIO(), uml_model), number=3)
+
+
+def test_unlink(uml_model, measure):
+    measure("unlink UML.gaphor", uml_model.flush, number=1, repeat=1)
+
+
+def test_memory_per_element(element_factory, modeling_language, models):
+    with open(models / "UML.gaphor", encoding="utf-8") as f:
+        text = f.read()
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        storage.load(StringIO(text), element_factory, modeling_language)
+        for element in element_factory.select():
+            for prop in element.umlproperties():
+                if isinstance(prop, derived):
+                    prop.get(element)
+        gc.collect()
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    print(f"memory per element: {size // element_factory.size()} bytes")
@@ -0,0 +1,95 @@
+"""Benchmark the element dispatcher on a diagram with many items.
+
+Items are plain presentations, without gaphas constraints, so creating
+them is cheap. Watchers are subscribed and unsubscribed on every item of
+the diagram, and events are dispatched to them. Replacing the subject
+of an item moves the registrations of the remaining paths to the new
+subject.
+"""
+import pytest
+
+from gaphor import UML
+from gaphor.core.modeling import Diagram, Presentation
+from gaphor.core.modeling.element import generate_id
+from gaphor.core.modeling.elementdispatcher import EventWatcher
+from gaphor.transaction import Transaction
+
+NUMBER_OF_ITEMS = 5_000
+
+PATHS = [
+    "subject[Class].name",
+    "subject[Class].ownedAttribute.name",
+    "subject[Class].ownedOperation.name",
+]
+
+
+def handler(event):
+    pass
+
+
+def create_diagram(element_factory):
+    with element_factory.bulk_load():
+        diagram = element_factory.create(Diagram)
+        for _ in range(NUMBER_OF_ITEMS):
+            item = element_factory.create_as(Presentation, generate_id(), diagram)
+            item.subject = element_factory.create(UML.Class)
+    return diagram
+
+
+def watch(items, dispatcher):
+    watchers = []
+    for item in items:
+        watcher = EventWatcher(item, dispatcher, handler)
+        for path in PATHS:
+            watcher.watch(path)
+        watchers.append(watcher)
+    return watchers
+
+
+@pytest.fixture
+def diagram(element_factory):
+    return create_diagram(element_factory)
+
+
+def test_create_diagram(element_factory, measure):
+    measure(
+        "create diagram",
+        lambda: create_diagram(element_factory),
+        number=1,
+        repeat=1,
+    )
+
+
+def test_subscribe(element_factory, diagram, measure):
+    dispatcher = element_factory.element_dispatcher
+    items = list(diagram.ownedPresentation)
+
+    def subscribe_and_unsubscribe():
+        for watcher in watch(items, dispatcher):
+            watcher.unsubscribe_all()
+
+    measure("subscribe and unsubscribe", subscribe_and_unsubscribe, number=1)
+
+
+def test_dispatch(element_factory, event_manager, diagram, measure):
+    items = list(diagram.ownedPresentation)
+    watch(items, element_factory.element_dispatcher)
+    with Transaction(event_manager):
+        subjects = [
+            [item.subject for item in items],
+            [element_factory.create(UML.Class) for _ in items],
+        ]
+
+    def rename():
+        with Transaction(event_manager):
+            for n, item in enumerate(items):
+                item.subject.name = f"Class {n}"
+
+    def replace_subjects():
+        subjects.reverse()
+        with Transaction(event_manager):
+            for item, subject in zip(items, subjects[0]):
+                item.subject = subject
+
+    measure("rename subjects", rename, number=1)
+    measure("replace subjects", replace_subjects, number=1)
@@ -0,0 +1,50 @@
+"""Benchmark type based lookups in the element factory.
+
+The type index is compared to a full scan over all elements, which is
+what ``select(type)`` used to do.
+"""
+import pytest
+
+from gaphor import UML
+from gaphor.core.modeling import Diagram, StyleSheet
+
+ELEMENT_COUNT = 50_000
+
+
+@pytest.fixture
+def large_model(element_factory):
+    with element_factory.block_events():
+        for n in range(ELEMENT_COUNT):
+            element_factory.create(UML.Class if n % 2 else UML.Property)
+            if n % 1000 == 0:
+                element_factory.create(Diagram)
+        # Worst case for a scan: the style sheet is found last
+        element_factory.create(StyleSheet)
+    return element_factory
+
+
+def full_scan(element_factory, type_):
+    return [e for e in element_factory.values() if isinstance(e, type_)]
+
+
+@pytest.mark.parametrize("type_", [StyleSheet, Diagram, UML.Class, UML.Element])
+def test_select_by_type(large_model, measure, type_):
+    assert large_model.lselect(type_) == full_scan(large_model, type_)
+
+    indexed = measure("indexed", lambda: large_model.lselect(type_))
+    scanned = measure("full scan", lambda: full_scan(large_model, type_))
+
+    assert indexed <= scanned
+
+
+def test_first_style_sheet(large_model, measure):
+    indexed = measure(
+        "indexed", lambda: next(large_model.select(StyleSheet)), number=1000
+    )
+    scanned = measure(
+        "full scan",
+        lambda: next(e for e in large_model.values() if isinstance(e, StyleSheet)),
+        number=10,
+    )
+
+    assert indexed < scanned
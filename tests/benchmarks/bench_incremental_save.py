@@ -0,0 +1,81 @@
+"""Benchmark saving a model again, after a small change.
+
+A full save serializes every element. An incremental save copies the
+elements that did not change from the previously saved file. Both are
+timed after renaming one class. A full save that records the position
+of every element shows the cost of maintaining the index.
+"""
+from io import StringIO
+
+import pytest
+
+from gaphor import UML
+from gaphor.storage import storage
+from gaphor.storage.saveindex import SaveIndex
+from gaphor.transaction import Transaction
+
+SYNTHETIC_MODEL_SIZE = 20 * 2**20
+
+
+def save(element_factory, filename, save_index=None, previous=None):
+    with storage.create_model(filename) as out:
+        storage.save(out, element_factory, index=save_index, previous=previous)
+    if save_index:
+        save_index.written(filename)
+
+
+def report(element_factory, event_manager, measure, tmp_path):
+    save_index = SaveIndex(event_manager)
+    filename = tmp_path / "model.gaphor"
+    class_ = next(element_factory.select(UML.Class))
+
+    def rename():
+        with Transaction(event_manager):
+            class_.name = f"{class_.name}!"
+
+    def full():
+        rename()
+        save(element_factory, filename)
+
+    def indexed():
+        rename()
+        save(element_factory, filename, save_index)
+
+    def incremental():
+        rename()
+        previous = save_index.read(filename)
+        assert previous
+        save(element_factory, filename, save_index, previous)
+
+    measure("full save", full, number=1, repeat=5)
+    measure("full save, recording positions", indexed, number=1, repeat=5)
+    measure("incremental save", incremental, number=1, repeat=5)
+
+    out = StringIO()
+    storage.save(out, element_factory)
+    assert filename.read_text(encoding="utf-8") == out.getvalue()
+    save_index.shutdown()
+
+
+@pytest.mark.parametrize("model", ["UML.gaphor", "SysML.gaphor"])
+def test_save_model(
+    element_factory, event_manager, modeling_language, models, measure, tmp_path, model
+):
+    with open(models / model, encoding="utf-8") as f:
+        storage.load(f, element_factory, modeling_language)
+
+    report(element_factory, event_manager, measure, tmp_path)
+
+
+def test_save_synthetic_model(
+    element_factory,
+    event_manager,
+    modeling_language,
+    synthetic_model,
+    measure,
+    tmp_path,
+):
+    text = synthetic_model(SYNTHETIC_MODEL_SIZE)
+    storage.load(StringIO(text), element_factory, modeling_language)
+
+    report(element_factory, event_manager, measure, tmp_path)
@@ -0,0 +1,65 @@
+"""Benchmark the cost of recording changes in a journal.
+
+Small transactions are committed with and without a journal. Entries
+are written by a background thread: the time to wait until all entries
+are on disk is measured separately. Recovering the changes from the
+journal is timed too.
+"""
+from io import StringIO
+
+import pytest
+
+from gaphor import UML
+from gaphor.core.modeling import ElementFactory
+from gaphor.storage import storage
+from gaphor.storage.journal import Journal, read_journal
+from gaphor.storage.snapshot import content_hash
+from gaphor.transaction import Transaction
+
+NUMBER_OF_TRANSACTIONS = 1_000
+
+
+@pytest.mark.parametrize("journaled", [False, True])
+def test_commit(
+    element_factory,
+    event_manager,
+    modeling_language,
+    models,
+    measure,
+    tmp_path,
+    journaled,
+):
+    with open(models / "UML.gaphor", encoding="utf-8") as f:
+        storage.load(f, element_factory, modeling_language)
+    model_file = tmp_path / "model.gaphor"
+    with storage.create_model(model_file) as out:
+        storage.save(out, element_factory)
+
+    journal = Journal(event_manager, element_factory)
+    if journaled:
+        journal.open(tmp_path / "model.journal", content_hash(model_file))
+    class_ = next(element_factory.select(UML.Class))
+
+    def rename():
+        for n in range(NUMBER_OF_TRANSACTIONS):
+            with Transaction(event_manager):
+                class_.name = f"Class {n}"
+
+    measure(f"commit, journal {journaled}", rename, number=1, repeat=1)
+    measure(f"flush, journal {journaled}", journal.flush, number=1, repeat=1)
+
+    if journaled:
+
+        def recover():
+            entries = read_journal(journal.path, content_hash(model_file))
+            with open(model_file, encoding="utf-8") as f:
+                storage.load(
+                    StringIO(f.read()),
+                    ElementFactory(),
+                    modeling_language,
+                    journal=entries,
+                )
+
+        measure("recover", recover, number=1, repeat=3)
+
+    journal.shutdown()
@@ -0,0 +1,74 @@
+"""Benchmark lazy loading of diagrams.
+
+A model with many diagrams is loaded at once, and lazily: with
+presentation items created only for the diagrams that are opened.
+Time and memory are reported for a growing number of opened diagrams.
+"""
+import gc
+import tracemalloc
+from io import StringIO
+
+import pytest
+
+from gaphor import UML
+from gaphor.core.modeling import Diagram, ElementFactory
+from gaphor.storage import storage
+from gaphor.UML.classes import ClassItem
+
+DIAGRAMS = 400
+ITEMS_PER_DIAGRAM = 15
+
+
+@pytest.fixture(scope="module")
+def model_with_diagrams():
+    element_factory = ElementFactory()
+    package = element_factory.create(UML.Package)
+    for d in range(DIAGRAMS):
+        diagram = element_factory.create(Diagram)
+        diagram.element = package
+        for i in range(ITEMS_PER_DIAGRAM):
+            klass = element_factory.create(UML.Class)
+            klass.name = f"Class {d}.{i}"
+            klass.package = package
+            diagram.create(ClassItem, subject=klass)
+
+    out = StringIO()
+    storage.save(out, element_factory)
+    return out.getvalue()
+
+
+def load(text, modeling_language, lazy, opened):
+    element_factory = ElementFactory()
+    storage.load(StringIO(text), element_factory, modeling_language, lazy=lazy)
+    for diagram in element_factory.lselect(Diagram)[:opened]:
+        for _item in diagram.get_all_items():
+            pass
+    return element_factory
+
+
+def memory(text, modeling_language, lazy, opened):
+    gc.collect()
+    tracemalloc.start()
+    try:
+        element_factory = load(text, modeling_language, lazy, opened)
+        current, _peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    element_factory.shutdown()
+    return current
+
+
+@pytest.mark.parametrize("opened", [0, 10, 100, DIAGRAMS])
+def test_lazy_load(model_with_diagrams, modeling_language, measure, opened):
+    text = model_with_diagrams
+
+    for lazy in (False, True):
+        label = f"{'lazy' if lazy else 'eager'}, {opened} diagrams opened"
+        measure(
+            label,
+            lambda lazy=lazy: load(text, modeling_language, lazy, opened),
+            number=1,
+            repeat=3,
+        )
+        size = memory(text, modeling_language, lazy, opened)
+        print(f"{measure.name}: {label:<40} {size / 2**20:10.1f} MB")
@@ -0,0 +1,43 @@
+"""Benchmark loading a model with and without lazy watchers.
+
+With lazy watchers, presentation items only register their handlers
+while their diagram is attached. The number of registrations in the
+element dispatcher is reported after loading, and the time to attach
+and detach all diagrams is measured.
+"""
+import pytest
+
+from gaphor.core.modeling import Diagram, ElementFactory
+from gaphor.core.modeling.elementdispatcher import ElementDispatcher
+from gaphor.storage import storage
+
+
+@pytest.mark.parametrize("lazy_watchers", [False, True])
+def test_load(event_manager, modeling_language, models, measure, lazy_watchers):
+    def load():
+        element_factory = ElementFactory(
+            event_manager, ElementDispatcher(event_manager, modeling_language)
+        )
+        element_factory.lazy_watchers = lazy_watchers
+        with open(models / "SysML.gaphor", encoding="utf-8") as f:
+            storage.load(f, element_factory, modeling_language)
+        return element_factory
+
+    measure(f"load, lazy watchers {lazy_watchers}", load, number=1, repeat=3)
+
+    element_factory = load()
+    dispatcher = element_factory.element_dispatcher
+    print(
+        f"{measure.name}: {len(dispatcher._handlers)} registrations, "
+        f"{len(dispatcher._reverse)} handlers"
+    )
+
+    diagrams = list(element_factory.select(Diagram))
+
+    def attach_and_detach():
+        for diagram in diagrams:
+            diagram.attach()
+        for diagram in diagrams:
+            diagram.detach()
+
+    measure(f"attach, lazy watchers {lazy_watchers}", attach_and_detach, number=1)
@@ -0,0 +1,105 @@
+"""Benchmark loading of models.
+
+Loading is split into parsing the file and building the model from the
+parsed records.
+
+The pipelined load parses the file in a separate thread, and creates
+elements while the parser continues with the next chunk. Attributes and
+references are loaded once the file is parsed. Parsing is only a small
+part of loading, and the expat callbacks hold the GIL, so this is
+measured here rather than used by the storage module.
+"""
+import queue
+import threading
+from io import StringIO
+from itertools import islice
+
+import pytest
+
+from gaphor.core.modeling import Presentation
+from gaphor.storage import storage
+from gaphor.storage.parser import GaphorLoader, parse_generator
+
+SYNTHETIC_MODEL_SIZE = 5 * 2**20
+
+
+def parse(text):
+    loader = GaphorLoader()
+    for _ in parse_generator(StringIO(text), loader):
+        pass
+    return loader
+
+
+def build(element_factory, modeling_language, loader):
+    element_factory.flush()
+    with element_factory.bulk_load():
+        for _ in storage.load_elements_generator(
+            loader.elements, element_factory, modeling_language, loader.gaphor_version
+        ):
+            pass
+
+
+def parse_in_thread(text, loader, batches):
+    # Element records are complete enough to create elements from as
+    # soon as their start tag is parsed.
+    sent = 0
+    for _ in parse_generator(StringIO(text), loader):
+        batch = list(islice(loader.elements.values(), sent, None))
+        sent += len(batch)
+        batches.put(batch)
+    batches.put(list(islice(loader.elements.values(), sent, None)))
+    batches.put(None)
+
+
+def pipelined_load(element_factory, modeling_language, text):
+    loader = GaphorLoader()
+    batches: queue.Queue = queue.Queue(maxsize=4)
+    parser = threading.Thread(target=parse_in_thread, args=(text, loader, batches))
+    parser.start()
+
+    element_factory.flush()
+    with element_factory.bulk_load():
+        while (batch := batches.get()) is not None:
+            for elem in batch:
+                cls = modeling_language.lookup_element(elem.type)
+                # Presentation items need their diagram: create them later
+                if cls and not issubclass(cls, Presentation):
+                    elem.element = element_factory.create_as(cls, elem.id)
+        parser.join()
+        for _ in storage.load_elements_generator(
+            loader.elements, element_factory, modeling_language, loader.gaphor_version
+        ):
+            pass
+
+
+def report(element_factory, modeling_language, measure, text):
+    measure("parse", lambda: parse(text), number=1, repeat=3)
+    measure(
+        "load",
+        lambda: build(element_factory, modeling_language, parse(text)),
+        number=1,
+        repeat=3,
+    )
+    size = element_factory.size()
+    measure(
+        "pipelined load",
+        lambda: pipelined_load(element_factory, modeling_language, text),
+        number=1,
+        repeat=3,
+    )
+    assert element_factory.size() == size
+
+
+@pytest.mark.parametrize("model", ["Core.gaphor", "UML.gaphor", "SysML.gaphor"])
+def test_load_model(element_factory, modeling_language, models, measure, model):
+    text = (models / model).read_text(encoding="utf-8")
+
+    report(element_factory, modeling_language, measure, text)
+
+
+def test_load_synthetic_model(
+    element_factory, modeling_language, synthetic_model, measure
+):
+    text = synthetic_model(SYNTHETIC_MODEL_SIZE)
+
+    report(element_factory, modeling_language, measure, text)
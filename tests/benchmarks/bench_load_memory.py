@@ -0,0 +1,67 @@
+"""Benchmark memory use while loading models.
+
+Memory is traced with ``tracemalloc``. Reported are the parsed element
+records, and the peak and final memory of loading a model from a file.
+While loading, records are released once their element is loaded, so
+the peak stays close to the size of the model itself.
+"""
+import gc
+import tracemalloc
+
+import pytest
+
+from gaphor.core.modeling import ElementFactory
+from gaphor.storage import storage
+from gaphor.storage.parser import GaphorLoader, parse_generator
+
+SYNTHETIC_MODEL_SIZE = 20 * 2**20
+
+
+def traced(func):
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = func()
+        gc.collect()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, current, peak
+
+
+def parse(path):
+    loader = GaphorLoader()
+    with open(path, encoding="utf-8") as file_obj:
+        for _ in parse_generator(file_obj, loader):
+            pass
+    return loader
+
+
+def load(path, modeling_language):
+    element_factory = ElementFactory()
+    with open(path, encoding="utf-8") as file_obj:
+        storage.load(file_obj, element_factory, modeling_language)
+    return element_factory
+
+
+def report(name, path, modeling_language):
+    _loader, records, _ = traced(lambda: parse(path))
+    element_factory, model, peak = traced(lambda: load(path, modeling_language))
+    element_factory.shutdown()
+
+    print()
+    print(f"{name}: {'parsed records':<20} {records / 2**20:10.1f} MB")
+    print(f"{name}: {'model':<20} {model / 2**20:10.1f} MB")
+    print(f"{name}: {'peak while loading':<20} {peak / 2**20:10.1f} MB")
+
+
+@pytest.mark.parametrize("model", ["Core.gaphor", "UML.gaphor", "SysML.gaphor"])
+def test_load_model_memory(models, modeling_language, model):
+    report(model, models / model, modeling_language)
+
+
+def test_load_synthetic_model_memory(synthetic_model, modeling_language, tmp_path):
+    path = tmp_path / "synthetic.gaphor"
+    path.write_text(synthetic_model(SYNTHETIC_MODEL_SIZE), encoding="utf-8")
+
+    report("synthetic", path, modeling_language)
@@ -0,0 +1,55 @@
+"""Benchmark parsing of model files.
+
+The expat based parser is compared to the SAX parser fed one line at a
+time, which is what ``parse_generator()`` used to do. Throughput is
+reported in MB/s for the models in ``models/`` and for a synthetic model
+of about 100 MB.
+"""
+from io import StringIO
+
+import pytest
+
+from gaphor.storage.parser import GaphorLoader, new_parser, parse_generator
+
+SYNTHETIC_MODEL_SIZE = 100 * 2**20
+
+
+def sax_parse(file_obj):
+    loader = GaphorLoader()
+    parser = new_parser(loader)
+    for line in file_obj:
+        parser.feed(line)
+    parser.close()
+    return loader.elements
+
+
+def expat_parse(file_obj):
+    loader = GaphorLoader()
+    for _ in parse_generator(file_obj, loader):
+        pass
+    return loader.elements
+
+
+def report(measure, label, parse, text):
+    best = measure(label, lambda: parse(StringIO(text)), number=1, repeat=3)
+    print(f"{measure.name}: {label:<40} {len(text) / 2**20 / best:10.1f} MB/s")
+    return best
+
+
+@pytest.mark.parametrize(
+    "model", ["Core.gaphor", "UML.gaphor", "SysML.gaphor", "RAAML_full.gaphor"]
+)
+def test_parse_model(models, measure, model):
+    text = (models / model).read_text(encoding="utf-8")
+
+    expat = report(measure, "expat", expat_parse, text)
+    sax = report(measure, "sax, line by line", sax_parse, text)
+
+    assert expat < sax
+
+
+def test_parse_synthetic_model(synthetic_model, measure):
+    text = synthetic_model(SYNTHETIC_MODEL_SIZE)
+
+    report(measure, "expat", expat_parse, text)
+    report(measure, "sax, line by line", sax_parse, text)
@@ -0,0 +1,76 @@
+"""Benchmark style sheet matching.
+
+Bucketed rule lookup is compared to evaluating every rule in the style
+sheet (a flat list), for the system style sheet, the default user style
+sheet and a large user style sheet.
+"""
+import pytest
+
+from gaphor.core.modeling.stylesheet import DEFAULT_STYLE_SHEET, SYSTEM_STYLE_SHEET
+from gaphor.core.styling import MATCH_SORT_KEY, CompiledStyleSheet, merge_styles
+from gaphor.core.styling.tests.test_compiler import Node
+
+NAMES = [f"type{n}" for n in range(100)]
+
+LARGE_STYLE_SHEET = "\n".join(
+    f"""
+    {name} {{ line-width: {n % 5}; }}
+    {name}:hover {{ color: red; }}
+    {name}[subject.name] {{ font-weight: bold; }}
+    diagram > {name} {{ padding: {n % 7}; }}
+    """
+    for n, name in enumerate(NAMES)
+)
+
+STYLE_SHEETS = {
+    "system": (SYSTEM_STYLE_SHEET,),
+    "default": (SYSTEM_STYLE_SHEET, DEFAULT_STYLE_SHEET),
+    "large": (SYSTEM_STYLE_SHEET, DEFAULT_STYLE_SHEET, LARGE_STYLE_SHEET),
+}
+
+
+def flat_match(compiled_style_sheet, node):
+    results = sorted(
+        (
+            (specificity, order, declarations)
+            for pred, specificity, order, declarations in compiled_style_sheet.selectors
+            if pred(node)
+        ),
+        key=MATCH_SORT_KEY,
+    )
+    return merge_styles(*(decl for _, _, decl in results))
+
+
+@pytest.fixture
+def nodes():
+    diagram = Node("diagram")
+    return [
+        Node(
+            name,
+            parent=diagram,
+            attributes={"subject.name": "x"} if n % 2 else {},
+            state=("hover",) if n % 3 else (),
+        )
+        for n, name in enumerate(NAMES + ["dependency", "controlflow", "class"])
+    ]
+
+
+@pytest.mark.parametrize("style_sheet", STYLE_SHEETS)
+def test_match(measure, nodes, style_sheet):
+    compiled_style_sheet = CompiledStyleSheet(*STYLE_SHEETS[style_sheet])
+
+    for node in nodes:
+        assert compiled_style_sheet._match(node) == flat_match(
+            compiled_style_sheet, node
+        )
+
+    bucketed = measure(
+        "bucketed",
+        lambda: [compiled_style_sheet._match(node) for node in nodes],
+    )
+    flat = measure(
+        "flat", lambda: [flat_match(compiled_style_sheet, node) for node in nodes]
+    )
+    measure("cached", lambda: [compiled_style_sheet.match(node) for node in nodes])
+
+    assert bucketed < flat
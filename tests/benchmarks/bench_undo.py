@@ -0,0 +1,101 @@
+"""Benchmark the memory used by the undo history.
+
+Memory is traced with ``tracemalloc`` while recording many small
+transactions, and while deleting a diagram with many items. The estimate
+of the undo manager itself is reported alongside.
+
+Dragging an item is recorded with and without merging of consecutive
+transactions.
+"""
+import gc
+import tracemalloc
+
+import pytest
+
+from gaphor import UML
+from gaphor.core.modeling import Diagram
+from gaphor.diagram.presentation import ElementPresentation
+from gaphor.services.undomanager import UndoManager
+from gaphor.transaction import Transaction
+from gaphor.UML.classes import ClassItem
+
+NUMBER_OF_CLASSES = 2_000
+NUMBER_OF_ITEMS = 200
+NUMBER_OF_MOTIONS = 1_000
+
+
+@pytest.fixture
+def undo_manager(event_manager, element_factory):
+    undo_manager = UndoManager(event_manager, element_factory, memory_limit=2**40)
+    yield undo_manager
+    undo_manager.shutdown()
+
+
+def traced(func):
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        gc.collect()
+        current, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return current
+
+
+def report(measure, label, undo_manager, func):
+    usage = undo_manager.memory_usage
+    memory = traced(func)
+    print(
+        f"{measure.name}: {label:<30} {memory / 2**20:8.2f} MB traced, "
+        f"{(undo_manager.memory_usage - usage) / 2**20:8.2f} MB estimated, "
+        f"{len(undo_manager._undo_stack):6} transactions"
+    )
+
+
+def test_small_transactions(event_manager, element_factory, undo_manager, measure):
+    with Transaction(event_manager):
+        classes = [element_factory.create(UML.Class) for _ in range(NUMBER_OF_CLASSES)]
+
+    def rename():
+        for n, c in enumerate(classes):
+            with Transaction(event_manager):
+                c.name = f"Class {n}"
+
+    report(measure, "rename classes", undo_manager, rename)
+    measure("undo rename", undo_manager.undo_transaction, number=100, repeat=1)
+
+
+def test_delete_diagram(event_manager, element_factory, undo_manager, measure):
+    with Transaction(event_manager):
+        diagram = element_factory.create(Diagram)
+        for _ in range(NUMBER_OF_ITEMS):
+            diagram.create(ClassItem, subject=element_factory.create(UML.Class))
+
+    def delete():
+        with Transaction(event_manager):
+            diagram.unlink()
+
+    report(measure, "delete diagram", undo_manager, delete)
+    measure("undo delete diagram", undo_manager.undo_transaction, number=1, repeat=1)
+
+
+@pytest.mark.parametrize("coalesce_window", [0, 1.0])
+def test_drag(event_manager, element_factory, undo_manager, measure, coalesce_window):
+    undo_manager.coalesce_window = coalesce_window
+    with Transaction(event_manager):
+        diagram = element_factory.create(Diagram)
+        item = diagram.create(ElementPresentation)
+
+    def drag():
+        for _ in range(NUMBER_OF_MOTIONS):
+            with Transaction(event_manager):
+                item.matrix.translate(1, 1)
+
+    report(measure, "drag", undo_manager, drag)
+
+    def undo_drag():
+        while len(undo_manager._undo_stack) > 1:
+            undo_manager.undo_transaction()
+
+    measure("undo drag", undo_drag, number=1, repeat=1)
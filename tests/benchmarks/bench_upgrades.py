@@ -0,0 +1,59 @@
+"""Benchmark loading of current and older models.
+
+Upgrade steps are selected once per load, based on the version of
+Gaphor that saved the model. Models in the current format should not
+pay for upgrades.
+"""
+from io import StringIO
+
+import pytest
+
+from gaphor.storage import storage
+
+
+def load(element_factory, modeling_language, text):
+    storage.load(StringIO(text), element_factory, modeling_language)
+
+
+def report(element_factory, modeling_language, measure, label, text):
+    measure(
+        label,
+        lambda: load(element_factory, modeling_language, text),
+        number=1,
+        repeat=5,
+    )
+
+
+def test_load_current_model(element_factory, modeling_language, models, measure):
+    load(
+        element_factory,
+        modeling_language,
+        (models / "UML.gaphor").read_text(encoding="utf-8"),
+    )
+    out = StringIO()
+    storage.save(out, element_factory)
+
+    report(
+        element_factory,
+        modeling_language,
+        measure,
+        "UML.gaphor, resaved",
+        out.getvalue(),
+    )
+
+
+@pytest.mark.parametrize(
+    "model",
+    [
+        "all-elements.gaphor",
+        "all-elements-v2.5.gaphor",
+        "decision-fork-nodes.gaphor",
+        "RAAML-incoming.gaphor",
+    ],
+)
+def test_load_older_model(
+    element_factory, modeling_language, test_models, measure, model
+):
+    text = (test_models / model).read_text(encoding="utf-8")
+
+    report(element_factory, modeling_language, measure, model, text)
@@ -0,0 +1,91 @@
+"""Helpers for the Gaphor benchmarks.
+
+Benchmarks are not collected by a normal test run. Run them explicitly::
+
+    pytest -s tests/benchmarks/bench_elementfactory.py
+
+Each benchmark prints its timings, so it's easy to compare a
+change against a baseline.
+"""
+from __future__ import annotations
+
+import timeit
+from uuid import uuid1
+
+import pytest
+
+from gaphor.conftest import models  # noqa: F401
+
+
+class Measure:
+    """Time a callable and report the best average run."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.results: dict[str, float] = {}
+
+    def __call__(self, label: str, func, number: int = 10, repeat: int = 5) -> float:
+        best = min(timeit.repeat(func, number=number, repeat=repeat)) / number
+        self.results[label] = best
+        print(f"{self.name}: {label:<40} {best * 1000:10.3f} ms")
+        return best
+
+
+@pytest.fixture
+def measure(request):
+    print()
+    return Measure(request.node.name)
+
+
+@pytest.fixture
+def synthetic_model():
+    return _synthetic_model
+
+
+def _synthetic_model(size: int) -> str:
+    """A model of about ``size`` characters: classes with an attribute,
+    all in one package."""
+    package_id = str(uuid1())
+    header = f"""<?xml version="1.0" encoding="utf-8"?>
+<gaphor xmlns="http://gaphor.sourceforge.net/model" version="3.0" gaphor-version="2.20.0">
+<Package id="{package_id}">
+<name>
+<val>Synthetic</val>
+</name>
+</Package>
+"""
+    chunks = [header]
+    total = len(header)
+    n = 0
+    while total < size:
+        class_id, property_id = uuid1(), uuid1()
+        chunk = f"""<Class id="{class_id}">
+<name>
+<val>Class {n}</val>
+</name>
+<ownedAttribute>
+<reflist>
+<ref refid="{property_id}"/>
+</reflist>
+</ownedAttribute>
+<package>
+<ref refid="{package_id}"/>
+</package>
+</Class>
+<Property id="{property_id}">
+<aggregation>
+<val>composite</val>
+</aggregation>
+<class_>
+<ref refid="{class_id}"/>
+</class_>
+<name>
+<val>attr{n}</val>
+</name>
+</Property>
+"""
+        chunks.append(chunk)
+        total += len(chunk)
+        n += 1
+    chunks.append("</gaphor>\n")
+    return "".join(chunks)